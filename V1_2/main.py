@@ -3,7 +3,6 @@
 import os
 import tkinter as tk
 from tkinter import filedialog, simpledialog, messagebox
-from utils import convertir_csv_en_vcf
 
 
 def afficher_message_accueil():
@@ -82,8 +81,10 @@ def main():
     print(f"Chemin CSV résolu : {chemin_csv}")
     print(f"Chemin VCF résolu : {chemin_vcf}")
 
-    # Convertir le fichier avec la note commune si elle existe
+    # Convertir le fichier avec la note commune si elle existe. Le cœur de conversion n'est chargé
+    # qu'ici : le message d'accueil s'affiche sans attendre son import
     print("Conversion en cours...")
+    from utils import convertir_csv_en_vcf
     convertir_csv_en_vcf(chemin_csv, chemin_vcf, note_commune)
     print(f"Conversion terminée. Le fichier VCF a été créé : {chemin_vcf}")
 
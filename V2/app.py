@@ -5,30 +5,60 @@ Développé par Michel Safars pour Romain.
 """
 
 import os
+import sys
 import csv
 import io
-import base64
+import hashlib
 import streamlit as st
 import datetime
-import pytz
 import json
-from typing import Dict, List, Optional, Tuple, Any
+from functools import lru_cache
+from typing import IO, Dict, List, Optional, Any, Tuple
+
+# Rendre le cœur de conversion partagé (dossier src/ à la racine du dépôt) importable sans installation
+_DOSSIER_SRC = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+if _DOSSIER_SRC not in sys.path:
+    sys.path.insert(0, _DOSSIER_SRC)
+
+import convertisseur  # noqa: E402
+from convertisseur import (  # noqa: E402
+    PAYS_PAR_DEFAUT,
+    REGLES_PAYS,
+    TAILLE_ECHANTILLON,
+    RegistreConfigurations,
+    ErreurConfiguration,
+    FormatCsv,
+    FORMATS_SORTIE,
+    StatistiquesConversion,
+    detecter_format,
+    ecrire_contacts,
+    ecrire_vcf,
+    get_configuration_par_défaut,
+    horodatage_revision,
+    lire_configuration,
+    suggerer_colonnes,
+)
+from convertisseur.statistiques import LIBELLES_ETAPES  # noqa: E402
 
 # Définition de la version et autres constantes
 APP_VERSION = "2.1.0"
 DATE_CREATION = "2025-05-11"
 TIME_FORMAT = "%Y-%m-%d %H:%M:%S %Z"
 
-# Définition du titre et de la description de l'application
-st.set_page_config(
-    page_title="Convertisseur CSV vers VCF",
-    page_icon="📇",
-    layout="wide",  # Utilisation de la mise en page large
-    initial_sidebar_state="collapsed"  # Masquer la barre latérale par défaut
-)
+# Formats proposés en plus du VCF (vCard 3.0), écrits pendant la même lecture du CSV
+LIBELLES_FORMATS = {"vcard4": "vCard 4.0", "jcard": "jCard (JSON)", "xcard": "xCard (XML)"}
+
+# Taille maximale de l'aperçu du VCF en mode débogage : le navigateur ne reçoit jamais le fichier entier
+TAILLE_APERCU_VCF = 64 * 1024
 
-# Ajouter du CSS personnalisé pour élargir les colonnes des tableaux
-st.markdown("""
+# Fuseau de l'heure affichée
+FUSEAU_AFFICHAGE = "Europe/Paris"
+
+# Streamlit réexécute ce script à chaque interaction : les textes et tables ci-dessous sont des constantes,
+# et tout ce qui coûte (imports rares, fuseau horaire, analyse du CSV) est importé ou mis en cache au besoin
+
+# CSS personnalisé pour élargir les colonnes des tableaux
+CSS_PAGE = """
 <style>
     .stTable {
         width: 100% !important;
@@ -47,85 +77,137 @@ st.markdown("""
         padding-right: 5rem;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
 
-def formater_nom(nom: str, conserver_majuscules: bool = False) -> str:
-    """
-    Formate un nom pour avoir les premières lettres de chaque mot en majuscules.
-    Exemple: "DUPONT" -> "Dupont", "DE LA TOUR" -> "De La Tour"
+TEXTE_INTRODUCTION = """
+    Application développée par Michel Safars pour Romain, futur grand réalisateur de cinéma.
 
-    Args:
-        nom: Le nom à formater
-        conserver_majuscules: Si True, conserve les noms entiers en majuscules tels quels
+    Cette application convertit votre fichier CSV en carnet d'adresses au format VCF (vCard), compatible avec tous les appareils et applications de contacts.
     """
-    if not nom:
-        return ""
 
-    # Si le nom est entièrement en majuscules et qu'on veut conserver cela
-    if conserver_majuscules and nom.upper() == nom:
-        return nom
-
-    # Séparer les mots et les formater individuellement
-    mots = nom.lower().split()
-    mots_formates = [mot.capitalize() for mot in mots]
+TEXTE_MODE_EMPLOI = """
+    ### ℹ️ Mode d'emploi
 
-    return " ".join(mots_formates)
+    **Voici comment utiliser cette application :**
 
+    1ère étape ➡️ **Importez votre fichier CSV** contenant les contacts
 
-def separer_prenom_nom(chaine: str) -> Tuple[str, str]:
-    """
-    Sépare une chaîne contenant prénom et nom.
-    Le prénom est supposé être en premier, et le nom (souvent en majuscules) après.
+    2ème étape ➡️ **Configurez les correspondances de colonnes**
+       - Option rapide : Utilisez le bouton "Configuration par défaut"
+       - Option personnalisée : Associez manuellement vos colonnes
 
-    Exemples:
-    - "Michel DUPONT" -> ("Michel", "Dupont")
-    - "Jean-Pierre MARTIN" -> ("Jean-Pierre", "Martin")
-    - "Marie-France de la TOUR" -> ("Marie-France", "De La Tour")
+    3ème étape ➡️ **Convertissez et téléchargez** le fichier VCF généré
     """
-    if not chaine:
-        return "", ""
 
-    # Diviser la chaîne en mots
-    mots = chaine.strip().split()
-    if not mots:
-        return "", ""
+DOCUMENTATION_CHAMPS = """
+        ## Champs utilisés dans le format VCF
 
-    # Si un seul mot, le considérer comme prénom
-    if len(mots) == 1:
-        return mots[0], ""
+        ### Nom et prénom (obligatoire)
+        Vous pouvez utiliser soit :
+        - Une colonne combinée avec le nom complet de la personne. L'application sépare automatiquement
+          le prénom et le nom. Par exemple : "Michel DUPONT" sera séparé en prénom "Michel" et nom "Dupont".
+        - Deux colonnes séparées "Prénom" et "NOM" pour une meilleure précision.
 
-    # Chercher la position de transition prénom/nom
-    position_nom = 1  # Position par défaut
+        ### Rôle/Fonction (optionnel)
+        Le titre ou la fonction professionnelle de la personne. Exemple : "Directeur commercial", "Médecin", etc.
 
-    # Cas spéciaux pour les prénoms composés avec tiret
-    if len(mots) >= 2 and "-" in mots[0]:
-        position_nom = 1
+        ### Téléphone (optionnel)
+        Le numéro de téléphone, de préférence mobile. L'application ajoute automatiquement l'indicatif du pays choisi
+        (+33 pour la France par défaut) si nécessaire, reconnaît les préfixes internationaux (+, 00) et retire
+        les espaces, points, tirets et parenthèses.
 
-    # Cas des prénoms composés (Jean Pierre, Marie France, etc.)
-    elif len(mots) >= 3:
-        # Si le deuxième mot n'est pas en majuscules, il fait probablement partie du prénom
-        if not mots[1].isupper() and len(mots[1]) > 1:
-            position_nom = 2
+        ### Email (optionnel)
+        L'adresse email de contact.
 
-    # Construire le prénom et le nom
-    prenom = " ".join(mots[:position_nom])
-    nom = " ".join(mots[position_nom:])
+        ### Adresse (optionnel)
+        L'adresse postale complète.
 
-    # Formater le nom avec les premières lettres en majuscules
-    nom = formater_nom(nom)
+        ### Agent/Agence (optionnel)
+        Le nom de l'agent ou de l'agence associée au contact.
 
-    return prenom, nom
+        ### Mots clé (optionnel)
+        Tags ou catégories pour classer le contact. Plusieurs mots clés peuvent être séparés par des virgules.
 
+        ### Relation (optionnel)
+        Type de relation avec le contact (ami, collègue, famille, etc.)
 
-def trouver_colonne_correspondante(colonnes: List[str], noms_possibles: List[str]) -> Optional[str]:
+        ## Note commune
+        Vous pouvez également ajouter une note commune qui sera ajoutée à tous les contacts.
+        """
+
+# Libellé de chaque champ, dans l'ordre des sélecteurs de la configuration manuelle
+DESCRIPTIONS_CHAMPS = {
+    'nom': "Nom et prénom (combiné)",
+    'prenom': "Prénom",
+    'nom_famille': "Nom de famille",
+    'role': "Rôle/Fonction",
+    'telephone': "Numéro de téléphone",
+    'email': "Adresse email",
+    'adresse': "Adresse postale",
+    'agent': "Agent/Agence",
+    'mots_cle': "Mots clé",
+    'relation': "Relation"
+}
+
+OPTIONS_DELIMITEUR = [';', ',', '\t', '|']
+NOMS_DELIMITEUR = {';': "Point-virgule (;)", ',': "Virgule (,)", '\t': "Tabulation (\\t)", '|': "Barre verticale (|)"}
+
+PAYS_CODES = sorted(REGLES_PAYS)
+
+
+def configurer_page() -> None:
+    """Titre, icône et mise en page de l'application ; doit précéder tout autre appel à Streamlit."""
+    st.set_page_config(
+        page_title="Convertisseur CSV vers VCF",
+        page_icon="📇",
+        layout="wide",  # Utilisation de la mise en page large
+        initial_sidebar_state="collapsed"  # Masquer la barre latérale par défaut
+    )
+    st.markdown(CSS_PAGE, unsafe_allow_html=True)
+
+
+@lru_cache(maxsize=1)
+def fuseau_affichage() -> datetime.tzinfo:
     """
-    Trouve la colonne correspondante parmi plusieurs noms possibles.
-    Retourne None si aucune correspondance n'est trouvée.
+    Fuseau de l'heure affichée, lu une fois par processus. Sans base des fuseaux horaires (Windows sans
+    le paquet tzdata), l'heure est affichée en UTC.
     """
-    for nom in noms_possibles:
-        if nom in colonnes:
-            return nom
-    return None
+    from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+    try:
+        return ZoneInfo(FUSEAU_AFFICHAGE)
+    except ZoneInfoNotFoundError:
+        return datetime.timezone.utc
+
+
+def verifier_decalage_horaire() -> None:
+    """Vérifie si l'heure affichée est décalée de plus de 2 minutes par rapport à l'heure actuelle."""
+    # Obtenir l'heure actuelle en UTC
+    heure_actuelle_utc = datetime.datetime.now(datetime.timezone.utc)
+
+    # Obtenir l'heure de Paris (fuseau local) et la formater pour affichage
+    heure_affichage = heure_actuelle_utc.astimezone(fuseau_affichage()).strftime(TIME_FORMAT)
+
+    # Stocker l'heure dans la session pour vérification ultérieure
+    if 'heure_derniere_verification' not in st.session_state:
+        st.session_state.heure_derniere_verification = heure_actuelle_utc
+
+    # Calculer le décalage
+    decalage = (heure_actuelle_utc - st.session_state.heure_derniere_verification).total_seconds()
+
+    # Afficher l'information de version et d'heure
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        st.markdown(f"**Version {APP_VERSION}** - Créée le {DATE_CREATION}")
+        st.markdown(f"Heure du serveur: **{heure_affichage}**")
+
+    # Vérifier si le décalage est important (plus de 2 minutes = 120 secondes)
+    if abs(decalage) > 120:
+        with col2:
+            st.warning(f"⚠️ Décalage détecté: {int(abs(decalage)//60)} min {int(abs(decalage)%60)} sec")
+
+    # Mettre à jour l'heure de référence
+    st.session_state.heure_derniere_verification = heure_actuelle_utc
 
 
 def generer_lien_telechargement_json(nom_fichier: str, mappings: Dict[str, str]) -> str:
@@ -151,7 +233,8 @@ def generer_lien_telechargement_json(nom_fichier: str, mappings: Dict[str, str])
         # Convertir en JSON formaté
         json_str = json.dumps(config, indent=4, ensure_ascii=False)
 
-        # Encoder en base64 pour le téléchargement
+        # Encoder en base64 pour le téléchargement (module importé au premier lien seulement)
+        import base64
         b64 = base64.b64encode(json_str.encode('utf-8')).decode()
 
         # Créer le nom du fichier de configuration
@@ -177,17 +260,9 @@ def analyser_json_config(contenu_json: str) -> Dict[str, Any]:
         Dictionnaire avec les informations de configuration
     """
     try:
-        # Charger le JSON
-        config = json.loads(contenu_json)
-
-        # Vérifier la structure minimale requise
-        if "mappings" not in config:
-            st.error("Le fichier de configuration n'a pas le bon format (mappings manquants).")
-            return {}
-
-        return config
-    except json.JSONDecodeError:
-        st.error("Le fichier n'est pas un JSON valide.")
+        return lire_configuration(contenu_json)
+    except ErreurConfiguration as e:
+        st.error(str(e))
         return {}
     except Exception as e:
         st.error(f"Erreur lors de l'analyse du fichier de configuration : {str(e)}")
@@ -198,6 +273,8 @@ def convertir_csv_en_vcf(contenu_csv: str, mappings_colonnes: Dict[str, str], no
     """
     Convertit le contenu d'un fichier CSV en format VCF en utilisant des mappings de colonnes dynamiques.
 
+    Les erreurs du cœur de conversion sont affichées dans l'interface.
+
     Args:
         contenu_csv: Contenu du fichier CSV en texte
         mappings_colonnes: Dictionnaire associant les types de champs aux noms de colonnes du CSV
@@ -208,259 +285,197 @@ def convertir_csv_en_vcf(contenu_csv: str, mappings_colonnes: Dict[str, str], no
         Contenu du fichier VCF généré
     """
     try:
-        # Préparer le tampon pour le VCF
-        vcf_buffer = io.StringIO()
-
-        # Lecture du CSV depuis le contenu
-        csv_buffer = io.StringIO(contenu_csv)
-        lecteur = csv.DictReader(csv_buffer, delimiter=delimiter)
-
-        # Vérifiez si des colonnes sont détectées
-        colonnes_disponibles = lecteur.fieldnames
-        if not colonnes_disponibles:
-            st.error("Aucune colonne détectée dans le fichier CSV.")
-            return ""
-
-        # Extraire les colonnes à partir des mappings
-        prenom_nom_colonne = mappings_colonnes.get('nom', None)
-        prenom_colonne = mappings_colonnes.get('prenom', None)
-        nom_famille_colonne = mappings_colonnes.get('nom_famille', None)
-        role_colonne = mappings_colonnes.get('role', None)
-        tel_colonne = mappings_colonnes.get('telephone', None)
-        email_colonne = mappings_colonnes.get('email', None)
-        adresse_colonne = mappings_colonnes.get('adresse', None)
-        agent_colonne = mappings_colonnes.get('agent', None)
-        mots_cle_colonne = mappings_colonnes.get('mots_cle', None)
-        relation_colonne = mappings_colonnes.get('relation', None)
-
-        # Vérifier que les colonnes essentielles sont présentes
-        # On doit avoir soit la colonne combinée nom/prénom, soit les deux colonnes nom et prénom séparées
-        colonnes_nom_presentes = False
-        if prenom_nom_colonne and prenom_nom_colonne in colonnes_disponibles:
-            colonnes_nom_presentes = True
-        elif prenom_colonne and nom_famille_colonne and prenom_colonne in colonnes_disponibles and nom_famille_colonne in colonnes_disponibles:
-            colonnes_nom_presentes = True
-        elif prenom_colonne and prenom_colonne in colonnes_disponibles:
-            # On accepte d'avoir juste le prénom comme minimum
-            colonnes_nom_presentes = True
-        elif nom_famille_colonne and nom_famille_colonne in colonnes_disponibles:
-            # On accepte d'avoir juste le nom comme minimum
-            colonnes_nom_presentes = True
-
-        if not colonnes_nom_presentes:
-            st.error("Les colonnes pour le nom et le prénom ne sont pas correctement configurées dans le mapping.")
-            return ""
-
-        # Nous ne mettons plus X-ADDRESSBOOK-NAME au début du fichier car cela cause des problèmes d'importation
-        # La note commune sera uniquement ajoutée dans chaque fiche individuelle
-
-        for contact in lecteur:
-            # Fonction helper pour gérer les valeurs None
-            def get_safe_value(key: Optional[str]) -> str:
-                if not key:
-                    return ""
-                value = contact.get(key, "")
-                return str(value).strip() if value is not None else ""
-
-            # Récupérer les informations de manière sécurisée
-            role = get_safe_value(role_colonne)
-            telephone = get_safe_value(tel_colonne)
-            email = get_safe_value(email_colonne)
-            adresse = get_safe_value(adresse_colonne)
-            agent = get_safe_value(agent_colonne)
-            mots_cle = get_safe_value(mots_cle_colonne)
-            relation = get_safe_value(relation_colonne)
-
-            # Deux cas possibles : soit on a une colonne combinée nom/prénom, soit deux colonnes séparées
-            if prenom_nom_colonne and prenom_nom_colonne in colonnes_disponibles:
-                prenom_nom = get_safe_value(prenom_nom_colonne)
-                # Ne créer une carte que si au moins le nom ou le prénom est présent
-                if not prenom_nom:
-                    continue
-                # Utiliser la fonction de séparation prénom/nom
-                prenom, nom = separer_prenom_nom(prenom_nom)
-            else:
-                # Utiliser les colonnes séparées pour le nom et le prénom
-                prenom = get_safe_value(prenom_colonne)
-                nom = get_safe_value(nom_famille_colonne)
-                # Ne créer une carte que si au moins le nom ou le prénom est présent
-                if not prenom and not nom:
-                    continue
-                # Formater le nom et le prénom
-                # Pour le prénom, on utilise la fonction de formatage standard
-                if prenom:
-                    prenom = formater_nom(prenom)
-                # Pour le nom de famille, on conserve les majuscules si c'est le cas dans le CSV
-                if nom:
-                    nom = formater_nom(nom, conserver_majuscules=True)
-
-            vcf_buffer.write("BEGIN:VCARD\n")
-            vcf_buffer.write("VERSION:3.0\n")
-
-            # Ajouter le nom et le prénom
-            # Format VCF: N:Nom_de_famille;Prénom;Nom_additionnel;Préfix;Suffix
-            vcf_buffer.write(f"N:{nom};{prenom};;;\n")
-            # Format VCF: FN:Affichage_complet_du_nom
-            vcf_buffer.write(f"FN:{prenom} {nom}\n")
-
-            # Ajouter le rôle si présent
-            if role:
-                vcf_buffer.write(f"TITLE:{role}\n")
-
-            # Ajouter l'agent si présent
-            if agent:
-                vcf_buffer.write(f"RELATED;type=agent:{agent}\n")
-
-            # Ajouter la relation si présente
-            if relation:
-                vcf_buffer.write(f"RELATED;type=relation:{relation}\n")
-
-            # Ajouter les mots clé si présents
-            if mots_cle:
-                vcf_buffer.write(f"CATEGORIES:{mots_cle}\n")
-
-            # Ajouter le téléphone
-            if telephone:
-                # Ajouter indicatif par défaut (+33) si aucun n'est présent
-                if not telephone.startswith('+'):
-                    if telephone.startswith('0'):
-                        telephone = f"+33{telephone[1:]}"
-                    else:
-                        telephone = f"+33{telephone}"
-                # Nettoyer le numéro de téléphone en enlevant les espaces et les points
-                telephone = telephone.replace(' ', '').replace('.', '')
-                vcf_buffer.write(f"TEL;TYPE=CELL:{telephone}\n")
+        return convertisseur.convertir_csv_en_vcf(contenu_csv, mappings_colonnes, note_commune, delimiter)
+    except Exception as e:
+        st.error(f"Une erreur s'est produite : {str(e)}")
+        return ""
 
-            # Ajouter l'email
-            if email:
-                vcf_buffer.write(f"EMAIL;TYPE=INTERNET:{email}\n")
 
-            # Ajouter l'adresse
-            if adresse:
-                vcf_buffer.write(f"ADR;TYPE=HOME:;;{adresse};;;;\n")
+def empreinte_fichier(uploaded_file: Any) -> str:
+    """
+    Calcule l'empreinte du contenu d'un fichier téléversé, une seule fois par fichier.
+
+    L'empreinte est mémorisée dans la session pour l'upload courant : les réexécutions du script
+    (à chaque interaction) ne relisent pas les octets du fichier pour la recalculer.
 
-            # Ajouter la note commune si elle existe
-            if note_commune:
-                vcf_buffer.write(f"NOTE:{note_commune}\n")
+    Args:
+        uploaded_file: Fichier renvoyé par st.file_uploader
 
-            vcf_buffer.write("END:VCARD\n\n")
+    Returns:
+        Empreinte hexadécimale du contenu
+    """
+    cle_upload = (getattr(uploaded_file, "file_id", None) or uploaded_file.name, uploaded_file.size)
+    memorisee = st.session_state.get("empreinte_upload")
+    if memorisee and memorisee[0] == cle_upload:
+        return memorisee[1]
 
-        # Récupérer le contenu du buffer
-        vcf_content = vcf_buffer.getvalue()
-        return vcf_content
+    empreinte = hashlib.blake2b(uploaded_file.getbuffer(), digest_size=16).hexdigest()
+    st.session_state.empreinte_upload = (cle_upload, empreinte)
+    return empreinte
 
-    except Exception as e:
-        st.error(f"Une erreur s'est produite : {str(e)}")
-        return ""
 
-def get_colonnes_suggérées() -> Dict[str, List[str]]:
+@st.cache_data(show_spinner=False, max_entries=16)
+def detecter_format_csv(_donnees: bytes, empreinte: str) -> FormatCsv:
     """
-    Renvoie un dictionnaire des noms de colonnes suggérés pour chaque type de champ.
+    Détecte l'encodage, le délimiteur et les guillemets d'un CSV sur ses premiers octets seulement.
+
+    Args:
+        _donnees: Contenu brut du fichier CSV (seuls les TAILLE_ECHANTILLON premiers octets sont lus)
+        empreinte: Empreinte du contenu, clé du cache (voir empreinte_fichier)
 
     Returns:
-        Dictionnaire avec les types de champs et les noms de colonnes suggérés
+        Format détecté
     """
-    return {
-        'nom': ["Prénom Nom", "Nom Prénom", "Nom", "Nom complet", "Fullname", "Nom et prénom", "Contact", "Identité"],
-        'prenom': ["Prénom", "Prenom", "First name", "First", "Firstname"],
-        'nom_famille': ["NOM", "Nom de famille", "Last name", "Last", "Lastname", "Surname"],
-        'role': ["Role", "Rôle", "Fonction", "Titre", "Poste", "Title", "Job", "Position"],
-        'telephone': ["Téléphone", "Tel", "Tél", "Mobile", "Portable", "Phone", "Cellulaire", "GSM", "Numéro", "Cell"],
-        'email': ["Mail", "Email", "Courriel", "E-mail", "Adresse mail", "Adresse email", "Email address"],
-        'adresse': ["Adresse", "Adresse postale", "Address", "Localisation", "Domicile", "Lieu", "Location"],
-        'agent': ["Agent", "Agence", "Agency", "Représentant", "Representative", "Manager", "Responsable"],
-        'mots_cle': ["Mots clé", "Mots-clés", "Keywords", "Tags", "Catégories", "Thèmes"],
-        'relation': ["Relation", "Lien", "Connexion", "Relationship", "Link", "Contact Type"]
-    }
+    return detecter_format(_donnees[:TAILLE_ECHANTILLON], len(_donnees) > TAILLE_ECHANTILLON)
 
 
-def get_configuration_par_défaut() -> Dict[str, str]:
+@st.cache_data(show_spinner=False, max_entries=16)
+def analyser_csv(_donnees: bytes, empreinte: str, délimiteur: str, encodage: str = 'utf-8-sig',
+                 guillemet: str = '"', nb_lignes_apercu: int = 5) -> Dict[str, Any]:
     """
-    Renvoie la configuration par défaut standard pour les champs.
-    Ces valeurs sont celles utilisées dans les versions initiales de l'application.
+    Lit l'en-tête et les premières lignes d'un CSV, et suggère les correspondances de colonnes.
+
+    Le résultat est mis en cache par Streamlit sous la clé (empreinte, délimiteur, encodage) : le contenu
+    (`_donnees`, exclu de la clé) n'est ni haché, ni décodé, ni relu tant que le fichier et le
+    délimiteur ne changent pas. Seules les premières lignes sont décodées, jamais tout le fichier.
+
+    Args:
+        _donnees: Contenu brut du fichier CSV
+        empreinte: Empreinte du contenu (voir empreinte_fichier)
+        délimiteur: Délimiteur utilisé dans le CSV
+        encodage: Encodage du fichier
+        guillemet: Caractère de citation des champs
+        nb_lignes_apercu: Nombre de lignes gardées pour l'aperçu
 
     Returns:
-        Dictionnaire avec les types de champs et les noms de colonnes par défaut
+        Dictionnaire avec les clés "colonnes", "apercu" (liste de dictionnaires) et "suggestions"
     """
+    flux = io.TextIOWrapper(io.BytesIO(_donnees), encoding=encodage, errors='replace', newline='')
+    lecteur = csv.reader(flux, delimiter=délimiteur, quotechar=guillemet)
+    colonnes = next((ligne for ligne in lecteur if ligne), [])
+
+    apercu = []
+    for ligne in lecteur:
+        if len(apercu) >= nb_lignes_apercu:
+            break
+        if ligne:
+            apercu.append(dict(zip(colonnes, ligne)))
+
     return {
-        'nom': "Prénom Nom",
-        'prenom': "Prénom",
-        'nom_famille': "NOM",
-        'role': "Rôle",
-        'telephone': "Téléphone",
-        'email': "Email",
-        'adresse': "Adresse",
-        'agent': "Agent",
-        'mots_cle': "Mots clé",
-        'relation': "Relation"
+        "colonnes": colonnes,
+        "apercu": apercu,
+        "suggestions": suggerer_colonnes(colonnes) if colonnes else {}
     }
 
 
-def afficher_documentation_champs() -> None:
+def afficher_statistiques(statistiques: StatistiquesConversion) -> None:
     """
-    Affiche une documentation détaillée des champs utilisés dans le format VCF.
-    """
-    with st.expander("Documentation des champs"):
-        st.markdown("""
-        ## Champs utilisés dans le format VCF
+    Affiche dans un panneau dépliable les mesures d'une conversion : lignes, temps par étape et caches.
 
-        ### Nom et prénom (obligatoire)
-        Vous pouvez utiliser soit :
-        - Une colonne combinée avec le nom complet de la personne. L'application sépare automatiquement
-          le prénom et le nom. Par exemple : "Michel DUPONT" sera séparé en prénom "Michel" et nom "Dupont".
-        - Deux colonnes séparées "Prénom" et "NOM" pour une meilleure précision.
-
-        ### Rôle/Fonction (optionnel)
-        Le titre ou la fonction professionnelle de la personne. Exemple : "Directeur commercial", "Médecin", etc.
-
-        ### Téléphone (optionnel)
-        Le numéro de téléphone, de préférence mobile. L'application ajoute automatiquement l'indicatif français (+33)
-        si nécessaire et formate correctement le numéro.
-
-        ### Email (optionnel)
-        L'adresse email de contact.
+    Args:
+        statistiques: Mesures remplies par le convertisseur
+    """
+    with st.expander("Statistiques de conversion", expanded=True):
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Lignes lues", statistiques.lignes_lues)
+        col2.metric("Fiches émises", statistiques.fiches_emises)
+        col3.metric("Lignes ignorées (sans nom)", statistiques.lignes_ignorees)
+        col4.metric("Durée totale", f"{statistiques.duree_totale * 1000:.1f} ms")
+
+        st.table([
+            {
+                "Étape": LIBELLES_ETAPES[etape],
+                "Durée (ms)": f"{duree * 1000:.1f}",
+                "Part": f"{duree / statistiques.duree_totale:.0%}" if statistiques.duree_totale else "-",
+            }
+            for etape, duree in statistiques.durees.items()
+        ])
+        st.table([
+            {
+                "Cache": nom,
+                "Succès": cache["succes"],
+                "Échecs": cache["echecs"],
+                "Taux de succès": "-" if taux is None else f"{taux:.0%}",
+            }
+            for nom, cache, taux in ((nom, cache, statistiques.taux_cache(nom))
+                                     for nom, cache in statistiques.caches.items())
+        ])
+
+
+def lire_apercu_vcf(fichier: IO[bytes], taille_max: int = TAILLE_APERCU_VCF) -> Tuple[str, bool]:
+    """
+    Lit le début d'un VCF pour l'aperçu de débogage, coupé après la dernière fiche complète.
 
-        ### Adresse (optionnel)
-        L'adresse postale complète.
+    Args:
+        fichier: Fichier VCF ouvert en lecture binaire (relu depuis le début)
+        taille_max: Nombre maximal d'octets lus
 
-        ### Agent/Agence (optionnel)
-        Le nom de l'agent ou de l'agence associée au contact.
+    Returns:
+        (texte de l'aperçu, True si le fichier a été tronqué)
+    """
+    fichier.seek(0)
+    debut = fichier.read(taille_max + 1)
+    if len(debut) <= taille_max:
+        return debut.decode('utf-8', errors='replace'), False
+    debut = debut[:taille_max]
+    fin_fiche = debut.rfind(b"END:VCARD\n")
+    if fin_fiche >= 0:
+        debut = debut[:fin_fiche + len(b"END:VCARD\n")]
+    return debut.decode('utf-8', errors='replace'), True
+
+
+def bouton_telechargement(libelle: str, fichier: IO[bytes], nom_fichier: str, type_mime: str) -> None:
+    """
+    Affiche un bouton de téléchargement servi depuis un fichier temporaire.
 
-        ### Mots clé (optionnel)
-        Tags ou catégories pour classer le contact. Plusieurs mots clés peuvent être séparés par des virgules.
+    Le fichier n'est lu qu'au clic (données différées de `st.download_button`) : tant que personne ne
+    télécharge, aucun format n'est en mémoire, et un clic ne charge que le fichier demandé. Le fichier
+    doit rester ouvert jusqu'à la réexécution suivante de la page (voir `liberer_fichiers_telechargement`).
+    Le clic ne réexécute pas la page : les autres boutons restent disponibles.
+    """
+    fichier.flush()
 
-        ### Relation (optionnel)
-        Type de relation avec le contact (ami, collègue, famille, etc.)
+    def lire() -> bytes:
+        # Appelé dans un autre fil que la page, qui ne touche plus au fichier une fois les boutons affichés
+        with open(fichier.fileno(), 'rb', closefd=False) as lecture:
+            lecture.seek(0)
+            return lecture.read()
 
-        ## Note commune
-        Vous pouvez également ajouter une note commune qui sera ajoutée à tous les contacts.
-        """)
+    st.download_button(label=libelle, data=lire, file_name=nom_fichier, mime=type_mime, on_click="ignore")
 
 
-def suggerer_colonnes(colonnes_disponibles: List[str]) -> Dict[str, str]:
+def liberer_fichiers_telechargement() -> None:
     """
-    Suggère automatiquement les mappings de colonnes en fonction des colonnes disponibles.
+    Ferme, donc supprime, les fichiers temporaires de la conversion précédente. Toute réexécution de la
+    page fait disparaître leurs boutons de téléchargement : ils ne servent plus.
+    """
+    for fichier in st.session_state.pop('fichiers_telechargement', ()):
+        fichier.close()
 
-    Args:
-        colonnes_disponibles: Liste des noms de colonnes disponibles dans le CSV
 
-    Returns:
-        Dictionnaire avec les types de champs et les noms de colonnes suggérés
+def enregistrer_dans_registre(colonnes: List[str], mappings: Dict[str, str], nom_fichier: str) -> None:
+    """
+    Enregistre une configuration dans le registre local, pour tous les fichiers qui ont le même en-tête.
+    Un registre inaccessible en écriture n'empêche pas la conversion : un avertissement est affiché.
     """
-    suggestions = {}
-    colonnes_suggérées = get_colonnes_suggérées()
+    try:
+        RegistreConfigurations().enregistrer(colonnes, mappings, nom_fichier)
+    except OSError as e:
+        st.warning(f"La configuration n'a pas pu être enregistrée dans le registre : {e}")
 
-    # Pour chaque type de champ, chercher la meilleure correspondance
-    for type_champ, noms_possibles in colonnes_suggérées.items():
-        colonne_correspondante = trouver_colonne_correspondante(colonnes_disponibles, noms_possibles)
-        if colonne_correspondante:
-            suggestions[type_champ] = colonne_correspondante
 
-    return suggestions
+def afficher_documentation_champs() -> None:
+    """
+    Affiche une documentation détaillée des champs utilisés dans le format VCF.
+    """
+    with st.expander("Documentation des champs"):
+        st.markdown(DOCUMENTATION_CHAMPS)
 
 
 def main() -> None:
     """Fonction principale de l'application Streamlit."""
+    configurer_page()
+    liberer_fichiers_telechargement()
 
     # Initialiser la session state pour les mappings de colonnes
     if 'mappings_colonnes' not in st.session_state:
@@ -473,66 +488,18 @@ def main() -> None:
         st.session_state.configurations_stockees = {}
     if 'config_sauvegardee' not in st.session_state:
         st.session_state.config_sauvegardee = False
-
-    # Fonction pour vérifier le décalage horaire
-    def verifier_decalage_horaire() -> None:
-        """Vérifie si l'heure affichée est décalée de plus de 2 minutes par rapport à l'heure actuelle."""
-        # Obtenir l'heure actuelle en UTC
-        heure_actuelle_utc = datetime.datetime.now(pytz.UTC)
-
-        # Obtenir l'heure de Paris (fuseau local)
-        fuseau_paris = pytz.timezone('Europe/Paris')
-        heure_paris = heure_actuelle_utc.astimezone(fuseau_paris)
-
-        # Formater pour affichage
-        heure_affichage = heure_paris.strftime(TIME_FORMAT)
-
-        # Stocker l'heure dans la session pour vérification ultérieure
-        if 'heure_derniere_verification' not in st.session_state:
-            st.session_state.heure_derniere_verification = heure_actuelle_utc
-
-        # Calculer le décalage
-        decalage = (heure_actuelle_utc - st.session_state.heure_derniere_verification).total_seconds()
-
-        # Afficher l'information de version et d'heure
-        col1, col2 = st.columns([3, 1])
-        with col1:
-            st.markdown(f"**Version {APP_VERSION}** - Créée le {DATE_CREATION}")
-            st.markdown(f"Heure du serveur: **{heure_affichage}**")
-
-        # Vérifier si le décalage est important (plus de 2 minutes = 120 secondes)
-        if abs(decalage) > 120:
-            with col2:
-                st.warning(f"⚠️ Décalage détecté: {int(abs(decalage)//60)} min {int(abs(decalage)%60)} sec")
-
-        # Mettre à jour l'heure de référence
-        st.session_state.heure_derniere_verification = heure_actuelle_utc
+    if 'registre_a_consulter' not in st.session_state:
+        st.session_state.registre_a_consulter = False
 
     # Vérifier le décalage horaire
     verifier_decalage_horaire()
 
     # Titre et introduction
     st.title("Convertisseur CSV vers VCF - V2")
-    st.markdown("""
-    Application développée par Michel Safars pour Romain, futur grand réalisateur de cinéma.
-
-    Cette application convertit votre fichier CSV en carnet d'adresses au format VCF (vCard), compatible avec tous les appareils et applications de contacts.
-    """)
+    st.markdown(TEXTE_INTRODUCTION)
 
     # Expliquer le fonctionnement
-    st.markdown("""
-    ### ℹ️ Mode d'emploi
-
-    **Voici comment utiliser cette application :**
-
-    1ère étape ➡️ **Importez votre fichier CSV** contenant les contacts
-
-    2ème étape ➡️ **Configurez les correspondances de colonnes**
-       - Option rapide : Utilisez le bouton "Configuration par défaut"
-       - Option personnalisée : Associez manuellement vos colonnes
-
-    3ème étape ➡️ **Convertissez et téléchargez** le fichier VCF généré
-    """)
+    st.markdown(TEXTE_MODE_EMPLOI)
 
 
     # Séparateur
@@ -555,50 +522,44 @@ def main() -> None:
                 st.success("Configuration importée avec succès !")
 
     if uploaded_file is not None:
-        # Lecture du contenu du fichier
-        contenu_csv = uploaded_file.getvalue().decode('utf-8-sig')
-
         # Si le fichier a changé, réinitialiser les mappings sauf si une config a été importée
         if st.session_state.fichier_actuel != uploaded_file.name and not uploaded_config:
             st.session_state.fichier_actuel = uploaded_file.name
             # Réinitialiser le flag de sauvegarde de configuration
             st.session_state.config_sauvegardee = False
 
-            # Vérifier si on a une configuration stockée pour ce fichier
+            # Vérifier si on a une configuration stockée pour ce fichier, sinon consulter le registre
+            # dès que les colonnes sont connues
             if uploaded_file.name in st.session_state.configurations_stockees:
                 st.session_state.mappings_colonnes = st.session_state.configurations_stockees[uploaded_file.name]
+            else:
+                st.session_state.registre_a_consulter = True
+
+        # Détection du format sur le début du fichier : le délimiteur détecté est présélectionné
+        empreinte = empreinte_fichier(uploaded_file)
+        format_csv = detecter_format_csv(uploaded_file.getvalue(), empreinte)
+        st.caption(f"Format détecté : {format_csv.description()}")
 
-        # Détection du délimiteur
         délimiteur = st.selectbox(
             "Sélectionnez le délimiteur utilisé dans votre fichier",
-            options=[';', ',', '\t'],
-            index=0,
-            format_func=lambda x: "Point-virgule (;)" if x == ';' else "Virgule (,)" if x == ',' else "Tabulation (\\t)"
+            options=OPTIONS_DELIMITEUR,
+            index=OPTIONS_DELIMITEUR.index(format_csv.delimiteur) if format_csv.delimiteur in OPTIONS_DELIMITEUR else 0,
+            format_func=lambda x: NOMS_DELIMITEUR.get(x, x)
         )
 
-        # Visualisation du CSV
+        # Visualisation du CSV (analyse mise en cache : rien n'est relu tant que le fichier et le délimiteur
+        # ne changent pas)
         try:
-            csv_buffer = io.StringIO(contenu_csv)
-            lecteur = csv.DictReader(csv_buffer, delimiter=délimiteur)
-            colonnes = lecteur.fieldnames
+            analyse = analyser_csv(uploaded_file.getvalue(), empreinte, délimiteur,
+                                   format_csv.encodage, format_csv.guillemet)
+            colonnes = analyse["colonnes"]
 
             if colonnes:
                 st.session_state.colonnes_disponibles = colonnes
                 st.success(f"Colonnes détectées : {', '.join(colonnes)}")
 
                 # Prévisualisation du CSV
-                try:
-                    csv_buffer.seek(0)  # Remettre le curseur au début
-                    df_preview = []
-                    for i, row in enumerate(csv.DictReader(csv_buffer, delimiter=délimiteur)):
-                        if i < 5:  # Limiter à 5 lignes pour la prévisualisation
-                            df_preview.append(row)
-                        else:
-                            break
-                except Exception as e:
-                    st.error(f"Erreur lors de la prévisualisation : {str(e)}")
-                    df_preview = []
-
+                df_preview = analyse["apercu"]
                 if df_preview:
                     st.subheader("Aperçu des données (5 premières lignes)")
                     st.table(df_preview)
@@ -606,27 +567,24 @@ def main() -> None:
                 # Configuration des mappings de colonnes
                 st.subheader("Configuration des champs")
 
+                # Même disposition de colonnes qu'un fichier déjà configuré : configuration reprise du registre
+                if st.session_state.registre_a_consulter:
+                    st.session_state.registre_a_consulter = False
+                    mappings_registre = RegistreConfigurations().chercher(colonnes)
+                    if mappings_registre:
+                        st.session_state.mappings_colonnes = mappings_registre
+                        st.session_state.configurations_stockees[uploaded_file.name] = mappings_registre
+                        st.session_state.config_sauvegardee = True
+                        st.info("Configuration reprise du registre : ce fichier a les mêmes colonnes qu'un "
+                                "fichier déjà configuré.")
+
                 # Si aucun mapping existant, suggérer automatiquement
                 if not st.session_state.mappings_colonnes:
-                    st.session_state.mappings_colonnes = suggerer_colonnes(colonnes)
+                    st.session_state.mappings_colonnes = dict(analyse["suggestions"])
 
                 # Afficher la documentation des champs
                 afficher_documentation_champs()
 
-                # Créer une liste avec tous les champs et leur description
-                champs_descriptions = {
-                    'nom': "Nom et prénom (combiné)",
-                    'prenom': "Prénom",
-                    'nom_famille': "Nom de famille",
-                    'role': "Rôle/Fonction",
-                    'telephone': "Numéro de téléphone",
-                    'email': "Adresse email",
-                    'adresse': "Adresse postale",
-                    'agent': "Agent/Agence",
-                    'mots_cle': "Mots clé",
-                    'relation': "Relation"
-                }
-
                 # Afficher les configurations possibles
                 st.markdown("### Configuration des correspondances de colonnes")
 
@@ -650,7 +608,7 @@ def main() -> None:
                         # Afficher les mappings disponibles avec fond vert
                         st.markdown("<div style='background-color: #e6ffe6; padding: 10px; border-radius: 5px;'>", unsafe_allow_html=True)
                         st.markdown("**Mappings disponibles avec ce fichier :**")
-                        for champ, desc in champs_descriptions.items():
+                        for champ, desc in DESCRIPTIONS_CHAMPS.items():
                             if champ in mappings_valides:
                                 st.markdown(f"✅ **{desc}** ➡️ *{mappings_valides[champ]}*")
                             else:
@@ -669,6 +627,7 @@ def main() -> None:
                     if condition_bouton and st.button("Appliquer configuration par défaut"):
                         st.session_state.mappings_colonnes = mappings_valides
                         st.session_state.configurations_stockees[uploaded_file.name] = mappings_valides
+                        enregistrer_dans_registre(colonnes, mappings_valides, uploaded_file.name)
                         st.session_state.config_sauvegardee = True
                         st.success("✅ Configuration par défaut appliquée avec succès !")
 
@@ -686,7 +645,7 @@ def main() -> None:
                     colonnes_avec_vide = ['', 'Ne pas utiliser'] + colonnes
 
                     # Pour chaque type de champ, créer un sélecteur
-                    for champ, description in champs_descriptions.items():
+                    for champ, description in DESCRIPTIONS_CHAMPS.items():
                         # Déterminer l'index par défaut
                         default_index = 0
                         if champ in st.session_state.mappings_colonnes:
@@ -722,6 +681,7 @@ def main() -> None:
                             st.session_state.mappings_colonnes = nouveaux_mappings
                             # Stocker les mappings dans la session
                             st.session_state.configurations_stockees[uploaded_file.name] = nouveaux_mappings
+                            enregistrer_dans_registre(colonnes, nouveaux_mappings, uploaded_file.name)
                             st.session_state.config_sauvegardee = True
                             st.success("Configuration enregistrée avec succès !")
 
@@ -745,8 +705,50 @@ def main() -> None:
             help="Cette note sera ajoutée à tous les contacts"
         )
 
-        # Case à cocher pour le débogage - placée au niveau de la conversion pour être accessible
-        debug_mode = st.checkbox("Afficher le contenu brut du fichier VCF (mode débogage)", value=False)
+        # Pays appliqué aux numéros saisis sans indicatif international
+        pays_telephone = st.selectbox(
+            "Pays par défaut des numéros de téléphone",
+            options=PAYS_CODES,
+            index=PAYS_CODES.index(PAYS_PAR_DEFAUT),
+            format_func=lambda code: f"{code} (+{REGLES_PAYS[code].indicatif})",
+            help="Indicatif ajouté aux numéros qui ne commencent ni par + ni par 00"
+        )
+
+        fusion_mode = st.checkbox(
+            "Fusionner les contacts en double",
+            value=False,
+            help="Les lignes qui partagent un email, un téléphone ou un nom (sans accents ni majuscules) "
+                 "donnent une seule fiche avec tous leurs numéros, emails et mots-clés"
+        )
+
+        uid_mode = st.checkbox(
+            "Ajouter un identifiant (UID) et une date de révision (REV) à chaque fiche",
+            value=False,
+            help="Un même contact garde le même UID d'une conversion à l'autre : le carnet d'adresses "
+                 "met à jour la fiche existante au lieu de la dupliquer"
+        )
+        colonnes_uid = None
+        if uid_mode:
+            colonnes_uid = tuple(st.multiselect(
+                "Colonnes qui identifient un contact",
+                options=st.session_state.colonnes_disponibles,
+                help="Par exemple un identifiant interne ou l'email. Sans colonne choisie, l'UID est calculé "
+                     "à partir du nom et du prénom (sans accents ni majuscules)"
+            ))
+
+        formats_supplementaires = st.multiselect(
+            "Autres formats à produire en même temps que le VCF",
+            options=list(LIBELLES_FORMATS),
+            format_func=LIBELLES_FORMATS.get,
+            help="Le CSV n'est lu qu'une fois : chaque contact est écrit dans tous les formats choisis"
+        )
+
+        # Cases à cocher pour le débogage - placées au niveau de la conversion pour être accessibles
+        col_debug, col_stats = st.columns(2)
+        with col_debug:
+            debug_mode = st.checkbox("Afficher le contenu brut du fichier VCF (mode débogage)", value=False)
+        with col_stats:
+            mesure_mode = st.checkbox("Mesurer la conversion (temps par étape, caches)", value=False)
 
         # Bouton de conversion
         if st.button("Convertir en VCF"):
@@ -759,28 +761,80 @@ def main() -> None:
                 st.error("Veuillez configurer correctement les champs avant de convertir.")
             else:
                 with st.spinner("Conversion en cours..."):
-                    # Convertir le fichier avec les mappings configurés
-                    vcf_content = convertir_csv_en_vcf(contenu_csv, st.session_state.mappings_colonnes, note_commune, délimiteur)
-
-                if vcf_content:
+                    # Convertir le fichier avec les mappings configurés, en lisant l'upload en flux et en
+                    # écrivant les fiches en UTF-8 dans des fichiers temporaires sur disque : la session ne
+                    # garde pas le VCF en mémoire. Les fichiers restent ouverts pour les téléchargements
+                    # jusqu'à la réexécution suivante, et sont supprimés à leur fermeture
+                    import tempfile  # importé à la première conversion seulement
+                    fichier_vcf = tempfile.TemporaryFile()
+                    # Les mesures ne portent que sur la conversion en VCF seul
+                    statistiques = StatistiquesConversion() if mesure_mode and not formats_supplementaires else None
+                    fichiers_formats = {nom_format: tempfile.TemporaryFile() for nom_format in formats_supplementaires}
+                    st.session_state.fichiers_telechargement = [fichier_vcf, *fichiers_formats.values()]
+                    uploaded_file.seek(0)
+                    flux_csv = io.TextIOWrapper(uploaded_file, encoding=format_csv.encodage, newline='')
+                    flux_vcf = io.TextIOWrapper(fichier_vcf, encoding='utf-8', newline='')
+                    flux_formats = {nom_format: io.TextIOWrapper(fichier, encoding='utf-8', newline='')
+                                    for nom_format, fichier in fichiers_formats.items()}
+                    options = dict(pays_telephone=pays_telephone, guillemet=format_csv.guillemet,
+                                   fusionner_doublons=fusion_mode, colonnes_uid=colonnes_uid,
+                                   revision=horodatage_revision() if uid_mode else None)
+                    nb_fiches = 0
+                    # Une erreur en cours de route laisse des fiches dans les fichiers : rien n'est alors proposé
+                    conversion_terminee = False
+                    try:
+                        if formats_supplementaires:
+                            nb_fiches = ecrire_contacts(flux_csv, {"vcard3": flux_vcf, **flux_formats},
+                                                        st.session_state.mappings_colonnes, note_commune,
+                                                        délimiteur, **options)
+                        else:
+                            nb_fiches = ecrire_vcf(flux_csv, flux_vcf, st.session_state.mappings_colonnes,
+                                                   note_commune, délimiteur, statistiques=statistiques, **options)
+                        for flux in (flux_vcf, *flux_formats.values()):
+                            flux.flush()
+                        conversion_terminee = True
+                    except Exception as e:
+                        st.error(f"Une erreur s'est produite : {str(e)}")
+                    finally:
+                        # Détacher les enveloppes texte pour ne pas fermer les fichiers sous-jacents
+                        for flux in (flux_csv, flux_vcf, *flux_formats.values()):
+                            flux.detach()
+
+                if conversion_terminee and fichier_vcf.tell():
                     # Créer un nom de fichier de sortie
                     nom_fichier_base = os.path.splitext(uploaded_file.name)[0]
                     nom_fichier_vcf = f"{nom_fichier_base}.vcf"
 
+                    # Début du VCF lu avant d'afficher les boutons : un téléchargement lit ensuite le fichier
+                    # dans un autre fil
+                    if debug_mode:
+                        apercu, tronque = lire_apercu_vcf(fichier_vcf)
+                        taille_mo = fichier_vcf.seek(0, os.SEEK_END) / 1_000_000
+
                     # Créer un bouton de téléchargement
                     download_link = f"[Télécharger le fichier VCF]({nom_fichier_vcf})"
-                    st.download_button(
-                        label="Télécharger le fichier VCF",
-                        data=vcf_content,
-                        file_name=nom_fichier_vcf,
-                        mime="text/vcard"
-                    )
+                    bouton_telechargement("Télécharger le fichier VCF", fichier_vcf, nom_fichier_vcf,
+                                          "text/vcard")
                     st.markdown(download_link, unsafe_allow_html=True)
 
-                    # Afficher le contenu brut du fichier VCF si le mode débogage est activé
+                    for nom_format, fichier in fichiers_formats.items():
+                        ecrivain = FORMATS_SORTIE[nom_format]
+                        extension = ".vcard4.vcf" if nom_format == "vcard4" else ecrivain.extension
+                        bouton_telechargement(f"Télécharger le fichier {LIBELLES_FORMATS[nom_format]}", fichier,
+                                              f"{nom_fichier_base}{extension}", ecrivain.type_mime)
+
+                    # Afficher le début du fichier VCF si le mode débogage est activé
                     if debug_mode:
                         st.subheader("Contenu brut du fichier VCF (débogage)")
-                        st.text(vcf_content)
+                        if tronque:
+                            st.caption(f"Aperçu limité aux {apercu.count('BEGIN:VCARD')} premières fiches sur "
+                                       f"{nb_fiches} ; le fichier complet fait {taille_mo:.1f} Mo")
+                        st.text(apercu)
+
+                    if statistiques is not None:
+                        afficher_statistiques(statistiques)
+                    elif mesure_mode:
+                        st.info("Les mesures ne sont disponibles que pour une conversion en VCF seul.")
 
                     # Instructions pour l'importation
                     with st.expander("Instructions pour importer le fichier dans l'application Contacts"):
@@ -791,6 +845,7 @@ def main() -> None:
                         3. Dans le menu Fichier, sélectionnez Importer
                         """)
                 else:
+                    liberer_fichiers_telechargement()
                     st.error("La conversion a échoué. Veuillez vérifier votre fichier CSV.")
 
 
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""
+Mesure la suggestion des correspondances de colonnes sur un en-tête d'export ERP (quelques colonnes de
+contact parmi des centaines d'autres), avec et sans correspondance approchée.
+
+Usage :
+    python benchmarks/bench_colonnes.py --colonnes 200 --repetitions 200
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+
+from convertisseur.colonnes import suggerer_colonnes  # noqa: E402
+
+# Colonnes de contact telles qu'on les trouve dans les exports : casse, accents, ponctuation et fautes
+COLONNES_CONTACT = ["NOM SALARIE", "Prénom salarié", "TÉL.", "E-mail pro", "Adresse domicile", "Fonction exercée",
+                    "Manager direct", "Mots-cles", "Telephnoe portable"]
+
+
+def entete_erp(nb_colonnes: int, graine: int = 42) -> list:
+    """En-tête de `nb_colonnes` colonnes, dont les colonnes de contact à des positions tirées au hasard."""
+    aleatoire = random.Random(graine)
+    entete = [f"{aleatoire.choice(['Code', 'Date', 'Montant', 'Libellé', 'Statut'])} {i}"
+              for i in range(nb_colonnes - len(COLONNES_CONTACT))]
+    for colonne in COLONNES_CONTACT:
+        entete.insert(aleatoire.randrange(len(entete) + 1), colonne)
+    return entete
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--colonnes", type=int, default=200, help="Nombre de colonnes de l'en-tête")
+    parser.add_argument("--repetitions", type=int, default=200, help="Nombre de suggestions mesurées")
+    args = parser.parse_args()
+
+    entete = entete_erp(args.colonnes)
+    for approchee in (False, True):
+        debut = time.perf_counter()
+        for _ in range(args.repetitions):
+            suggestions = suggerer_colonnes(entete, approchee=approchee)
+        duree = (time.perf_counter() - debut) / args.repetitions
+        libelle = "approchée" if approchee else "normalisée"
+        print(f"{libelle:>10} : {duree * 1000:.2f} ms par en-tête de {len(entete)} colonnes, "
+              f"{len(suggestions)} champ(s) trouvé(s)")
+    for type_champ, colonne in suggestions.items():
+        print(f"  {type_champ:<12} <- {colonne}")
+
+
+if __name__ == "__main__":
+    main()
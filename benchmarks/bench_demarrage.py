@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+Mesure le démarrage : import à froid du cœur de conversion et du lanceur V1_2, dans des processus neufs,
+puis, si Streamlit est installé, premier affichage de l'application V2 et durée d'une réexécution du
+script (ce que coûte chaque clic ou saisie dans la page).
+
+Usage :
+    python benchmarks/bench_demarrage.py --repetitions 10
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import List
+
+_DOSSIER = os.path.dirname(os.path.abspath(__file__))
+_RACINE = os.path.normpath(os.path.join(_DOSSIER, os.pardir))
+
+# Import mesuré -> dossier ajouté au chemin d'import
+IMPORTS = {
+    "convertisseur": os.path.join(_RACINE, "src"),
+    "utils": os.path.join(_RACINE, "V1_2"),
+}
+
+CHEMIN_APP = os.path.join(_RACINE, "V2", "app.py")
+
+
+def duree_import(module: str, dossier: str) -> float:
+    """
+    Durée, en secondes, de l'import de `module` dans un interpréteur neuf qui a `dossier` dans son chemin
+    d'import. L'import est chronométré dans l'interpréteur lui-même : son démarrage n'est pas compté.
+    """
+    code = f"import time; debut = time.perf_counter(); import {module}; print(time.perf_counter() - debut)"
+    sortie = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True,
+                            env={**os.environ, "PYTHONPATH": dossier})
+    return float(sortie.stdout.split()[-1])
+
+
+def mediane_ms(durees: List[float]) -> str:
+    """Médiane et extrêmes d'une série de durées, en millisecondes."""
+    return (f"{statistics.median(durees) * 1000:7.1f} ms (min {min(durees) * 1000:.1f}, "
+            f"max {max(durees) * 1000:.1f})")
+
+
+def mesurer_imports(repetitions: int) -> None:
+    """Import à froid de chaque module, chacun dans un processus neuf."""
+    for module, dossier in IMPORTS.items():
+        durees = [duree_import(module, dossier) for _ in range(repetitions)]
+        print(f"{'import ' + module:>20} : {mediane_ms(durees)}")
+
+
+def mesurer_application(repetitions: int) -> None:
+    """Premier affichage de l'application V2, puis réexécutions du script sans changement dans la page."""
+    try:
+        from streamlit.testing.v1 import AppTest
+    except ImportError:
+        print("Streamlit n'est pas installé : mesure de l'application V2 ignorée")
+        return
+
+    debut = time.perf_counter()
+    application = AppTest.from_file(CHEMIN_APP, default_timeout=60).run()
+    print(f"{'premier affichage':>20} : {(time.perf_counter() - debut) * 1000:7.1f} ms")
+    if application.exception:
+        print(f"L'application a levé une exception : {application.exception[0].message}")
+        return
+    durees = []
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        application.run()
+        durees.append(time.perf_counter() - debut)
+    print(f"{'réexécution':>20} : {mediane_ms(durees)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repetitions", type=int, default=10, help="Nombre de mesures de chaque durée")
+    args = parser.parse_args()
+
+    mesurer_imports(args.repetitions)
+    mesurer_application(args.repetitions)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""
+Compare la boucle de conversion historique (csv.DictReader, fonction redéfinie à chaque ligne)
+au plan de conversion compilé de `convertisseur.plan`.
+
+Usage :
+    python benchmarks/bench_plan.py --lignes 200000
+"""
+
+import argparse
+import csv
+import io
+import os
+import random
+import sys
+import time
+from typing import Dict, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+
+from convertisseur import convertir_csv_en_vcf, formater_nom, separer_prenom_nom  # noqa: E402
+from convertisseur.echappement import echapper  # noqa: E402
+
+PRENOMS = ["Lucas", "Noham", "Théo", "Yousra", "Marie-France", "Jean Pierre", "Élodie", "Zoé"]
+NOMS = ["ENGLANDER", "EDJE", "HELLERMANN", "EL ABDELLAOUI", "de la TOUR", "MARTIN", "DUPONT"]
+ROLES = ["Réalisateur", "Productrice", "Chef op", "Scripte", "1er assistant", "Régisseur"]
+
+
+def generer_csv(nb_lignes: int, graine: int = 42) -> str:
+    """Génère un CSV de test au format des feuilles de service (colonne combinée Prénom Nom)."""
+    aleatoire = random.Random(graine)
+    lignes = ["Role;Prénom Nom;Téléphone;Mail;Adresse;Agent"]
+    for i in range(nb_lignes):
+        lignes.append(";".join([
+            aleatoire.choice(ROLES),
+            f"{aleatoire.choice(PRENOMS)} {aleatoire.choice(NOMS)}",
+            f"0{aleatoire.randint(6, 7)}." + ".".join(str(aleatoire.randint(10, 99)) for _ in range(4)),
+            f"contact{i}@exemple.fr",
+            "" if i % 3 else f"{i} rue de la Paix, Paris",
+            "" if i % 4 else "Agence Adéquat",
+        ]))
+    return "\n".join(lignes) + "\n"
+
+
+def convertir_historique(contenu_csv: str, mappings_colonnes: Dict[str, str],
+                         note_commune: Optional[str] = None) -> str:
+    """
+    Boucle de conversion telle qu'écrite avant le plan compilé (référence de comparaison), avec
+    l'échappement RFC 6350 des valeurs texte que le plan applique depuis.
+    """
+    vcf_buffer = io.StringIO()
+    lecteur = csv.DictReader(io.StringIO(contenu_csv), delimiter=';')
+    colonnes_disponibles = lecteur.fieldnames
+    prenom_nom_colonne = mappings_colonnes.get('nom')
+    prenom_colonne = mappings_colonnes.get('prenom')
+    nom_famille_colonne = mappings_colonnes.get('nom_famille')
+    role_colonne = mappings_colonnes.get('role')
+    tel_colonne = mappings_colonnes.get('telephone')
+    email_colonne = mappings_colonnes.get('email')
+    adresse_colonne = mappings_colonnes.get('adresse')
+    agent_colonne = mappings_colonnes.get('agent')
+
+    for contact in lecteur:
+        def get_safe_value(key: Optional[str]) -> str:
+            if not key:
+                return ""
+            value = contact.get(key, "")
+            return str(value).strip() if value is not None else ""
+
+        role = echapper(get_safe_value(role_colonne))
+        telephone = get_safe_value(tel_colonne)
+        email = echapper(get_safe_value(email_colonne))
+        adresse = echapper(get_safe_value(adresse_colonne))
+        agent = echapper(get_safe_value(agent_colonne))
+
+        if prenom_nom_colonne and prenom_nom_colonne in colonnes_disponibles:
+            prenom_nom = get_safe_value(prenom_nom_colonne)
+            if not prenom_nom:
+                continue
+            prenom, nom = separer_prenom_nom(prenom_nom)
+        else:
+            prenom = formater_nom(get_safe_value(prenom_colonne))
+            nom = formater_nom(get_safe_value(nom_famille_colonne), conserver_majuscules=True)
+            if not prenom and not nom:
+                continue
+
+        vcf_buffer.write("BEGIN:VCARD\n")
+        vcf_buffer.write("VERSION:3.0\n")
+        vcf_buffer.write(f"N:{nom};{prenom};;;\n")
+        vcf_buffer.write(f"FN:{prenom} {nom}\n")
+        if role:
+            vcf_buffer.write(f"TITLE:{role}\n")
+        if agent:
+            vcf_buffer.write(f"RELATED;type=agent:{agent}\n")
+        if telephone:
+            if not telephone.startswith('+'):
+                if telephone.startswith('0'):
+                    telephone = f"+33{telephone[1:]}"
+                else:
+                    telephone = f"+33{telephone}"
+            telephone = telephone.replace(' ', '').replace('.', '')
+            vcf_buffer.write(f"TEL;TYPE=CELL:{telephone}\n")
+        if email:
+            vcf_buffer.write(f"EMAIL;TYPE=INTERNET:{email}\n")
+        if adresse:
+            vcf_buffer.write(f"ADR;TYPE=HOME:;;{adresse};;;;\n")
+        if note_commune:
+            vcf_buffer.write(f"NOTE:{echapper(note_commune)}\n")
+        vcf_buffer.write("END:VCARD\n\n")
+
+    return vcf_buffer.getvalue()
+
+
+def chronometrer(fonction, repetitions: int) -> float:
+    """Renvoie la meilleure durée (en secondes) sur plusieurs exécutions."""
+    meilleure = float("inf")
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        fonction()
+        meilleure = min(meilleure, time.perf_counter() - debut)
+    return meilleure
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lignes", type=int, default=100_000, help="Nombre de lignes du CSV généré")
+    parser.add_argument("--repetitions", type=int, default=3, help="Nombre d'exécutions (la meilleure est gardée)")
+    args = parser.parse_args()
+
+    contenu_csv = generer_csv(args.lignes)
+    mappings = {'nom': "Prénom Nom", 'role': "Role", 'telephone': "Téléphone", 'email': "Mail",
+                'adresse': "Adresse", 'agent': "Agent"}
+
+    historique = convertir_historique(contenu_csv, mappings, "Tournage")
+    if historique != convertir_csv_en_vcf(contenu_csv, mappings, "Tournage"):
+        sys.exit("Les deux implémentations ne produisent pas le même VCF.")
+
+    duree_historique = chronometrer(lambda: convertir_historique(contenu_csv, mappings, "Tournage"), args.repetitions)
+    duree_plan = chronometrer(lambda: convertir_csv_en_vcf(contenu_csv, mappings, "Tournage"), args.repetitions)
+
+    print(f"{args.lignes} lignes, meilleure de {args.repetitions} exécutions")
+    print(f"  boucle historique : {duree_historique:.3f} s ({args.lignes / duree_historique:,.0f} lignes/s)")
+    print(f"  plan compilé      : {duree_plan:.3f} s ({args.lignes / duree_plan:,.0f} lignes/s)")
+    print(f"  accélération      : x{duree_historique / duree_plan:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+Compare la lecture en flux (csv.reader, toutes les colonnes décodées) à la lecture projetée en mémoire
+(mmap, seules les colonnes utilisées décodées) sur un export large écrit dans un fichier temporaire.
+
+Usage :
+    python benchmarks/bench_projection.py --lignes 200000 --colonnes 40
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+
+from convertisseur import generer_cartes_vcf  # noqa: E402
+
+PRENOMS = ["Lucas", "Noham", "Théo", "Yousra", "Marie-France", "Jean Pierre", "Élodie", "Zoé"]
+NOMS = ["ENGLANDER", "EDJE", "HELLERMANN", "EL ABDELLAOUI", "de la TOUR", "MARTIN", "DUPONT"]
+
+
+def ecrire_csv_large(chemin: str, nb_lignes: int, nb_colonnes: int, graine: int = 42) -> None:
+    """Écrit un export large : 4 colonnes utiles réparties parmi `nb_colonnes` colonnes remplies."""
+    aleatoire = random.Random(graine)
+    colonnes = [f"Champ {i}" for i in range(nb_colonnes)]
+    colonnes[1], colonnes[nb_colonnes // 3], colonnes[nb_colonnes // 2], colonnes[-2] = (
+        "Prénom Nom", "Téléphone", "Mail", "Role")
+    with open(chemin, "w", encoding="utf-8", newline="") as fichier:
+        fichier.write(";".join(colonnes) + "\n")
+        for i in range(nb_lignes):
+            valeurs = [f"valeur {i}-{j} inutilisée" for j in range(nb_colonnes)]
+            valeurs[1] = f"{aleatoire.choice(PRENOMS)} {aleatoire.choice(NOMS)}"
+            valeurs[nb_colonnes // 3] = f"06 {aleatoire.randint(10, 99)} {aleatoire.randint(10, 99)} 00 00"
+            valeurs[nb_colonnes // 2] = f"contact{i}@exemple.fr"
+            valeurs[-2] = "Régisseur"
+            fichier.write(";".join(valeurs) + "\n")
+
+
+def chronometrer(fonction, repetitions: int) -> float:
+    """Renvoie la meilleure durée (en secondes) sur plusieurs exécutions."""
+    meilleure = float("inf")
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        fonction()
+        meilleure = min(meilleure, time.perf_counter() - debut)
+    return meilleure
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lignes", type=int, default=200_000, help="Nombre de lignes du CSV généré")
+    parser.add_argument("--colonnes", type=int, default=40, help="Nombre de colonnes du CSV généré")
+    parser.add_argument("--repetitions", type=int, default=3, help="Nombre d'exécutions (la meilleure est gardée)")
+    args = parser.parse_args()
+
+    mappings = {'nom': "Prénom Nom", 'telephone': "Téléphone", 'email': "Mail", 'role': "Role"}
+    with tempfile.TemporaryDirectory() as dossier:
+        chemin = os.path.join(dossier, "export_large.csv")
+        ecrire_csv_large(chemin, args.lignes, args.colonnes)
+        taille = os.path.getsize(chemin)
+
+        def convertir(projection: bool) -> int:
+            return sum(1 for _ in generer_cartes_vcf(chemin, mappings, projection=projection))
+
+        if list(generer_cartes_vcf(chemin, mappings)) != list(generer_cartes_vcf(chemin, mappings, projection=True)):
+            sys.exit("Les deux lectures ne produisent pas le même VCF.")
+
+        duree_flux = chronometrer(lambda: convertir(False), args.repetitions)
+        duree_projection = chronometrer(lambda: convertir(True), args.repetitions)
+
+    print(f"{args.lignes} lignes x {args.colonnes} colonnes ({taille / 1_000_000:.1f} Mo), "
+          f"meilleure de {args.repetitions} exécutions")
+    print(f"  lecture en flux  : {duree_flux:.3f} s ({args.lignes / duree_flux:,.0f} lignes/s)")
+    print(f"  lecture projetée : {duree_projection:.3f} s ({args.lignes / duree_projection:,.0f} lignes/s)")
+    print(f"  accélération     : x{duree_flux / duree_projection:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+Mesure la mémoire gardée par contact selon la représentation d'un lot : un dictionnaire par ligne
+(csv.DictReader, toutes les colonnes), un tuple par contact (valeurs des champs du plan) ou une table en
+colonnes (`TableContacts`), puis chronomètre la fusion des doublons, qui garde tout le lot en mémoire.
+
+Usage :
+    python benchmarks/bench_table.py --lignes 100000 --colonnes 40
+"""
+
+import argparse
+import csv
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+_DOSSIER = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(_DOSSIER, os.pardir, "src"))
+sys.path.insert(0, _DOSSIER)
+
+from bench_projection import ecrire_csv_large  # noqa: E402
+from convertisseur import TableContacts, generer_cartes_fusionnees  # noqa: E402
+from convertisseur.plan import PlanConversion  # noqa: E402
+
+
+def memoire_gardee(construire) -> int:
+    """Octets encore alloués après `construire()`, tant que son résultat est gardé."""
+    tracemalloc.start()
+    resultat = construire()
+    taille, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del resultat
+    return taille
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lignes", type=int, default=100_000, help="Nombre de lignes du CSV généré")
+    parser.add_argument("--colonnes", type=int, default=40, help="Nombre de colonnes du CSV généré")
+    args = parser.parse_args()
+
+    mappings = {'nom': "Prénom Nom", 'telephone': "Téléphone", 'email': "Mail", 'role': "Role"}
+    with tempfile.TemporaryDirectory() as dossier:
+        chemin = os.path.join(dossier, "export_large.csv")
+        ecrire_csv_large(chemin, args.lignes, args.colonnes)
+        with open(chemin, encoding="utf-8", newline="") as fichier:
+            lignes = list(csv.reader(fichier, delimiter=";"))
+        plan = PlanConversion(lignes[0], mappings)
+
+        def dictionnaires():
+            with open(chemin, encoding="utf-8", newline="") as fichier:
+                return list(csv.DictReader(fichier, delimiter=";"))
+
+        def tuples():
+            return [contact for contact in map(plan.extraire, lignes[1:]) if contact is not None]
+
+        def table():
+            resultat = TableContacts(plan.types_champs)
+            for contact in map(plan.extraire, lignes[1:]):
+                if contact is not None:
+                    resultat.ajouter(*contact)
+            return resultat
+
+        # Les chaînes que le contact partage avec la ligne lue ne sont comptées que pour les dictionnaires
+        print(f"{args.lignes} lignes x {args.colonnes} colonnes, mémoire gardée par contact :")
+        for nom, construire in (("dictionnaire par ligne", dictionnaires), ("tuple par contact", tuples),
+                                ("table en colonnes", table)):
+            print(f"  {nom:<23}: {memoire_gardee(construire) / args.lignes:7.0f} octets")
+
+        debut = time.perf_counter()
+        nb_fiches = sum(1 for _ in generer_cartes_fusionnees(lignes[1:], plan))
+        duree = time.perf_counter() - debut
+    print(f"Fusion des doublons : {nb_fiches} fiches en {duree:.3f} s ({args.lignes / duree:,.0f} lignes/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+Mesure le débit de la normalisation des numéros de téléphone, avec et sans cache.
+
+L'objectif est de normaliser un million de numéros en nettement moins d'une seconde. Mesuré avec les
+valeurs par défaut (1 000 000 de numéros parmi 20 000 distincts, Python 3.11, un cœur) :
+- sans cache : 1,4 s (environ 700 000 numéros/s), 2,45 s sur une machine plus lente ;
+- avec le cache par défaut : 0,4 à 0,6 s (1,7 à 2,4 millions de numéros/s), 1,22 s sur la machine lente.
+L'objectif n'est donc tenu qu'avec le cache, quand les numéros se répètent comme dans les listes
+d'équipe ; sans cache, le coût est dominé par l'appel d'une méthode Python par numéro.
+
+Usage :
+    python benchmarks/bench_telephone.py --numeros 1000000 --distincts 20000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+
+from convertisseur.telephone import NormaliseurTelephone  # noqa: E402
+
+# Durée visée pour normaliser un million de numéros
+OBJECTIF_SECONDES = 1.0
+
+FORMATS = ["0{}.{}.{}.{}.{}", "0{} {} {} {} {}", "0{}-{}-{}-{}-{}", "+33 {} {} {} {} {}", "0033 {} {} {} {} {}",
+           "+33 (0){} {} {} {} {}"]
+
+
+def generer_numeros(nb: int, nb_distincts: int, graine: int = 42) -> list:
+    """Génère `nb` numéros dans des formats variés, tirés parmi `nb_distincts` numéros différents."""
+    aleatoire = random.Random(graine)
+    distincts = [
+        aleatoire.choice(FORMATS).format(aleatoire.randint(6, 7),
+                                         *(f"{aleatoire.randint(0, 99):02d}" for _ in range(4)))
+        for _ in range(nb_distincts)
+    ]
+    return [aleatoire.choice(distincts) for _ in range(nb)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--numeros", type=int, default=1_000_000, help="Nombre de numéros à normaliser")
+    parser.add_argument("--distincts", type=int, default=20_000, help="Nombre de numéros différents")
+    args = parser.parse_args()
+
+    numeros = generer_numeros(args.numeros, args.distincts)
+    for taille_cache in (0, 65536):
+        normaliseur = NormaliseurTelephone(taille_cache=taille_cache)
+        normaliser = normaliseur.normaliser
+        debut = time.perf_counter()
+        for numero in numeros:
+            normaliser(numero)
+        duree = time.perf_counter() - debut
+        libelle = "sans cache" if not taille_cache else f"cache {taille_cache}"
+        print(f"{libelle:>12} : {duree:.3f} s pour {args.numeros} numéros ({args.numeros / duree:,.0f} numéros/s)")
+        objectif = "atteint" if duree * 1_000_000 / args.numeros < OBJECTIF_SECONDES else "non atteint"
+        print(f"{'':>12}   objectif (< {OBJECTIF_SECONDES:.0f} s par million de numéros) : {objectif}")
+
+
+if __name__ == "__main__":
+    main()
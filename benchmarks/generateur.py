@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+Générateur reproductible de listes d'équipe de tournage synthétiques, au format des CSV du dossier data/.
+
+Les listes mêlent accents, noms composés, numéros dans des formats variés, cellules vides et adresses
+contenant le délimiteur (donc entre guillemets). Une même graine donne toujours le même fichier.
+
+Usage :
+    python benchmarks/generateur.py equipe.csv --lignes 100000 --noms-separes --delimiteur ","
+"""
+
+import argparse
+import csv
+import os
+import random
+import unicodedata
+from typing import Iterator, List
+
+PRENOMS = ["Lucas", "Noham", "Théo", "Yousra", "Marie-France", "Jean Pierre", "Élodie", "Zoé", "Loïc", "Anaïs",
+           "François", "Hélène", "Jérôme", "Maëlle", "Noël", "Agnès", "Raphaël", "Céline", "Grégory", "Inès"]
+NOMS = ["ENGLANDER", "EDJE", "HELLERMANN", "EL ABDELLAOUI", "de la TOUR", "Martin", "DUPONT", "Lefèvre",
+        "MÜLLER", "N'DIAYE", "Le Goff", "Guérin", "d'Alembert", "BEN SAÏD", "Roubin", "Meerson"]
+ROLES = ["Réalisateur", "Productrice", "Chef opérateur", "Scripte", "1er assistant réalisateur", "Régisseur",
+         "Cheffe costumière", "Ingénieur du son", "Perchman", "Chef électro", "Machiniste", "Maquilleuse",
+         "Directrice de production", "Comédien", "Comédienne", "Cascadeur"]
+AGENCES = ["Adéquat", "Agence Élan", "Artmédia", "UBBA", "Time Art", "Zelig"]
+RUES = ["rue de la Paix", "avenue Jean Jaurès", "boulevard Voltaire", "place de l'Église", "impasse des Lilas",
+        "rue du Faubourg Saint-Honoré"]
+VILLES = ["75011 Paris", "93100 Montreuil", "69003 Lyon", "13001 Marseille", "1000 Bruxelles"]
+MOTS_CLES = ["Technique", "Artistique", "Production", "Figuration", "Régie", "HMC"]
+FORMATS_TELEPHONE = ["0{}.{}.{}.{}.{}", "0{} {} {} {} {}", "0{}{}{}{}{}", "+33 {} {} {} {} {}", "0{}-{}-{}-{}-{}"]
+
+
+def _sans_accents(texte: str) -> str:
+    """Version ASCII d'un texte, pour fabriquer des adresses mail vraisemblables."""
+    decompose = unicodedata.normalize("NFKD", texte)
+    return "".join(c for c in decompose if c.isascii() and (c.isalnum() or c in "-.")).lower()
+
+
+def generer_lignes(nb_lignes: int, graine: int = 42, noms_separes: bool = False) -> Iterator[List[str]]:
+    """
+    Génère l'en-tête puis `nb_lignes` lignes d'une liste d'équipe.
+
+    Args:
+        nb_lignes: Nombre de lignes de données
+        graine: Graine du générateur aléatoire
+        noms_separes: Si True, colonnes "NOM" et "Prénom" séparées, sinon une colonne "Prénom Nom"
+
+    Yields:
+        Les valeurs de chaque ligne, en-tête compris
+    """
+    aleatoire = random.Random(graine)
+    choice, random_ = aleatoire.choice, aleatoire.random
+
+    if noms_separes:
+        yield ["Role", "NOM", "Prénom", "Téléphone", "Mail", "Adresse", "Agent", "Mots clé"]
+    else:
+        yield ["Role", "Prénom Nom", "Téléphone", "Mail", "Adresse", "Agent", "Mots clé"]
+
+    for i in range(nb_lignes):
+        prenom, nom = choice(PRENOMS), choice(NOMS)
+        # Quelques lignes sans nom (séparateurs de section dans les vraies listes) : elles sont ignorées
+        if random_() < 0.02:
+            prenom = nom = ""
+        chiffres = [str(aleatoire.randint(6, 7))] + [f"{aleatoire.randint(0, 99):02d}" for _ in range(4)]
+        telephone = choice(FORMATS_TELEPHONE).format(*chiffres) if random_() < 0.9 else ""
+        mail = f"{_sans_accents(prenom)}.{_sans_accents(nom)}{i}@exemple.fr" if prenom and random_() < 0.85 else ""
+        adresse = f"{aleatoire.randint(1, 120)}, {choice(RUES)}, {choice(VILLES)}" if random_() < 0.4 else ""
+        agent = f"{choice(PRENOMS)} {choice(NOMS)} - {choice(AGENCES)}" if random_() < 0.3 else ""
+        mots_cle = choice(MOTS_CLES) if random_() < 0.5 else ""
+        role = choice(ROLES) if random_() < 0.95 else ""
+
+        if noms_separes:
+            yield [role, nom, prenom, telephone, mail, adresse, agent, mots_cle]
+        else:
+            yield [role, f"{prenom} {nom}".strip(), telephone, mail, adresse, agent, mots_cle]
+
+
+def ecrire_liste_equipe(
+    chemin_csv: str,
+    nb_lignes: int,
+    *,
+    graine: int = 42,
+    noms_separes: bool = False,
+    delimiteur: str = ';',
+    encodage: str = 'utf-8-sig'
+) -> int:
+    """
+    Écrit une liste d'équipe synthétique dans un fichier CSV.
+
+    Args:
+        chemin_csv: Chemin du fichier à écrire
+        nb_lignes: Nombre de lignes de données
+        graine: Graine du générateur aléatoire
+        noms_separes: Si True, colonnes "NOM" et "Prénom" séparées, sinon une colonne "Prénom Nom"
+        delimiteur: Délimiteur du CSV
+        encodage: Encodage du fichier (par défaut 'utf-8-sig', comme les exports Excel)
+
+    Returns:
+        Taille du fichier écrit, en octets
+    """
+    with open(chemin_csv, "w", encoding=encodage, newline="") as fichier:
+        csv.writer(fichier, delimiter=delimiteur, lineterminator="\n").writerows(
+            generer_lignes(nb_lignes, graine, noms_separes))
+    return os.path.getsize(chemin_csv)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("chemin", help="Fichier CSV à écrire")
+    parser.add_argument("--lignes", type=int, default=1000, help="Nombre de lignes de données")
+    parser.add_argument("--graine", type=int, default=42, help="Graine du générateur aléatoire")
+    parser.add_argument("--noms-separes", action="store_true", help="Colonnes NOM et Prénom séparées")
+    parser.add_argument("--delimiteur", default=";", help="Délimiteur du CSV (par défaut ';')")
+    parser.add_argument("--encodage", default="utf-8-sig", help="Encodage du fichier (par défaut utf-8-sig)")
+    args = parser.parse_args()
+
+    taille = ecrire_liste_equipe(args.chemin, args.lignes, graine=args.graine, noms_separes=args.noms_separes,
+                                 delimiteur=args.delimiteur.replace("\\t", "\t"), encodage=args.encodage)
+    print(f"{args.lignes} lignes écrites dans {args.chemin} ({taille / 1_000_000:.1f} Mo)")
+
+
+if __name__ == "__main__":
+    main()
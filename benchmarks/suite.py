@@ -0,0 +1,293 @@
+# -*- coding: utf-8 -*-
+"""
+Suite de mesures de performance des convertisseurs CSV -> VCF sur des listes d'équipe synthétiques.
+
+Chaque convertisseur (moteur) est mesuré sur chaque scénario (taille x variante de fichier), dans un
+processus neuf pour que le pic de mémoire (RSS) et les caches soient propres à la mesure. Sont relevés :
+débit en lignes/s, pic de mémoire résidente et délai avant le premier octet écrit. Les résultats sont
+enregistrés en JSON pour comparer deux séries de mesures.
+
+Usage :
+    python benchmarks/suite.py
+    python benchmarks/suite.py --tailles 1000 100000 --moteurs flux projection
+    python benchmarks/suite.py --comparer benchmarks/resultats/avant.json
+"""
+
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+_DOSSIER = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(_DOSSIER, os.pardir, "src"))
+sys.path.insert(0, os.path.join(_DOSSIER, os.pardir, "V1_2"))
+
+from generateur import ecrire_liste_equipe  # noqa: E402
+
+try:
+    import resource
+except ImportError:  # Windows : pas de pic de mémoire
+    resource = None
+
+TAILLES_DEFAUT = [1_000, 100_000, 1_000_000]
+DOSSIER_RESULTATS = os.path.join(_DOSSIER, "resultats")
+
+
+class Variante(NamedTuple):
+    """Forme du fichier généré."""
+    noms_separes: bool
+    delimiteur: str
+
+
+VARIANTES: Dict[str, Variante] = {
+    "combine-point-virgule": Variante(False, ';'),
+    "separe-virgule": Variante(True, ','),
+    "combine-tabulation": Variante(False, '\t'),
+}
+
+
+class SortieChronometree:
+    """Flux texte d'écriture qui note l'instant du premier octet écrit."""
+
+    def __init__(self, fichier: io.TextIOBase):
+        self._fichier = fichier
+        self.premier_octet: Optional[float] = None
+
+    def write(self, texte: str) -> int:
+        if self.premier_octet is None and texte:
+            self.premier_octet = time.perf_counter()
+        return self._fichier.write(texte)
+
+
+# Moteurs : chacun convertit `chemin_csv` en écrivant le VCF dans `sortie`, détection du format comprise
+def _moteur_v1_2(chemin_csv: str, sortie: SortieChronometree) -> None:
+    """Version Tkinter : utils.convertir_csv_en_vcf sur le chemin du fichier."""
+    import utils
+    with contextlib.redirect_stdout(io.StringIO()):
+        utils.convertir_csv_en_vcf(chemin_csv, sortie)
+
+
+def _moteur_v2(chemin_csv: str, sortie: SortieChronometree) -> None:
+    """Version Streamlit : upload en mémoire, VCF construit entièrement avant le téléchargement."""
+    from convertisseur import TAILLE_ECHANTILLON, detecter_format, ecrire_vcf, lire_entete, suggerer_colonnes
+    with open(chemin_csv, "rb") as fichier:
+        donnees = fichier.read()
+    format_csv = detecter_format(donnees[:TAILLE_ECHANTILLON], len(donnees) > TAILLE_ECHANTILLON)
+    flux_csv = io.TextIOWrapper(io.BytesIO(donnees), encoding=format_csv.encodage, newline='')
+    mappings = suggerer_colonnes(lire_entete(flux_csv, format_csv.delimiteur))
+    vcf_buffer = io.BytesIO()
+    flux_vcf = io.TextIOWrapper(vcf_buffer, encoding='utf-8', newline='')
+    ecrire_vcf(flux_csv, flux_vcf, mappings, None, format_csv.delimiteur, guillemet=format_csv.guillemet)
+    flux_vcf.flush()
+    sortie.write(vcf_buffer.getvalue().decode('utf-8'))
+
+
+def _preparer(chemin_csv: str):
+    """Détecte le format et suggère les mappings, comme la commande par lots."""
+    from convertisseur import detecter_format_fichier, lire_entete, suggerer_colonnes
+    format_csv = detecter_format_fichier(chemin_csv)
+    options = dict(encodage=format_csv.encodage, guillemet=format_csv.guillemet)
+    mappings = suggerer_colonnes(lire_entete(chemin_csv, format_csv.delimiteur, **options))
+    return format_csv.delimiteur, mappings, options
+
+
+def _moteur_flux(chemin_csv: str, sortie: SortieChronometree) -> None:
+    """Cœur partagé, lecture en flux (csv.reader)."""
+    from convertisseur import ecrire_vcf
+    delimiteur, mappings, options = _preparer(chemin_csv)
+    ecrire_vcf(chemin_csv, sortie, mappings, None, delimiteur, **options)
+
+
+def _moteur_projection(chemin_csv: str, sortie: SortieChronometree) -> None:
+    """Cœur partagé, lecture projetée en mémoire (mmap)."""
+    from convertisseur import ecrire_vcf
+    delimiteur, mappings, options = _preparer(chemin_csv)
+    ecrire_vcf(chemin_csv, sortie, mappings, None, delimiteur, projection=True, **options)
+
+
+def _moteur_vectorise(chemin_csv: str, sortie: SortieChronometree) -> None:
+    """Cœur partagé, nettoyage par blocs de colonnes avec pandas (boucle Python sans pandas)."""
+    from convertisseur import ecrire_vcf
+    delimiteur, mappings, options = _preparer(chemin_csv)
+    ecrire_vcf(chemin_csv, sortie, mappings, None, delimiteur, vectorise=True, **options)
+
+
+def _moteur_parallele(chemin_csv: str, sortie: SortieChronometree) -> None:
+    """Cœur partagé, conversion multi-cœur par morceaux."""
+    from convertisseur import ecrire_vcf_parallele
+    delimiteur, mappings, options = _preparer(chemin_csv)
+    ecrire_vcf_parallele(chemin_csv, sortie, mappings, None, delimiteur, **options)
+
+
+MOTEURS: Dict[str, Callable[[str, SortieChronometree], None]] = {
+    "v1_2": _moteur_v1_2,
+    "v2": _moteur_v2,
+    "flux": _moteur_flux,
+    "projection": _moteur_projection,
+    "vectorise": _moteur_vectorise,
+    "parallele": _moteur_parallele,
+}
+
+
+def _pic_memoire_ko() -> Optional[int]:
+    """Pic de mémoire résidente du processus et de ses enfants, en Ko (None si indisponible)."""
+    if resource is None:
+        return None
+    pic = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+              resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # ru_maxrss est en octets sous macOS, en Ko ailleurs
+    return pic // 1024 if sys.platform == "darwin" else pic
+
+
+def executer_mesure(moteur: str, chemin_csv: str) -> Dict[str, Any]:
+    """
+    Exécute un moteur une fois (dans le processus courant) et renvoie ses mesures.
+
+    Returns:
+        Dictionnaire avec "duree_s", "premier_octet_s", "pic_rss_ko" et "fiches"
+    """
+    chemin_vcf = chemin_csv + f".{moteur}.vcf"
+    with open(chemin_vcf, "w", encoding="utf-8") as fichier_vcf:
+        sortie = SortieChronometree(fichier_vcf)
+        debut = time.perf_counter()
+        MOTEURS[moteur](chemin_csv, sortie)
+        duree = time.perf_counter() - debut
+    pic = _pic_memoire_ko()
+
+    with open(chemin_vcf, "rb") as fichier_vcf:
+        fiches = fichier_vcf.read().count(b"BEGIN:VCARD")
+    os.remove(chemin_vcf)
+    premier_octet = sortie.premier_octet - debut if sortie.premier_octet is not None else None
+    return {"duree_s": duree, "premier_octet_s": premier_octet, "pic_rss_ko": pic, "fiches": fiches}
+
+
+def mesurer(moteur: str, chemin_csv: str, repetitions: int) -> Dict[str, Any]:
+    """Mesure un moteur dans des processus neufs et garde l'exécution la plus rapide."""
+    meilleure = None
+    for _ in range(repetitions):
+        resultat = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--executer", moteur, chemin_csv],
+            capture_output=True, text=True, check=True
+        )
+        mesure = json.loads(resultat.stdout.strip().splitlines()[-1])
+        if meilleure is None or mesure["duree_s"] < meilleure["duree_s"]:
+            meilleure = mesure
+    return meilleure
+
+
+def lancer_suite(
+    tailles: List[int],
+    variantes: List[str],
+    moteurs: List[str],
+    graine: int,
+    repetitions: int
+) -> Dict[str, Any]:
+    """
+    Génère les fichiers de chaque scénario puis mesure chaque moteur dessus.
+
+    Returns:
+        Résultats complets (métadonnées de la machine et liste des mesures)
+    """
+    mesures = []
+    with tempfile.TemporaryDirectory() as dossier:
+        for taille in tailles:
+            for nom_variante in variantes:
+                variante = VARIANTES[nom_variante]
+                chemin_csv = os.path.join(dossier, f"equipe_{taille}_{nom_variante}.csv")
+                octets = ecrire_liste_equipe(chemin_csv, taille, graine=graine, noms_separes=variante.noms_separes,
+                                             delimiteur=variante.delimiteur)
+                for moteur in moteurs:
+                    mesure = mesurer(moteur, chemin_csv, repetitions)
+                    mesure.update(moteur=moteur, lignes=taille, variante=nom_variante, octets=octets,
+                                  lignes_par_s=taille / mesure["duree_s"] if mesure["duree_s"] else None)
+                    mesures.append(mesure)
+                    afficher_mesure(mesure)
+
+    return {
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": _commit_git(),
+        "python": platform.python_version(),
+        "plateforme": platform.platform(),
+        "coeurs": os.cpu_count(),
+        "graine": graine,
+        "repetitions": repetitions,
+        "mesures": mesures,
+    }
+
+
+def _commit_git() -> Optional[str]:
+    """Commit courant du dépôt, s'il est disponible."""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=_DOSSIER,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def afficher_mesure(mesure: Dict[str, Any]) -> None:
+    """Affiche une ligne de résultat."""
+    premier_octet = (f"{mesure['premier_octet_s'] * 1000:8.1f} ms" if mesure["premier_octet_s"] is not None
+                     else "       -   ")
+    pic = f"{mesure['pic_rss_ko'] / 1024:7.1f} Mo" if mesure["pic_rss_ko"] is not None else "      -   "
+    print(f"{mesure['lignes']:>9} {mesure['variante']:<22} {mesure['moteur']:<11} "
+          f"{mesure['lignes_par_s']:>12,.0f} lignes/s  1er octet {premier_octet}  pic RSS {pic}")
+
+
+def comparer(ancien: Dict[str, Any], nouveau: Dict[str, Any]) -> None:
+    """Affiche l'évolution du débit entre deux séries de mesures, scénario par scénario."""
+    def cle(mesure: Dict[str, Any]) -> tuple:
+        return mesure["moteur"], mesure["lignes"], mesure["variante"]
+
+    precedentes = {cle(mesure): mesure for mesure in ancien["mesures"]}
+    print(f"\nComparaison avec {ancien.get('date')} (commit {ancien.get('commit')})")
+    for mesure in nouveau["mesures"]:
+        precedente = precedentes.get(cle(mesure))
+        if precedente and precedente.get("lignes_par_s") and mesure.get("lignes_par_s"):
+            rapport = mesure["lignes_par_s"] / precedente["lignes_par_s"]
+            print(f"{mesure['lignes']:>9} {mesure['variante']:<22} {mesure['moteur']:<11} débit x{rapport:.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tailles", type=int, nargs="+", default=TAILLES_DEFAUT, help="Nombres de lignes générées")
+    parser.add_argument("--variantes", nargs="+", choices=sorted(VARIANTES), default=list(VARIANTES),
+                        help="Formes de fichier générées")
+    parser.add_argument("--moteurs", nargs="+", choices=sorted(MOTEURS), default=list(MOTEURS),
+                        help="Convertisseurs mesurés")
+    parser.add_argument("--graine", type=int, default=42, help="Graine du générateur de fichiers")
+    parser.add_argument("--repetitions", type=int, default=1, help="Exécutions par mesure (la meilleure est gardée)")
+    parser.add_argument("--sortie", help="Fichier JSON des résultats (par défaut : benchmarks/resultats/<date>.json)")
+    parser.add_argument("--comparer", help="Fichier JSON d'une série précédente à comparer")
+    parser.add_argument("--executer", nargs=2, metavar=("MOTEUR", "CSV"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.executer:
+        # Mode interne : une mesure dans ce processus, résultat en JSON sur la sortie standard
+        print(json.dumps(executer_mesure(*args.executer)))
+        return
+
+    resultats = lancer_suite(args.tailles, args.variantes, args.moteurs, args.graine, args.repetitions)
+
+    chemin_sortie = args.sortie
+    if not chemin_sortie:
+        os.makedirs(DOSSIER_RESULTATS, exist_ok=True)
+        chemin_sortie = os.path.join(DOSSIER_RESULTATS, datetime.datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    with open(chemin_sortie, "w", encoding="utf-8") as fichier:
+        json.dump(resultats, fichier, ensure_ascii=False, indent=2)
+    print(f"\nRésultats enregistrés dans {chemin_sortie}")
+
+    if args.comparer:
+        with open(args.comparer, encoding="utf-8") as fichier:
+            comparer(json.load(fichier), resultats)
+
+
+if __name__ == "__main__":
+    main()
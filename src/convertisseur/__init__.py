@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""
+Cœur de conversion CSV -> VCF partagé par la version Tkinter (V1_2) et la version Streamlit (V2).
+
+Ce paquet n'importe ni Streamlit ni Tkinter : il peut être utilisé en tâche de fond,
+dans un script ou dans un processus de calcul.
+
+Les fonctions d'usage ponctuel (découpage, reconversion incrémentale, lecture de VCF, registre des
+configurations, conversion multi-cœur) ne sont importées qu'au premier accès à l'un de leurs noms : un
+simple `import convertisseur` ne charge que la conversion elle-même.
+"""
+
+import importlib
+from typing import TYPE_CHECKING, Any, List
+
+from .colonnes import (
+    get_colonnes_suggérées,
+    get_configuration_par_défaut,
+    normaliser_nom_colonne,
+    suggerer_colonnes,
+    trouver_colonne_correspondante,
+)
+from .configuration import (
+    ErreurConfiguration,
+    charger_mappings,
+    ecrire_configuration,
+    lire_configuration,
+    trouver_configuration,
+)
+from .conversion import (
+    ENCODAGE_PAR_DEFAUT,
+    ErreurConversion,
+    convertir_csv_en_vcf,
+    ecrire_vcf,
+    generer_cartes_vcf,
+    generer_contacts,
+    lire_entete,
+)
+from .detection import TAILLE_ECHANTILLON, FormatCsv, detecter_format, detecter_format_fichier
+from .doublons import CLES_DOUBLONS, generer_cartes_fusionnees, generer_contacts_fusionnes
+from .ecrivains import (
+    FORMAT_PAR_DEFAUT,
+    FORMATS_SORTIE,
+    EcrivainContacts,
+    EcrivainJCard,
+    EcrivainVCard3,
+    EcrivainVCard4,
+    EcrivainXCard,
+    ecrire_contacts,
+)
+from .identifiants import cle_nom, horodatage_revision, uid_contact
+from .noms import formater_nom, separer_prenom_nom, statistiques_cache_noms, vider_cache_noms
+from .plan import Contact
+from .projection import generer_cartes_vcf_projetees, generer_contacts_projetes, projection_possible
+from .statistiques import StatistiquesConversion
+from .table import TableContacts
+from .telephone import PAYS_PAR_DEFAUT, REGLES_PAYS, NormaliseurTelephone, normaliser_telephone
+from .vectorise import generer_cartes_vectorisees, vectorisation_possible
+
+# Nom -> module qui le définit, importé au premier accès (voir __getattr__)
+_IMPORTS_DIFFERES = {
+    "CRITERES_DECOUPAGE": "decoupage",
+    "BilanDecoupage": "decoupage",
+    "ecrire_decoupe": "decoupage",
+    "BilanIncremental": "incremental",
+    "convertir_incremental": "incremental",
+    "BilanVcfCsv": "lecture_vcf",
+    "ecrire_csv_depuis_vcf": "lecture_vcf",
+    "lire_contacts_vcf": "lecture_vcf",
+    "ecrire_vcf_parallele": "parallele",
+    "RegistreConfigurations": "registre",
+    "empreinte_entete": "registre",
+}
+
+if TYPE_CHECKING:
+    from .decoupage import CRITERES_DECOUPAGE, BilanDecoupage, ecrire_decoupe
+    from .incremental import BilanIncremental, convertir_incremental
+    from .lecture_vcf import BilanVcfCsv, ecrire_csv_depuis_vcf, lire_contacts_vcf
+    from .parallele import ecrire_vcf_parallele
+    from .registre import RegistreConfigurations, empreinte_entete
+
+
+def __getattr__(nom: str) -> Any:
+    """Importe à la demande les noms de `_IMPORTS_DIFFERES`, gardés ensuite dans le paquet."""
+    module = _IMPORTS_DIFFERES.get(nom)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {nom!r}")
+    valeur = getattr(importlib.import_module(f".{module}", __name__), nom)
+    globals()[nom] = valeur
+    return valeur
+
+
+def __dir__() -> List[str]:
+    """Noms du paquet, y compris ceux qui ne sont pas encore importés."""
+    return sorted(set(globals()) | set(_IMPORTS_DIFFERES))
+
+
+__all__ = [
+    "BilanDecoupage",
+    "BilanIncremental",
+    "BilanVcfCsv",
+    "CLES_DOUBLONS",
+    "CRITERES_DECOUPAGE",
+    "Contact",
+    "ENCODAGE_PAR_DEFAUT",
+    "EcrivainContacts",
+    "EcrivainJCard",
+    "EcrivainVCard3",
+    "EcrivainVCard4",
+    "EcrivainXCard",
+    "FORMATS_SORTIE",
+    "FORMAT_PAR_DEFAUT",
+    "FormatCsv",
+    "NormaliseurTelephone",
+    "PAYS_PAR_DEFAUT",
+    "REGLES_PAYS",
+    "RegistreConfigurations",
+    "StatistiquesConversion",
+    "TAILLE_ECHANTILLON",
+    "TableContacts",
+    "ErreurConfiguration",
+    "ErreurConversion",
+    "charger_mappings",
+    "cle_nom",
+    "convertir_csv_en_vcf",
+    "convertir_incremental",
+    "detecter_format",
+    "detecter_format_fichier",
+    "ecrire_configuration",
+    "ecrire_contacts",
+    "ecrire_csv_depuis_vcf",
+    "ecrire_decoupe",
+    "ecrire_vcf",
+    "ecrire_vcf_parallele",
+    "empreinte_entete",
+    "formater_nom",
+    "generer_cartes_fusionnees",
+    "generer_cartes_vcf",
+    "generer_cartes_vcf_projetees",
+    "generer_cartes_vectorisees",
+    "generer_contacts",
+    "generer_contacts_fusionnes",
+    "generer_contacts_projetes",
+    "get_colonnes_suggérées",
+    "get_configuration_par_défaut",
+    "horodatage_revision",
+    "lire_configuration",
+    "lire_contacts_vcf",
+    "lire_entete",
+    "normaliser_nom_colonne",
+    "normaliser_telephone",
+    "projection_possible",
+    "separer_prenom_nom",
+    "statistiques_cache_noms",
+    "suggerer_colonnes",
+    "trouver_colonne_correspondante",
+    "trouver_configuration",
+    "uid_contact",
+    "vectorisation_possible",
+    "vider_cache_noms",
+]
@@ -0,0 +1,8 @@
+# -*- coding: utf-8 -*-
+"""Permet de lancer la conversion par lots avec `python -m convertisseur`."""
+
+import sys
+
+from .lot import main
+
+sys.exit(main())
@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+"""
+Correspondance entre les colonnes d'un CSV et les champs d'une fiche VCF.
+
+Les noms suggérés (`get_colonnes_suggérées`) sont rangés une fois pour toutes dans un index, sous leur
+forme exacte et sous une forme normalisée (sans casse, sans accents ni ponctuation) : chaque colonne d'un
+en-tête est cherchée dans l'index par une seule lecture de dictionnaire, quel que soit le nombre de noms
+suggérés. Les champs encore sans colonne reçoivent ensuite, s'il y en a une assez proche, la colonne dont
+le nom ressemble le plus à un nom suggéré (« E-mail pro », « Telephnoe »).
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+# Score minimal d'une correspondance approchée (1 : noms identiques une fois normalisés)
+SEUIL_CORRESPONDANCE = 0.8
+
+# Score d'une colonne dont le nom commence par un nom suggéré (« Téléphone portable », « E-mail pro »)
+_SCORE_PREFIXE = 0.9
+
+# Part minimale de bigrammes communs (coefficient de Dice) pour comparer une colonne à un nom suggéré
+_SEUIL_BIGRAMMES = 0.5
+
+# Mots qui, juste après un nom suggéré, en font un autre sens (« Nom du projet », « Lieu de tournage »)
+_MOTS_DE_LIAISON = frozenset({"a", "and", "au", "aux", "d", "de", "des", "du", "en", "et", "la", "le", "les", "of",
+                              "ou", "pour", "sur"})
+
+# Champs qu'un même nom de colonne peut désigner à la casse près (« Nom » et « NOM ») : une telle colonne,
+# trouvée autrement que par son nom exact, est le nom de famille quand il y a une colonne de prénom
+_NOMS_AMBIGUS = frozenset({'nom', 'nom_famille'})
+
+_PONCTUATION = re.compile(r"[\W_]+")
+
+
+def normaliser_nom_colonne(nom: str) -> str:
+    """
+    Forme comparable d'un nom de colonne : sans casse ni accents, ponctuation remplacée par des espaces.
+
+    Exemple : "TÉL." et "Tel" donnent "tel", "E-mail pro" donne "e mail pro".
+    """
+    texte = "".join(c for c in unicodedata.normalize("NFKD", nom) if not unicodedata.combining(c))
+    return " ".join(_PONCTUATION.sub(" ", texte.casefold()).split())
+
+
+def trouver_colonne_correspondante(colonnes: List[str], noms_possibles: List[str]) -> Optional[str]:
+    """
+    Trouve la colonne correspondante parmi plusieurs noms possibles.
+    Un nom présent tel quel est préféré ; à défaut, les noms sont comparés sans casse, accents ni ponctuation.
+    Retourne None si aucune correspondance n'est trouvée.
+    """
+    for nom in noms_possibles:
+        if nom in colonnes:
+            return nom
+    par_forme: Dict[str, str] = {}
+    for colonne in colonnes:
+        par_forme.setdefault(normaliser_nom_colonne(colonne), colonne)
+    for nom in noms_possibles:
+        trouvee = par_forme.get(normaliser_nom_colonne(nom))
+        if trouvee is not None:
+            return trouvee
+    return None
+
+
+def get_colonnes_suggérées() -> Dict[str, List[str]]:
+    """
+    Renvoie un dictionnaire des noms de colonnes suggérés pour chaque type de champ.
+
+    Returns:
+        Dictionnaire avec les types de champs et les noms de colonnes suggérés
+    """
+    return {
+        'nom': ["Prénom Nom", "Nom Prénom", "Nom", "Nom complet", "Fullname", "Nom et prénom", "Contact",
+                "Identité"],
+        'prenom': ["Prénom", "Prenom", "First name", "First", "Firstname"],
+        'nom_famille': ["NOM", "Nom de famille", "Last name", "Last", "Lastname", "Surname"],
+        'role': ["Role", "Rôle", "Fonction", "Titre", "Poste", "Title", "Job", "Position"],
+        'telephone': ["Téléphone", "Tel", "Tél", "Mobile", "Portable", "Phone", "Cellulaire", "GSM", "Numéro",
+                      "Cell"],
+        'email': ["Mail", "Email", "Courriel", "E-mail", "Adresse mail", "Adresse email", "Email address"],
+        'adresse': ["Adresse", "Adresse postale", "Address", "Localisation", "Domicile", "Lieu", "Location"],
+        'agent': ["Agent", "Agence", "Agency", "Représentant", "Representative", "Manager", "Responsable"],
+        'mots_cle': ["Mots clé", "Mots-clés", "Keywords", "Tags", "Catégories", "Thèmes"],
+        'relation': ["Relation", "Lien", "Connexion", "Relationship", "Link", "Contact Type"]
+    }
+
+
+def get_configuration_par_défaut() -> Dict[str, str]:
+    """
+    Renvoie la configuration par défaut standard pour les champs.
+    Ces valeurs sont celles utilisées dans les versions initiales de l'application.
+
+    Returns:
+        Dictionnaire avec les types de champs et les noms de colonnes par défaut
+    """
+    return {
+        'nom': "Prénom Nom",
+        'prenom': "Prénom",
+        'nom_famille': "NOM",
+        'role': "Rôle",
+        'telephone': "Téléphone",
+        'email': "Email",
+        'adresse': "Adresse",
+        'agent': "Agent",
+        'mots_cle': "Mots clé",
+        'relation': "Relation"
+    }
+
+
+class _IndexNoms(NamedTuple):
+    """Noms de `get_colonnes_suggérées` indexés : forme -> [(type de champ, rang du nom dans sa liste)]."""
+    exacts: Dict[str, List[Tuple[str, int]]]
+    # Formes normalisées, sans espaces : « E-mail » et « Email » se confondent
+    compacts: Dict[str, List[Tuple[str, int]]]
+    # Formes normalisées avec espaces, pour reconnaître un nom au début d'une colonne
+    normalises: Dict[str, List[Tuple[str, int]]]
+    # (type de champ, rang, forme compacte) de chaque nom, et rangs dans ce tuple par bigramme de caractères
+    noms: Tuple[Tuple[str, int, str], ...]
+    bigrammes: Dict[str, List[int]]
+
+
+def _bigrammes(texte: str) -> Set[str]:
+    """Paires de caractères consécutifs d'un texte."""
+    return {texte[i:i + 2] for i in range(len(texte) - 1)}
+
+
+@lru_cache(maxsize=1)
+def _index_noms_suggeres() -> _IndexNoms:
+    """Index des noms de `get_colonnes_suggérées`, construit au premier appel."""
+    index = _IndexNoms({}, {}, {}, (), {})
+    noms: List[Tuple[str, int, str]] = []
+    for type_champ, noms_possibles in get_colonnes_suggérées().items():
+        for rang, nom in enumerate(noms_possibles):
+            forme = normaliser_nom_colonne(nom)
+            compacte = forme.replace(" ", "")
+            index.exacts.setdefault(nom, []).append((type_champ, rang))
+            index.compacts.setdefault(compacte, []).append((type_champ, rang))
+            index.normalises.setdefault(forme, []).append((type_champ, rang))
+            for bigramme in _bigrammes(compacte):
+                index.bigrammes.setdefault(bigramme, []).append(len(noms))
+            noms.append((type_champ, rang, compacte))
+    return index._replace(noms=tuple(noms))
+
+
+def _candidats_approches(forme: str, index: _IndexNoms) -> Iterator[Tuple[float, str, int]]:
+    """
+    Noms suggérés proches d'une colonne de forme normalisée `forme` : (score, type de champ, rang).
+
+    Une colonne qui commence par un nom suggéré (« Téléphone portable », « E-mail pro ») a le score
+    _SCORE_PREFIXE, sauf si la suite commence par un mot de liaison (« Nom du projet »). Sinon, seuls les
+    noms qui partagent au moins la moitié de leurs bigrammes avec la colonne, trouvés par l'index des
+    bigrammes, sont comparés avec `difflib` ; les autres ne sont jamais examinés.
+    """
+    mots = forme.split()
+    for longueur in range(len(mots) - 1, 0, -1):
+        if mots[longueur] not in _MOTS_DE_LIAISON:
+            for type_champ, rang in index.normalises.get(" ".join(mots[:longueur]), ()):
+                yield _SCORE_PREFIXE, type_champ, rang
+
+    # Importé ici : seule la correspondance approchée s'en sert, pas l'import du paquet
+    from difflib import SequenceMatcher
+
+    compacte = "".join(mots)
+    bigrammes = _bigrammes(compacte)
+    communs: Dict[int, int] = {}
+    for bigramme in bigrammes:
+        for numero in index.bigrammes.get(bigramme, ()):
+            communs[numero] = communs.get(numero, 0) + 1
+    for numero, nb_communs in communs.items():
+        type_champ, rang, compacte_nom = index.noms[numero]
+        if 2 * nb_communs >= _SEUIL_BIGRAMMES * (len(bigrammes) + len(compacte_nom) - 1):
+            score = SequenceMatcher(None, compacte, compacte_nom, autojunk=False).ratio()
+            if score >= SEUIL_CORRESPONDANCE:
+                yield score, type_champ, rang
+
+
+def suggerer_colonnes(colonnes_disponibles: List[str], approchee: bool = True) -> Dict[str, str]:
+    """
+    Suggère automatiquement les mappings de colonnes en fonction des colonnes disponibles.
+
+    Chaque champ reçoit, dans l'ordre de préférence : la colonne qui porte exactement un nom suggéré (le
+    premier de sa liste), sinon une colonne qui lui est identique aux majuscules, accents, espaces et
+    ponctuation près, sinon (avec `approchee`) la colonne la plus ressemblante au-delà de
+    SEUIL_CORRESPONDANCE. Une colonne trouvée par une correspondance normalisée ou approchée n'est
+    attribuée qu'à un seul champ ; si elle désigne aussi bien le nom complet que le nom de famille
+    (« nom »), elle n'est proposée que pour le nom de famille, et seulement avec une colonne de prénom.
+
+    Args:
+        colonnes_disponibles: Liste des noms de colonnes disponibles dans le CSV
+        approchee: Si False, seules les correspondances exactes et normalisées sont cherchées
+
+    Returns:
+        Dictionnaire avec les types de champs et les noms de colonnes suggérés
+    """
+    index = _index_noms_suggeres()
+    ordre_champs = list(get_colonnes_suggérées())
+
+    # Correspondances exactes : le nom suggéré de plus petit rang l'emporte, comme dans la liste
+    meilleures: Dict[str, Tuple[int, str]] = {}
+    for colonne in colonnes_disponibles:
+        for type_champ, rang in index.exacts.get(colonne, ()):
+            if type_champ not in meilleures or rang < meilleures[type_champ][0]:
+                meilleures[type_champ] = (rang, colonne)
+    suggestions = {type_champ: meilleures[type_champ][1]
+                   for type_champ in ordre_champs if type_champ in meilleures}
+    utilisees = set(suggestions.values())
+
+    # Correspondances normalisées, pour les champs restants et les colonnes libres
+    formes = {colonne: normaliser_nom_colonne(colonne)
+              for colonne in colonnes_disponibles if colonne not in utilisees}
+    # Colonnes qui, à la casse près ou par ressemblance, sont à la fois un nom complet et un nom de
+    # famille (« nom ») : jamais proposées pour le nom complet, voir _NOMS_AMBIGUS
+    ambigues: Set[str] = set()
+    meilleures = {}
+    for colonne, forme in formes.items():
+        correspondances = index.compacts.get(forme.replace(" ", ""), ())
+        if _NOMS_AMBIGUS <= {type_champ for type_champ, _ in correspondances}:
+            ambigues.add(colonne)
+        for type_champ, rang in correspondances:
+            if type_champ == 'nom' and colonne in ambigues:
+                continue
+            if type_champ not in suggestions and (type_champ not in meilleures or rang < meilleures[type_champ][0]):
+                meilleures[type_champ] = (rang, colonne)
+    for type_champ in ordre_champs:
+        if type_champ in meilleures and meilleures[type_champ][1] not in utilisees:
+            suggestions[type_champ] = meilleures[type_champ][1]
+            utilisees.add(meilleures[type_champ][1])
+
+    if approchee and len(suggestions) < len(ordre_champs):
+        # Correspondances approchées : les meilleurs couples (champ, colonne) d'abord, une colonne par champ.
+        # Une colonne qui porte le nom suggéré d'un champ (« Adresse email ») n'est pas proposée à un autre.
+        candidats = []
+        for position, (colonne, forme) in enumerate(formes.items()):
+            if colonne in utilisees or forme.replace(" ", "") in index.compacts:
+                continue
+            proches = list(_candidats_approches(forme, index))
+            if _NOMS_AMBIGUS <= {type_champ for _, type_champ, _ in proches}:
+                ambigues.add(colonne)
+            for score, type_champ, rang in proches:
+                if type_champ not in suggestions and not (type_champ == 'nom' and colonne in ambigues):
+                    candidats.append((-score, rang, position, type_champ, colonne))
+        for _, _, _, type_champ, colonne in sorted(candidats):
+            if type_champ not in suggestions and colonne not in utilisees:
+                suggestions[type_champ] = colonne
+                utilisees.add(colonne)
+
+    # Sans colonne de prénom, une colonne ambiguë ne donnerait qu'un nom de famille : elle est laissée au
+    # choix de l'utilisateur, comme avant la correspondance normalisée
+    if suggestions.get('nom_famille') in ambigues and 'prenom' not in suggestions:
+        del suggestions['nom_famille']
+
+    return {type_champ: suggestions[type_champ] for type_champ in ordre_champs if type_champ in suggestions}
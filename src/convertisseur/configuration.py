@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+Lecture des fichiers de configuration `*_config.json` exportés par l'application V2.
+"""
+
+import datetime
+import json
+import os
+from typing import Any, Dict, Optional
+
+SUFFIXE_CONFIGURATION = "_config.json"
+
+
+class ErreurConfiguration(ValueError):
+    """Erreur levée quand un fichier de configuration est illisible ou mal formé."""
+
+
+def lire_configuration(contenu_json: str) -> Dict[str, Any]:
+    """
+    Analyse le contenu d'un fichier JSON de configuration.
+
+    Args:
+        contenu_json: Contenu du fichier JSON
+
+    Returns:
+        Dictionnaire avec les informations de configuration (contient au moins la clé "mappings")
+
+    Raises:
+        ErreurConfiguration: Si le JSON est invalide ou si les mappings sont absents
+    """
+    try:
+        config = json.loads(contenu_json)
+    except json.JSONDecodeError as e:
+        raise ErreurConfiguration("Le fichier n'est pas un JSON valide.") from e
+
+    # Vérifier la structure minimale requise
+    if not isinstance(config, dict) or not isinstance(config.get("mappings"), dict):
+        raise ErreurConfiguration("Le fichier de configuration n'a pas le bon format (mappings manquants).")
+
+    return config
+
+
+def charger_mappings(chemin_config: str) -> Dict[str, str]:
+    """
+    Charge les mappings de colonnes d'un fichier de configuration.
+
+    Args:
+        chemin_config: Chemin du fichier `*_config.json`
+
+    Returns:
+        Dictionnaire associant les types de champs aux noms de colonnes du CSV
+    """
+    with open(chemin_config, 'r', encoding='utf-8') as fichier:
+        mappings: Dict[str, str] = lire_configuration(fichier.read())["mappings"]
+    return mappings
+
+
+def trouver_configuration(chemin_csv: str) -> Optional[str]:
+    """
+    Cherche le fichier de configuration associé à un CSV (même nom, suffixe `_config.json`).
+
+    Args:
+        chemin_csv: Chemin du fichier CSV
+
+    Returns:
+        Chemin du fichier de configuration, ou None s'il n'existe pas
+    """
+    nom_base = os.path.splitext(chemin_csv)[0]
+    chemin_config = f"{nom_base}{SUFFIXE_CONFIGURATION}"
+    return chemin_config if os.path.isfile(chemin_config) else None
+
+
+def ecrire_configuration(chemin_config: str, mappings: Dict[str, str], nom_fichier: Optional[str] = None) -> None:
+    """
+    Écrit un fichier de configuration au format des `*_config.json` de l'application V2.
+
+    Args:
+        chemin_config: Chemin du fichier `*_config.json` à écrire
+        mappings: Dictionnaire associant les types de champs aux noms de colonnes du CSV
+        nom_fichier: Nom du CSV décrit, gardé pour information
+    """
+    config = {
+        "nom_fichier": nom_fichier,
+        "date_creation": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "mappings": dict(mappings),
+    }
+    with open(chemin_config, 'w', encoding='utf-8') as fichier:
+        json.dump(config, fichier, indent=4, ensure_ascii=False)
@@ -0,0 +1,415 @@
+# -*- coding: utf-8 -*-
+"""
+Conversion CSV -> VCF, sans aucune dépendance à une interface (Streamlit, Tkinter).
+"""
+
+import csv
+import io
+import os
+import time
+from typing import Dict, Iterator, List, Optional, Sequence, TextIO, Union
+
+from .doublons import generer_cartes_fusionnees, generer_contacts_fusionnes
+from .noms import statistiques_cache_noms
+from .plan import Contact, ErreurConversion, PlanConversion
+from .projection import generer_cartes_vcf_projetees, generer_contacts_projetes, projection_possible
+from .statistiques import StatistiquesConversion, chronometrer
+from .telephone import PAYS_PAR_DEFAUT
+from .vectorise import generer_cartes_vectorisees
+
+# Encodage supposé quand aucun n'est indiqué (le BOM éventuel d'Excel est retiré)
+ENCODAGE_PAR_DEFAUT = 'utf-8-sig'
+
+
+def lire_entete(
+    source: Union[str, "os.PathLike[str]", TextIO],
+    delimiter: str = ';',
+    *,
+    encodage: str = ENCODAGE_PAR_DEFAUT,
+    guillemet: str = '"'
+) -> List[str]:
+    """
+    Lit uniquement la ligne d'en-tête d'un CSV, sans parcourir le reste du fichier.
+
+    Args:
+        source: Chemin du fichier CSV ou flux texte repositionnable (la position est restaurée)
+        delimiter: Délimiteur utilisé dans le CSV (par défaut ';')
+        encodage: Encodage du fichier quand `source` est un chemin (par défaut 'utf-8-sig')
+        guillemet: Caractère de citation des champs (par défaut '"')
+
+    Returns:
+        Liste des noms de colonnes (vide si le fichier est vide)
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'r', encoding=encodage, newline='') as fichier:
+            return lire_entete(fichier, delimiter, guillemet=guillemet)
+
+    position = source.tell()
+    try:
+        for ligne in csv.reader(source, delimiter=delimiter, quotechar=guillemet):
+            if ligne:
+                return ligne
+        return []
+    finally:
+        source.seek(position)
+
+
+def generer_cartes_vcf(
+    source: Union[str, "os.PathLike[str]", TextIO],
+    mappings_colonnes: Dict[str, str],
+    note_commune: Optional[str] = None,
+    delimiter: str = ';',
+    *,
+    pays_telephone: str = PAYS_PAR_DEFAUT,
+    encodage: str = ENCODAGE_PAR_DEFAUT,
+    guillemet: str = '"',
+    projection: bool = False,
+    statistiques: Optional[StatistiquesConversion] = None,
+    fusionner_doublons: bool = False,
+    colonnes_uid: Optional[Sequence[str]] = None,
+    revision: Optional[str] = None,
+    vectorise: bool = False
+) -> Iterator[str]:
+    """
+    Génère les fiches VCF une par une à partir d'un CSV lu en flux.
+
+    Le CSV n'est jamais chargé entièrement en mémoire : chaque ligne est lue, convertie
+    en fiche puis rendue à l'appelant, ce qui garde une consommation mémoire constante
+    quelle que soit la taille du fichier.
+
+    Args:
+        source: Chemin du fichier CSV ou flux texte déjà ouvert
+        mappings_colonnes: Dictionnaire associant les types de champs aux noms de colonnes du CSV
+        note_commune: Note à ajouter à toutes les fiches (optionnel)
+        delimiter: Délimiteur utilisé dans le CSV (par défaut ';')
+        pays_telephone: Pays dont l'indicatif est ajouté aux numéros sans indicatif (par défaut 'FR')
+        encodage: Encodage du fichier quand `source` est un chemin (par défaut 'utf-8-sig')
+        guillemet: Caractère de citation des champs (par défaut '"')
+        projection: Si True et que `source` est un chemin, le fichier est projeté en mémoire et seules
+            les colonnes utilisées sont décodées (voir `convertisseur.projection`)
+        statistiques: Si fourni, les lignes traitées, le temps par étape et les taux de succès des caches
+            y sont cumulés (la lecture projetée est alors désactivée pour mesurer la lecture en flux)
+        fusionner_doublons: Si True, les lignes qui partagent un email, un téléphone ou un nom sont
+            fusionnées en une seule fiche (voir `convertisseur.doublons`) ; tout le fichier est lu avant
+            la première fiche
+        colonnes_uid: Si fourni, chaque fiche reçoit un UID déterministe calculé à partir de ces colonnes
+            (types de champs ou noms de colonnes ; liste vide : clé de nom), voir `PlanConversion`
+        revision: Si fourni, horodatage écrit dans le champ REV de toutes les fiches
+            (voir `convertisseur.identifiants.horodatage_revision`)
+        vectorise: Si True, les lignes sont nettoyées par blocs de colonnes avec pandas (voir
+            `convertisseur.vectorise`), à la place de la lecture projetée ; sans pandas, avec des
+            statistiques ou la fusion des doublons, la conversion ligne à ligne est utilisée
+
+    Yields:
+        Le texte d'une fiche VCF (BEGIN:VCARD ... END:VCARD suivi d'une ligne vide)
+
+    Raises:
+        ErreurConversion: Si aucune colonne n'est détectée ou si les colonnes du nom sont absentes
+    """
+    if isinstance(source, (str, os.PathLike)):
+        if (projection and not vectorise and statistiques is None and not fusionner_doublons
+                and projection_possible(encodage, delimiter, guillemet)):
+            yield from generer_cartes_vcf_projetees(source, mappings_colonnes, note_commune, delimiter,
+                                                    pays_telephone=pays_telephone, encodage=encodage,
+                                                    guillemet=guillemet, colonnes_uid=colonnes_uid,
+                                                    revision=revision)
+            return
+        with open(source, 'r', encoding=encodage, newline='') as fichier:
+            yield from generer_cartes_vcf(fichier, mappings_colonnes, note_commune, delimiter,
+                                          pays_telephone=pays_telephone, guillemet=guillemet,
+                                          statistiques=statistiques, fusionner_doublons=fusionner_doublons,
+                                          colonnes_uid=colonnes_uid, revision=revision, vectorise=vectorise)
+        return
+
+    if statistiques is not None:
+        yield from _generer_cartes_mesurees(source, mappings_colonnes, note_commune, delimiter,
+                                            pays_telephone, guillemet, statistiques, fusionner_doublons,
+                                            colonnes_uid, revision)
+        return
+
+    lecteur = csv.reader(source, delimiter=delimiter, quotechar=guillemet)
+
+    # Vérifiez si des colonnes sont détectées (les lignes vides avant l'en-tête sont ignorées)
+    colonnes_disponibles = next(lecteur, None)
+    while colonnes_disponibles == []:
+        colonnes_disponibles = next(lecteur, None)
+    if not colonnes_disponibles:
+        raise ErreurConversion("Aucune colonne détectée dans le fichier CSV.")
+
+    # Les mappings sont compilés une seule fois en positions de colonnes et en liste de champs
+    plan = PlanConversion(colonnes_disponibles, mappings_colonnes, note_commune, pays_telephone,
+                          colonnes_uid=colonnes_uid, revision=revision)
+    if fusionner_doublons:
+        yield from generer_cartes_fusionnees(lecteur, plan, statistiques=statistiques)
+        return
+    if vectorise:
+        yield from generer_cartes_vectorisees(lecteur, plan)
+        return
+    carte = plan.carte
+
+    # Nous ne mettons plus X-ADDRESSBOOK-NAME au début du fichier car cela cause des problèmes d'importation
+    # La note commune sera uniquement ajoutée dans chaque fiche individuelle
+    for ligne in lecteur:
+        texte = carte(ligne)
+        if texte is not None:
+            yield texte
+
+
+def generer_contacts(
+    source: Union[str, "os.PathLike[str]", TextIO],
+    mappings_colonnes: Dict[str, str],
+    note_commune: Optional[str] = None,
+    delimiter: str = ';',
+    *,
+    pays_telephone: str = PAYS_PAR_DEFAUT,
+    encodage: str = ENCODAGE_PAR_DEFAUT,
+    guillemet: str = '"',
+    projection: bool = False,
+    fusionner_doublons: bool = False,
+    colonnes_uid: Optional[Sequence[str]] = None,
+    revision: Optional[str] = None
+) -> Iterator[Contact]:
+    """
+    Génère les contacts d'un CSV lu en flux, indépendamment du format de sortie.
+
+    Mêmes lignes et mêmes options que `generer_cartes_vcf` : chaque contact donne, mis en forme par
+    `convertisseur.ecrivains.EcrivainVCard3`, la même fiche que `generer_cartes_vcf`.
+
+    Yields:
+        Le contact de chaque ligne qui a un nom ou un prénom (de chaque groupe avec `fusionner_doublons`)
+
+    Raises:
+        ErreurConversion: Si aucune colonne n'est détectée ou si les colonnes du nom sont absentes
+    """
+    if isinstance(source, (str, os.PathLike)):
+        if projection and not fusionner_doublons and projection_possible(encodage, delimiter, guillemet):
+            yield from generer_contacts_projetes(source, mappings_colonnes, note_commune, delimiter,
+                                                 pays_telephone=pays_telephone, encodage=encodage,
+                                                 guillemet=guillemet, colonnes_uid=colonnes_uid, revision=revision)
+            return
+        with open(source, 'r', encoding=encodage, newline='') as fichier:
+            yield from generer_contacts(fichier, mappings_colonnes, note_commune, delimiter,
+                                        pays_telephone=pays_telephone, guillemet=guillemet,
+                                        fusionner_doublons=fusionner_doublons, colonnes_uid=colonnes_uid,
+                                        revision=revision)
+        return
+
+    lecteur = csv.reader(source, delimiter=delimiter, quotechar=guillemet)
+    colonnes_disponibles = next(lecteur, None)
+    while colonnes_disponibles == []:
+        colonnes_disponibles = next(lecteur, None)
+    if not colonnes_disponibles:
+        raise ErreurConversion("Aucune colonne détectée dans le fichier CSV.")
+
+    plan = PlanConversion(colonnes_disponibles, mappings_colonnes, note_commune, pays_telephone,
+                          colonnes_uid=colonnes_uid, revision=revision)
+    if fusionner_doublons:
+        yield from generer_contacts_fusionnes(lecteur, plan)
+        return
+    contact = plan.contact
+    for ligne in lecteur:
+        resultat = contact(ligne)
+        if resultat is not None:
+            yield resultat
+
+
+def _generer_cartes_mesurees(
+    source: TextIO,
+    mappings_colonnes: Dict[str, str],
+    note_commune: Optional[str],
+    delimiter: str,
+    pays_telephone: str,
+    guillemet: str,
+    statistiques: StatistiquesConversion,
+    fusionner_doublons: bool = False,
+    colonnes_uid: Optional[Sequence[str]] = None,
+    revision: Optional[str] = None
+) -> Iterator[str]:
+    """
+    Variante chronométrée de la boucle de `generer_cartes_vcf`, utilisée seulement quand des statistiques
+    sont demandées : le temps passé à attendre le consommateur (écriture) n'est pas compté ici.
+    Avec la fusion des doublons, le regroupement est compté dans l'assemblage.
+    """
+    horloge = time.perf_counter
+    durees = statistiques.durees
+    debut_total = horloge()
+
+    def lignes() -> Iterator[str]:
+        readline = source.readline
+        while True:
+            debut = horloge()
+            ligne = readline()
+            durees["decodage"] += horloge() - debut
+            if not ligne:
+                return
+            yield ligne
+
+    lecteur = csv.reader(lignes(), delimiter=delimiter, quotechar=guillemet)
+    colonnes_disponibles = next(lecteur, None)
+    while colonnes_disponibles == []:
+        colonnes_disponibles = next(lecteur, None)
+    if not colonnes_disponibles:
+        raise ErreurConversion("Aucune colonne détectée dans le fichier CSV.")
+
+    plan = PlanConversion(colonnes_disponibles, mappings_colonnes, note_commune, pays_telephone, statistiques,
+                          colonnes_uid, revision)
+    carte = plan.carte
+    caches_avant = statistiques_cache_noms()
+    telephones_avant = plan.normaliseur_telephone.statistiques_cache()
+    # Les étapes imbriquées (décodage dans la lecture, noms et téléphones dans l'assemblage) sont
+    # retranchées à la fin pour que chaque durée soit exclusive
+    imbriquees_avant = (durees["decodage"], durees["noms"] + durees["telephones"])
+    lecture = assemblage = 0.0
+    try:
+        if fusionner_doublons:
+            lectures = [0.0]
+
+            def lignes_csv() -> Iterator[List[str]]:
+                while True:
+                    debut = horloge()
+                    ligne = next(lecteur, None)
+                    lectures[0] += horloge() - debut
+                    if ligne is None:
+                        return
+                    yield ligne
+
+            cartes = generer_cartes_fusionnees(lignes_csv(), plan, statistiques=statistiques)
+            while True:
+                debut = horloge()
+                texte = next(cartes, None)
+                assemblage += horloge() - debut
+                if texte is None:
+                    break
+                yield texte
+            # La lecture des lignes a lieu pendant le regroupement
+            lecture, assemblage = lectures[0], assemblage - lectures[0]
+        else:
+            while True:
+                debut = horloge()
+                ligne = next(lecteur, None)
+                milieu = horloge()
+                lecture += milieu - debut
+                if ligne is None:
+                    break
+                texte = carte(ligne)
+                assemblage += horloge() - milieu
+                statistiques.lignes_lues += 1
+                if texte is None:
+                    statistiques.lignes_ignorees += 1
+                    continue
+                statistiques.fiches_emises += 1
+                yield texte
+    finally:
+        durees["lecture_csv"] += lecture - (durees["decodage"] - imbriquees_avant[0])
+        durees["assemblage"] += assemblage - (durees["noms"] + durees["telephones"] - imbriquees_avant[1])
+        for nom, apres in statistiques_cache_noms().items():
+            statistiques.ajouter_cache(nom, caches_avant[nom], apres)
+        statistiques.ajouter_cache("telephones", telephones_avant, plan.normaliseur_telephone.statistiques_cache())
+        statistiques.duree_totale += horloge() - debut_total
+
+
+def ecrire_vcf(
+    source: Union[str, "os.PathLike[str]", TextIO],
+    destination: Union[str, "os.PathLike[str]", TextIO],
+    mappings_colonnes: Dict[str, str],
+    note_commune: Optional[str] = None,
+    delimiter: str = ';',
+    *,
+    pays_telephone: str = PAYS_PAR_DEFAUT,
+    encodage: str = ENCODAGE_PAR_DEFAUT,
+    guillemet: str = '"',
+    projection: bool = False,
+    statistiques: Optional[StatistiquesConversion] = None,
+    fusionner_doublons: bool = False,
+    colonnes_uid: Optional[Sequence[str]] = None,
+    revision: Optional[str] = None,
+    vectorise: bool = False
+) -> int:
+    """
+    Convertit un CSV en VCF en écrivant les fiches au fil de l'eau dans la destination.
+
+    Args:
+        source: Chemin du fichier CSV ou flux texte déjà ouvert
+        destination: Chemin du fichier VCF ou flux texte ouvert en écriture
+        mappings_colonnes: Dictionnaire associant les types de champs aux noms de colonnes du CSV
+        note_commune: Note à ajouter à toutes les fiches (optionnel)
+        delimiter: Délimiteur utilisé dans le CSV (par défaut ';')
+        pays_telephone: Pays dont l'indicatif est ajouté aux numéros sans indicatif (par défaut 'FR')
+        encodage: Encodage du fichier quand `source` est un chemin (par défaut 'utf-8-sig')
+        guillemet: Caractère de citation des champs (par défaut '"')
+        projection: Si True et que `source` est un chemin, le fichier est projeté en mémoire et seules
+            les colonnes utilisées sont décodées (voir `convertisseur.projection`)
+        statistiques: Si fourni, les mesures de la conversion y sont cumulées, écriture comprise
+        fusionner_doublons: Si True, les contacts en double sont fusionnés en une seule fiche
+        colonnes_uid: Si fourni, colonnes dont est calculé l'UID déterministe de chaque fiche
+        revision: Si fourni, horodatage écrit dans le champ REV de toutes les fiches
+        vectorise: Si True et que pandas est installé, les lignes sont nettoyées par blocs de colonnes
+
+    Returns:
+        Nombre de fiches écrites
+    """
+    if isinstance(destination, (str, os.PathLike)):
+        with open(destination, 'w', encoding='utf-8') as fichier_vcf:
+            return ecrire_vcf(source, fichier_vcf, mappings_colonnes, note_commune, delimiter,
+                              pays_telephone=pays_telephone, encodage=encodage, guillemet=guillemet,
+                              projection=projection, statistiques=statistiques,
+                              fusionner_doublons=fusionner_doublons, colonnes_uid=colonnes_uid,
+                              revision=revision, vectorise=vectorise)
+
+    nb_fiches = 0
+    write = destination.write
+    if statistiques is not None:
+        write = chronometrer(write, statistiques.durees, "ecriture")
+    cartes = generer_cartes_vcf(source, mappings_colonnes, note_commune, delimiter,
+                                pays_telephone=pays_telephone, encodage=encodage, guillemet=guillemet,
+                                projection=projection, statistiques=statistiques,
+                                fusionner_doublons=fusionner_doublons, colonnes_uid=colonnes_uid,
+                                revision=revision, vectorise=vectorise)
+    for carte in cartes:
+        write(carte)
+        nb_fiches += 1
+    return nb_fiches
+
+
+def convertir_csv_en_vcf(
+    contenu_csv: str,
+    mappings_colonnes: Dict[str, str],
+    note_commune: Optional[str] = None,
+    delimiter: str = ';',
+    *,
+    pays_telephone: str = PAYS_PAR_DEFAUT,
+    guillemet: str = '"',
+    statistiques: Optional[StatistiquesConversion] = None,
+    fusionner_doublons: bool = False,
+    colonnes_uid: Optional[Sequence[str]] = None,
+    revision: Optional[str] = None,
+    vectorise: bool = False
+) -> str:
+    """
+    Convertit le contenu d'un fichier CSV en format VCF en utilisant des mappings de colonnes dynamiques.
+
+    Pour les gros fichiers, préférer `ecrire_vcf` qui écrit les fiches au fil de l'eau.
+
+    Args:
+        contenu_csv: Contenu du fichier CSV en texte
+        mappings_colonnes: Dictionnaire associant les types de champs aux noms de colonnes du CSV
+        note_commune: Note à ajouter à toutes les fiches (optionnel)
+        delimiter: Délimiteur utilisé dans le CSV (par défaut ';')
+        pays_telephone: Pays dont l'indicatif est ajouté aux numéros sans indicatif (par défaut 'FR')
+        guillemet: Caractère de citation des champs (par défaut '"')
+        statistiques: Si fourni, les mesures de la conversion y sont cumulées
+        fusionner_doublons: Si True, les contacts en double sont fusionnés en une seule fiche
+        colonnes_uid: Si fourni, colonnes dont est calculé l'UID déterministe de chaque fiche
+        revision: Si fourni, horodatage écrit dans le champ REV de toutes les fiches
+        vectorise: Si True et que pandas est installé, les lignes sont nettoyées par blocs de colonnes
+
+    Returns:
+        Contenu du fichier VCF généré
+
+    Raises:
+        ErreurConversion: Si les colonnes du nom sont absentes du CSV
+    """
+    return "".join(generer_cartes_vcf(io.StringIO(contenu_csv), mappings_colonnes, note_commune, delimiter,
+                                      pays_telephone=pays_telephone, guillemet=guillemet,
+                                      statistiques=statistiques, fusionner_doublons=fusionner_doublons,
+                                      colonnes_uid=colonnes_uid, revision=revision, vectorise=vectorise))
@@ -0,0 +1,313 @@
+# -*- coding: utf-8 -*-
+"""
+Découpage de la sortie en plusieurs fichiers : un par catégorie (CATEGORIES), par agent
+(RELATED;type=agent) ou par rôle (TITLE), et/ou des fichiers d'au plus N fiches ou N octets, que les
+téléphones et les carnets d'adresses importent sans peine.
+
+Le CSV est lu une seule fois : chaque contact est mis en forme une fois, puis son texte est écrit dans
+le fichier de chacune de ses clés (un contact de deux catégories figure dans les deux fichiers). Seul
+le contact en cours est gardé en mémoire. Les fichiers restent ouverts pendant la lecture, au plus
+`MAX_FICHIERS_OUVERTS` à la fois : au-delà, le moins récemment utilisé est refermé, puis rouvert en ajout.
+
+Les fichiers peuvent être réunis dans une archive zip. Sans clé de découpage, les parties se suivent et
+chacune est compressée directement dans l'archive. Avec une clé, les parties se remplissent en même temps,
+ce que le format zip ne permet pas : elles sont écrites dans un dossier temporaire, puis copiées une à une
+dans l'archive.
+"""
+
+import io
+import os
+import re
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, TextIO, Tuple, Type, Union
+
+from .conversion import ENCODAGE_PAR_DEFAUT, generer_contacts
+from .ecrivains import FORMAT_PAR_DEFAUT, FORMATS_SORTIE, EcrivainContacts
+from .plan import Contact
+from .telephone import PAYS_PAR_DEFAUT
+
+# Types de champs par lesquels la sortie peut être découpée -> suffixe du fichier des contacts sans valeur
+CRITERES_DECOUPAGE: Dict[str, str] = {
+    'mots_cle': "sans_categorie",
+    'agent': "sans_agent",
+    'role': "sans_role",
+}
+
+# Nombre de fichiers gardés ouverts en même temps (bien en deçà de la limite du système)
+MAX_FICHIERS_OUVERTS = 64
+
+# Longueur maximale de la partie d'un nom de fichier tirée d'une valeur du CSV
+_LONGUEUR_MAX_NOM = 60
+
+_CARACTERES_INTERDITS = re.compile(r"[^\w\-.]+")
+
+
+class BilanDecoupage(NamedTuple):
+    """Résultat d'une conversion découpée en plusieurs fichiers."""
+    # Contacts lus (un contact écrit dans plusieurs fichiers n'est compté qu'une fois)
+    nb_fiches: int
+    # (nom du fichier, nombre de fiches) de chaque fichier, dans l'ordre de création
+    fichiers: Tuple[Tuple[str, int], ...]
+
+
+class _Partie:
+    """Un fichier de sortie en cours de remplissage."""
+
+    __slots__ = ('nom', 'ecrivain', 'fichier', 'octets')
+
+    def __init__(self, nom: str, ecrivain: EcrivainContacts, fichier: TextIO):
+        self.nom = nom
+        self.ecrivain = ecrivain
+        self.fichier: Optional[TextIO] = fichier
+        self.octets = 0
+
+
+class _Repartiteur:
+    """Répartit les fiches entre les fichiers de chaque clé, en changeant de fichier aux limites."""
+
+    def __init__(
+        self,
+        classe_ecrivain: Type[EcrivainContacts],
+        ouvrir: Callable[[str, bool], TextIO],
+        nom_base: str,
+        numeroter: bool,
+        max_fiches: Optional[int],
+        max_octets: Optional[int]
+    ):
+        self.classe_ecrivain = classe_ecrivain
+        self.ouvrir = ouvrir
+        self.nom_base = nom_base
+        self.numeroter = numeroter
+        self.max_fiches = max_fiches
+        self.max_octets = max_octets
+        self.parties: List[_Partie] = []
+        # Clé -> partie en cours de remplissage, et suffixe des noms de fichier de la clé
+        self.en_cours: Dict[Optional[str], _Partie] = {}
+        self.suffixes: Dict[Optional[str], str] = {}
+        self.numeros: Dict[Optional[str], int] = {}
+        self.noms_pris: set = set()
+        self.ouvertes: "OrderedDict[_Partie, None]" = OrderedDict()
+
+    def ecrire(self, cle: Optional[str], libelle: str, texte: str, taille: int) -> None:
+        """Écrit le texte d'une fiche dans la partie en cours de la clé, en ouvre une nouvelle si besoin."""
+        partie = self.en_cours.get(cle)
+        if partie is not None and (
+            (self.max_fiches and partie.ecrivain.nb_fiches >= self.max_fiches)
+            or (self.max_octets and partie.octets + taille > self.max_octets)
+        ):
+            self.terminer(partie)
+            partie = None
+        if partie is None:
+            partie = self.en_cours[cle] = self.nouvelle_partie(cle, libelle)
+        elif partie.fichier is None:
+            partie.fichier = self.ouvrir(partie.nom, True)
+            partie.ecrivain.write = partie.fichier.write
+        self.ouvertes[partie] = None
+        self.ouvertes.move_to_end(partie)
+        partie.ecrivain.ecrire_texte(texte)
+        partie.octets += taille
+
+    def nouvelle_partie(self, cle: Optional[str], libelle: str) -> _Partie:
+        """Ouvre le fichier suivant d'une clé, en refermant au besoin le moins récemment utilisé."""
+        suffixe = self.suffixes.get(cle)
+        if suffixe is None:
+            suffixe = self.suffixes[cle] = self.suffixe_libre(libelle)
+        numero = self.numeros[cle] = self.numeros.get(cle, 0) + 1
+        nom = self.nom_base + suffixe + (f"_{numero:03d}" if self.numeroter else "")
+        nom += self.classe_ecrivain.extension
+
+        while len(self.ouvertes) >= MAX_FICHIERS_OUVERTS:
+            ancienne, _ = self.ouvertes.popitem(last=False)
+            if ancienne.fichier is not None:
+                ancienne.fichier.close()
+                ancienne.fichier = None
+        fichier = self.ouvrir(nom, False)
+        ecrivain = self.classe_ecrivain(fichier)
+        ecrivain.commencer()
+        partie = _Partie(nom, ecrivain, fichier)
+        self.parties.append(partie)
+        return partie
+
+    def suffixe_libre(self, libelle: str) -> str:
+        """Suffixe de nom de fichier tiré d'une valeur, numéroté s'il est déjà pris par une autre valeur."""
+        if not libelle:
+            return ""
+        suffixe = "_" + (_CARACTERES_INTERDITS.sub("_", libelle).strip("_.")[:_LONGUEUR_MAX_NOM] or "_")
+        candidat, rang = suffixe, 1
+        while candidat.casefold() in self.noms_pris:
+            rang += 1
+            candidat = f"{suffixe}-{rang}"
+        self.noms_pris.add(candidat.casefold())
+        return candidat
+
+    def terminer(self, partie: _Partie) -> None:
+        """Écrit la fin du document d'une partie et referme son fichier."""
+        fichier = partie.fichier
+        if fichier is None:
+            fichier = partie.fichier = self.ouvrir(partie.nom, True)
+            partie.ecrivain.write = fichier.write
+        partie.ecrivain.terminer()
+        fichier.close()
+        partie.fichier = None
+        self.ouvertes.pop(partie, None)
+
+    def terminer_tout(self) -> None:
+        """Termine toutes les parties en cours."""
+        for partie in self.en_cours.values():
+            self.terminer(partie)
+        self.en_cours.clear()
+
+    def fermer(self) -> None:
+        """Referme les fichiers encore ouverts (après une erreur)."""
+        for partie in self.ouvertes:
+            if partie.fichier is not None:
+                partie.fichier.close()
+        self.ouvertes.clear()
+
+
+def _cles(contact: Contact, critere: str) -> List[str]:
+    """Valeurs non vides du champ de découpage d'un contact (chaque mot-clé d'une cellule séparément)."""
+    for type_champ, valeurs in contact.champs:
+        if type_champ == critere:
+            if critere == 'mots_cle':
+                valeurs = tuple(mot for valeur in valeurs for mot in valeur.split(","))
+            return [valeur for valeur in (valeur.strip() for valeur in valeurs) if valeur]
+    return []
+
+
+def _repartir(
+    contacts: Iterable[Contact],
+    repartiteur: _Repartiteur,
+    critere: Optional[str],
+    compter_octets: bool
+) -> int:
+    """Écrit chaque contact dans le fichier de chacune de ses clés. Renvoie le nombre de contacts."""
+    formater = repartiteur.classe_ecrivain(io.StringIO()).formater
+    ecrire = repartiteur.ecrire
+    sans_valeur = CRITERES_DECOUPAGE[critere] if critere else ""
+    nb_fiches = 0
+    try:
+        for contact in contacts:
+            texte = formater(contact)
+            taille = (len(texte) if texte.isascii() else len(texte.encode('utf-8'))) if compter_octets else 0
+            if critere is None:
+                ecrire(None, "", texte, taille)
+            else:
+                valeurs = _cles(contact, critere)
+                if not valeurs:
+                    ecrire(None, sans_valeur, texte, taille)
+                # Les valeurs qui ne diffèrent que par les majuscules vont dans le même fichier
+                distinctes: Dict[str, str] = {}
+                for valeur in valeurs:
+                    distinctes.setdefault(valeur.casefold(), valeur)
+                for cle, valeur in distinctes.items():
+                    ecrire(cle, valeur, texte, taille)
+            nb_fiches += 1
+        repartiteur.terminer_tout()
+    finally:
+        repartiteur.fermer()
+    return nb_fiches
+
+
+def _ouvrir_dans(dossier: str) -> Callable[[str, bool], TextIO]:
+    """Ouverture des fichiers de sortie dans un dossier (en ajout pour un fichier déjà commencé)."""
+    def ouvrir(nom: str, ajout: bool) -> TextIO:
+        return open(os.path.join(dossier, nom), 'a' if ajout else 'w', encoding='utf-8')
+    return ouvrir
+
+
+def ecrire_decoupe(
+    source: Union[str, "os.PathLike[str]", TextIO],
+    destination: Union[str, "os.PathLike[str]"],
+    mappings_colonnes: Dict[str, str],
+    note_commune: Optional[str] = None,
+    delimiter: str = ';',
+    *,
+    critere: Optional[str] = None,
+    max_fiches: Optional[int] = None,
+    max_octets: Optional[int] = None,
+    nom_format: str = FORMAT_PAR_DEFAUT,
+    nom_base: Optional[str] = None,
+    pays_telephone: str = PAYS_PAR_DEFAUT,
+    encodage: str = ENCODAGE_PAR_DEFAUT,
+    guillemet: str = '"',
+    projection: bool = False,
+    fusionner_doublons: bool = False,
+    colonnes_uid: Optional[Sequence[str]] = None,
+    revision: Optional[str] = None
+) -> BilanDecoupage:
+    """
+    Convertit un CSV en plusieurs fichiers, en une seule lecture du fichier.
+
+    Les fichiers s'appellent `<nom_base>_<valeur>.vcf` avec un critère, `<nom_base>_sans_categorie.vcf`
+    (ou `_sans_agent`, `_sans_role`) pour les contacts sans valeur, et portent un numéro `_001`,
+    `_002`... quand une limite de taille est donnée. Une fiche plus grosse que `max_octets` à elle seule
+    occupe un fichier entier.
+
+    Args:
+        source: Chemin du fichier CSV ou flux texte déjà ouvert
+        destination: Dossier des fichiers, ou chemin d'une archive `.zip` qui les réunit
+        mappings_colonnes: Dictionnaire associant les types de champs aux noms de colonnes du CSV
+        note_commune: Note à ajouter à toutes les fiches (optionnel)
+        delimiter: Délimiteur utilisé dans le CSV (par défaut ';')
+        critere: Type de champ de découpage parmi CRITERES_DECOUPAGE (`mots_cle`, `agent`, `role`)
+        max_fiches: Si fourni, nombre maximal de fiches par fichier
+        max_octets: Si fourni, taille maximale des fiches d'un fichier, en octets
+        nom_format: Format de sortie, parmi FORMATS_SORTIE (par défaut 'vcard3')
+        nom_base: Début du nom des fichiers (par défaut : nom du CSV, ou « contacts » pour un flux)
+        pays_telephone: Pays dont l'indicatif est ajouté aux numéros sans indicatif (par défaut 'FR')
+        encodage: Encodage du fichier quand `source` est un chemin (par défaut 'utf-8-sig')
+        guillemet: Caractère de citation des champs (par défaut '"')
+        projection: Si True et que `source` est un chemin, seules les colonnes utilisées sont décodées
+        fusionner_doublons: Si True, les contacts en double sont fusionnés en une seule fiche
+        colonnes_uid: Si fourni, colonnes dont est calculé l'UID déterministe de chaque fiche
+        revision: Si fourni, horodatage écrit dans le champ REV de toutes les fiches
+
+    Returns:
+        Nombre de contacts et liste des fichiers écrits
+
+    Raises:
+        ValueError: Si le critère ou le format est inconnu, ou si une limite n'est pas positive
+        ErreurConversion: Si aucune colonne n'est détectée ou si les colonnes du nom sont absentes
+    """
+    if critere is not None and critere not in CRITERES_DECOUPAGE:
+        raise ValueError(f"Critère de découpage inconnu : {critere} (disponibles : {', '.join(CRITERES_DECOUPAGE)})")
+    if nom_format not in FORMATS_SORTIE:
+        raise ValueError(f"Format de sortie inconnu : {nom_format}")
+    if (max_fiches is not None and max_fiches <= 0) or (max_octets is not None and max_octets <= 0):
+        raise ValueError("Les limites par fichier doivent être positives.")
+    if nom_base is None:
+        nom_base = (os.path.splitext(os.path.basename(source))[0] if isinstance(source, (str, os.PathLike))
+                    else "contacts")
+
+    contacts = generer_contacts(source, mappings_colonnes, note_commune, delimiter,
+                                pays_telephone=pays_telephone, encodage=encodage, guillemet=guillemet,
+                                projection=projection, fusionner_doublons=fusionner_doublons,
+                                colonnes_uid=colonnes_uid, revision=revision)
+    numeroter = bool(max_fiches or max_octets)
+
+    def repartir(ouvrir: Callable[[str, bool], TextIO]) -> BilanDecoupage:
+        repartiteur = _Repartiteur(FORMATS_SORTIE[nom_format], ouvrir, nom_base, numeroter, max_fiches, max_octets)
+        nb_fiches = _repartir(contacts, repartiteur, critere, max_octets is not None)
+        return BilanDecoupage(nb_fiches, tuple((partie.nom, partie.ecrivain.nb_fiches)
+                                               for partie in repartiteur.parties))
+
+    destination = os.fspath(destination)
+    if not destination.lower().endswith(".zip"):
+        os.makedirs(destination, exist_ok=True)
+        return repartir(_ouvrir_dans(destination))
+
+    # Importés ici : seule une destination .zip s'en sert, et ils alourdissent l'import du paquet
+    import tempfile
+    import zipfile
+
+    with zipfile.ZipFile(destination, 'w', zipfile.ZIP_DEFLATED) as archive:
+        if critere is None:
+            # Les parties se suivent : chacune est compressée directement, une seule entrée à la fois
+            return repartir(lambda nom, _: io.TextIOWrapper(archive.open(nom, 'w', force_zip64=True),
+                                                               encoding='utf-8'))
+        with tempfile.TemporaryDirectory() as dossier:
+            bilan = repartir(_ouvrir_dans(dossier))
+            for nom, _ in bilan.fichiers:
+                archive.write(os.path.join(dossier, nom), nom)
+    return bilan
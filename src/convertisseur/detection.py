@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""
+Détection automatique de l'encodage, du délimiteur et du caractère de citation d'un CSV.
+
+La détection ne lit qu'un échantillon borné du début du fichier (64 Ko par défaut) :
+le fichier n'est jamais décodé ni parcouru en entier pour décider.
+"""
+
+import codecs
+import csv
+import io
+import os
+from typing import List, NamedTuple, Optional, Union
+
+# Taille de l'échantillon lu en début de fichier
+TAILLE_ECHANTILLON = 64 * 1024
+
+# Délimiteurs essayés, par ordre de préférence en cas d'égalité
+DELIMITEURS_CANDIDATS = (';', ',', '\t', '|')
+
+# Nombre de lignes de l'échantillon utilisées pour départager les délimiteurs
+_NB_LIGNES_ANALYSEES = 50
+
+
+class FormatCsv(NamedTuple):
+    """Format détecté d'un fichier CSV."""
+    encodage: str
+    delimiteur: str
+    guillemet: str = '"'
+
+    def description(self) -> str:
+        """Description lisible du format, pour l'affichage."""
+        noms = {';': "point-virgule", ',': "virgule", '\t': "tabulation", '|': "barre verticale"}
+        return (f"encodage {self.encodage}, délimiteur {noms.get(self.delimiteur, repr(self.delimiteur))}, "
+                f"guillemets {self.guillemet}")
+
+
+def detecter_encodage(echantillon: bytes) -> str:
+    """
+    Détecte l'encodage d'un échantillon d'octets pris au début d'un fichier.
+
+    Ordre d'essai : marque d'ordre des octets (BOM), UTF-8 strict, puis Windows-1252
+    (exports Excel français) et en dernier recours Latin-1, qui accepte tous les octets.
+
+    Args:
+        echantillon: Premiers octets du fichier
+
+    Returns:
+        Nom de l'encodage, utilisable avec open() et bytes.decode()
+    """
+    if echantillon.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    if echantillon.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return 'utf-16'
+
+    # Décodage incrémental : un caractère multi-octets coupé en fin d'échantillon n'est pas une erreur
+    try:
+        codecs.getincrementaldecoder('utf-8')().decode(echantillon, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        pass
+    try:
+        echantillon.decode('cp1252')
+        return 'cp1252'
+    except UnicodeDecodeError:
+        return 'latin-1'
+
+
+def _lignes_completes(texte: str, echantillon_tronque: bool) -> str:
+    """Retire la dernière ligne de l'échantillon si elle a pu être coupée par la lecture."""
+    if echantillon_tronque and "\n" in texte:
+        return texte[:texte.rfind("\n") + 1]
+    return texte
+
+
+def detecter_delimiteur(texte: str, candidats: tuple = DELIMITEURS_CANDIDATS) -> str:
+    """
+    Détecte le délimiteur d'un extrait de CSV.
+
+    Chaque candidat est essayé avec le lecteur CSV : le meilleur est celui pour lequel le plus de lignes
+    ont le même nombre de champs que l'en-tête, puis celui qui donne le plus de colonnes.
+
+    Args:
+        texte: Début du fichier, décodé
+        candidats: Délimiteurs à essayer
+
+    Returns:
+        Le délimiteur retenu (';' si aucun candidat ne découpe l'en-tête)
+    """
+    meilleur, meilleur_score = ';', (0.0, 1)
+    for candidat in candidats:
+        lignes: List[List[str]] = []
+        for ligne in csv.reader(io.StringIO(texte, newline=''), delimiter=candidat):
+            if ligne:
+                lignes.append(ligne)
+                if len(lignes) >= _NB_LIGNES_ANALYSEES:
+                    break
+        if not lignes or len(lignes[0]) < 2:
+            continue
+        nb_colonnes = len(lignes[0])
+        regularite = sum(1 for ligne in lignes if len(ligne) == nb_colonnes) / len(lignes)
+        score = (regularite, nb_colonnes)
+        if score > meilleur_score:
+            meilleur, meilleur_score = candidat, score
+    return meilleur
+
+
+def detecter_guillemet(texte: str, delimiteur: str) -> str:
+    """
+    Détecte le caractère de citation : `"` sauf si seuls des champs entre apostrophes apparaissent.
+    """
+    if '"' in texte:
+        return '"'
+    if f"{delimiteur}'" in texte or texte.startswith("'"):
+        return "'"
+    return '"'
+
+
+def detecter_format(echantillon: bytes, echantillon_tronque: bool = True) -> FormatCsv:
+    """
+    Détecte le format d'un CSV à partir d'un échantillon de ses premiers octets.
+
+    Args:
+        echantillon: Premiers octets du fichier (au plus quelques dizaines de Ko suffisent)
+        echantillon_tronque: True si l'échantillon ne contient pas tout le fichier
+
+    Returns:
+        Encodage, délimiteur et caractère de citation détectés
+    """
+    encodage = detecter_encodage(echantillon)
+    decodeur = codecs.getincrementaldecoder(encodage)(errors='replace')
+    texte = _lignes_completes(decodeur.decode(echantillon, final=not echantillon_tronque), echantillon_tronque)
+    delimiteur = detecter_delimiteur(texte)
+    return FormatCsv(encodage, delimiteur, detecter_guillemet(texte, delimiteur))
+
+
+def detecter_format_fichier(chemin_csv: Union[str, "os.PathLike[str]"],
+                            taille_echantillon: Optional[int] = None) -> FormatCsv:
+    """
+    Détecte le format d'un fichier CSV en ne lisant que son début.
+
+    Args:
+        chemin_csv: Chemin du fichier CSV
+        taille_echantillon: Nombre d'octets lus (par défaut TAILLE_ECHANTILLON)
+
+    Returns:
+        Encodage, délimiteur et caractère de citation détectés
+    """
+    taille_echantillon = taille_echantillon or TAILLE_ECHANTILLON
+    with open(chemin_csv, 'rb') as fichier:
+        echantillon = fichier.read(taille_echantillon + 1)
+    tronque = len(echantillon) > taille_echantillon
+    return detecter_format(echantillon[:taille_echantillon], tronque)
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+Détection et fusion des contacts en double pendant la conversion.
+
+Les contacts extraits sont rangés en colonnes (`TableContacts`), puis chaque colonne clé (email,
+téléphone, nom) est indexée d'une traite dans une table de hachage : deux lignes qui partagent une clé
+sont réunies par union-find. Le regroupement est donc quasi linéaire
+en nombre de lignes, sans aucune comparaison deux à deux. Chaque groupe donne une seule fiche, qui
+reprend le nom de sa première ligne et toutes les valeurs distinctes de ses champs (plusieurs TEL,
+EMAIL, mots-clés réunis dans CATEGORIES...). Si le plan écrit des UID, la fiche prend celui de la
+première ligne du groupe.
+"""
+
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, TypeVar
+
+from .identifiants import cle_nom
+from .plan import Contact, PlanConversion
+from .statistiques import StatistiquesConversion
+from .table import TableContacts
+
+# Clés de regroupement : deux lignes qui partagent l'une de ces valeurs désignent le même contact
+CLES_DOUBLONS = ('email', 'telephone', 'nom')
+
+_Fiche = TypeVar("_Fiche")
+
+
+def _racine(parents: List[int], i: int) -> int:
+    """Représentant du groupe de `i`, avec compression de chemin par division."""
+    while parents[i] != i:
+        parents[i] = parents[parents[i]]
+        i = parents[i]
+    return i
+
+
+def generer_cartes_fusionnees(
+    lignes: Iterable[List[str]],
+    plan: PlanConversion,
+    cles: Sequence[str] = CLES_DOUBLONS,
+    statistiques: Optional[StatistiquesConversion] = None
+) -> Iterator[str]:
+    """
+    Convertit des lignes en fiches en fusionnant les contacts en double.
+
+    Toutes les lignes sont lues avant d'écrire la première fiche. Les fiches sortent dans l'ordre
+    de la première ligne de chaque groupe ; une ligne sans doublon donne la même fiche que sans fusion.
+
+    Args:
+        lignes: Lignes de données du CSV (sans l'en-tête)
+        plan: Plan de conversion compilé pour l'en-tête du CSV
+        cles: Clés de regroupement, parmi CLES_DOUBLONS
+        statistiques: Si fourni, les lignes lues, ignorées et les fiches émises y sont comptées
+
+    Yields:
+        Le texte de chaque fiche
+    """
+    return _generer_fusionnes(lignes, plan, cles, statistiques, plan.carte_multiple)
+
+
+def generer_contacts_fusionnes(
+    lignes: Iterable[List[str]],
+    plan: PlanConversion,
+    cles: Sequence[str] = CLES_DOUBLONS,
+    statistiques: Optional[StatistiquesConversion] = None
+) -> Iterator[Contact]:
+    """
+    Comme `generer_cartes_fusionnees`, mais rend les contacts fusionnés pour `convertisseur.ecrivains`.
+
+    Yields:
+        Chaque contact fusionné, dans l'ordre de la première ligne de son groupe
+    """
+    return _generer_fusionnes(lignes, plan, cles, statistiques, plan.contact_multiple)
+
+
+def _generer_fusionnes(
+    lignes: Iterable[List[str]],
+    plan: PlanConversion,
+    cles: Sequence[str],
+    statistiques: Optional[StatistiquesConversion],
+    assembler: Callable[[str, str, Sequence[Sequence[str]], Optional[str]], _Fiche]
+) -> Iterator[_Fiche]:
+    """Regroupe les doublons puis assemble chaque groupe avec `assembler` (fiche texte ou contact)."""
+    inconnues = set(cles) - set(CLES_DOUBLONS)
+    if inconnues:
+        raise ValueError(f"Clés de doublons inconnues : {', '.join(sorted(inconnues))}")
+
+    # Position, dans les valeurs extraites, des champs servant de clés
+    positions_cles = [plan.types_champs.index(cle) for cle in ('email', 'telephone')
+                      if cle in cles and cle in plan.types_champs]
+    par_nom = 'nom' in cles
+
+    # Les contacts sont gardés en colonnes : seules les valeurs des champs du plan restent en mémoire
+    table = TableContacts(plan.types_champs)
+    ajouter = table.ajouter
+    avec_uid = plan.cles_uid is not None
+    cles_uid: List[str] = []
+    extraire = plan.extraire
+    nb_lues = 0
+
+    for ligne in lignes:
+        nb_lues += 1
+        contact = extraire(ligne)
+        if contact is None:
+            continue
+        ajouter(*contact)
+        if avec_uid:
+            cles_uid.append(plan.cle_uid(contact[0], contact[1], ligne))
+
+    # Indexation colonne par colonne, une table par clé : une adresse mail ne peut pas rencontrer un
+    # numéro de téléphone
+    parents = list(range(len(table)))
+    colonnes_cles: List[Iterable[str]] = [map(str.casefold, table.colonnes[position]) for position in positions_cles]
+    if par_nom:
+        colonnes_cles.append(map(cle_nom, table.prenoms, table.noms))
+    for colonne in colonnes_cles:
+        index: Dict[str, int] = {}
+        for i, cle in enumerate(colonne):
+            if not cle:
+                continue
+            j = index.setdefault(cle, i)
+            if j != i:
+                # Union : le plus petit indice représente le groupe, donc sa première ligne
+                racine_i, racine_j = _racine(parents, i), _racine(parents, j)
+                if racine_i < racine_j:
+                    parents[racine_j] = racine_i
+                elif racine_j < racine_i:
+                    parents[racine_i] = racine_j
+
+    groupes: Dict[int, List[int]] = {}
+    for i in range(len(table)):
+        groupes.setdefault(_racine(parents, i), []).append(i)
+
+    if statistiques is not None:
+        statistiques.lignes_lues += nb_lues
+        statistiques.lignes_ignorees += nb_lues - len(table)
+        statistiques.fiches_emises += len(groupes)
+
+    prenoms, noms, colonnes = table.prenoms, table.noms, table.colonnes
+    for membres in groupes.values():
+        premier = membres[0]
+        uid = plan.identifiant(cles_uid[premier]) if avec_uid else None
+        if len(membres) == 1:
+            yield assembler(prenoms[premier], noms[premier],
+                            [(colonne[premier],) if colonne[premier] else () for colonne in colonnes], uid)
+            continue
+        # Valeurs distinctes sans tenir compte de la casse (M@X.FR et m@x.fr), la première écriture gardée
+        champs = []
+        for colonne in colonnes:
+            vues: Dict[str, str] = {}
+            for membre in membres:
+                valeur = colonne[membre]
+                if valeur:
+                    vues.setdefault(valeur.casefold(), valeur)
+            champs.append(list(vues.values()))
+        yield assembler(prenoms[premier], noms[premier], champs, uid)
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+Échappement des valeurs et pliage des lignes vCard (RFC 6350, sections 3.2 et 3.4 ; mêmes règles en 3.0).
+
+Dans une valeur texte, la barre oblique inverse, la virgule, le point-virgule et les sauts de ligne
+sont échappés (`\\\\`, `\\,`, `\\;`, `\\n`) : sans cela, une adresse « 12, rue X » ou une note sur deux
+lignes coupe la fiche. Une ligne de plus de 75 octets est pliée : la suite continue sur la ligne
+suivante après une espace, sans jamais couper un caractère UTF-8 en deux.
+`desechapper` fait le chemin inverse pour la relecture d'un VCF (`convertisseur.lecture_vcf`).
+
+La plupart des valeurs sont courtes, en ASCII et sans caractère spécial : une seule recherche par
+expression régulière et un test de longueur suffisent alors, sans copie de la chaîne.
+"""
+
+import re
+
+# Longueur maximale d'une ligne, en octets, sans la fin de ligne
+LONGUEUR_MAX_LIGNE = 75
+
+# Caractères à échapper, exposés pour les boucles qui testent la valeur avant d'appeler `echapper`
+A_ECHAPPER = re.compile(r"[\\,;\r\n]")
+_ECHAPPEMENTS = str.maketrans({"\\": "\\\\", ",": "\\,", ";": "\\;", "\n": "\\n"})
+# Liste de valeurs (CATEGORIES) : les virgules du CSV séparent les valeurs et ne sont pas échappées
+A_ECHAPPER_LISTE = re.compile(r"[\\;\r\n]")
+_ECHAPPEMENTS_LISTE = str.maketrans({"\\": "\\\\", ";": "\\;", "\n": "\\n"})
+
+
+def echapper(valeur: str) -> str:
+    """Échappe une valeur texte ; la valeur est rendue telle quelle si elle n'a rien à échapper."""
+    if A_ECHAPPER.search(valeur) is None:
+        return valeur
+    if "\r" in valeur:
+        valeur = valeur.replace("\r\n", "\n").replace("\r", "\n")
+    return valeur.translate(_ECHAPPEMENTS)
+
+
+def echapper_liste(valeur: str) -> str:
+    """Comme `echapper`, pour une liste de valeurs séparées par des virgules (les virgules sont gardées)."""
+    if A_ECHAPPER_LISTE.search(valeur) is None:
+        return valeur
+    if "\r" in valeur:
+        valeur = valeur.replace("\r\n", "\n").replace("\r", "\n")
+    return valeur.translate(_ECHAPPEMENTS_LISTE)
+
+
+def plier(ligne: str) -> str:
+    """
+    Plie une ligne de contenu (sans sa fin de ligne) en segments d'au plus 75 octets UTF-8.
+
+    Returns:
+        La ligne, dont les segments sont séparés par un saut de ligne suivi d'une espace
+    """
+    if len(ligne) <= LONGUEUR_MAX_LIGNE and ligne.isascii():
+        return ligne
+    if ligne.isascii():
+        # Un caractère par octet : les segments se découpent directement dans la chaîne
+        segments = [ligne[:LONGUEUR_MAX_LIGNE]]
+        segments += [ligne[i:i + LONGUEUR_MAX_LIGNE - 1]
+                     for i in range(LONGUEUR_MAX_LIGNE, len(ligne), LONGUEUR_MAX_LIGNE - 1)]
+        return "\n ".join(segments)
+
+    donnees = ligne.encode("utf-8")
+    if len(donnees) <= LONGUEUR_MAX_LIGNE:
+        return ligne
+    morceaux = []
+    debut = 0
+    # L'espace qui ouvre chaque ligne de continuation compte dans ses 75 octets
+    taille = LONGUEUR_MAX_LIGNE
+    while len(donnees) - debut > taille:
+        fin = debut + taille
+        # Ne pas couper un caractère : reculer tant que l'octet suivant est un octet de continuation
+        while donnees[fin] & 0xC0 == 0x80:
+            fin -= 1
+        morceaux.append(donnees[debut:fin])
+        debut = fin
+        taille = LONGUEUR_MAX_LIGNE - 1
+    morceaux.append(donnees[debut:])
+    return b"\n ".join(morceaux).decode("utf-8")
+
+
+def ligne_contenu(debut: str, valeur: str, fin: str = "\n") -> str:
+    """
+    Assemble une ligne à partir de son début (nom et paramètres, en ASCII), de sa valeur déjà échappée
+    et de sa fin (terminée par le saut de ligne), pliée si elle dépasse 75 octets.
+    """
+    if len(debut) + len(valeur) + len(fin) <= LONGUEUR_MAX_LIGNE + 1 and valeur.isascii():
+        return debut + valeur + fin
+    return plier(debut + valeur + fin[:-1]) + "\n"
+
+
+_ECHAPPEMENT_LU = re.compile(r"\\(.)", re.DOTALL)
+_CARACTERES_ECHAPPES = {"n": "\n", "N": "\n"}
+
+
+def desechapper(valeur: str) -> str:
+    """
+    Inverse de `echapper` : `\\n` (ou `\\N`) redevient un saut de ligne, et `\\,`, `\\;`, `\\\\` le caractère
+    échappé. Une séquence inconnue garde son caractère, sans la barre oblique inverse.
+    """
+    if "\\" not in valeur:
+        return valeur
+    return _ECHAPPEMENT_LU.sub(lambda m: _CARACTERES_ECHAPPES.get(m.group(1), m.group(1)), valeur)
@@ -0,0 +1,342 @@
+# -*- coding: utf-8 -*-
+"""
+Écrivains de sortie : vCard 3.0, vCard 4.0, jCard (JSON, RFC 7095) et xCard (XML, RFC 6351).
+
+Le CSV est lu une seule fois en `Contact` (voir `PlanConversion.contact`), puis chaque contact est remis
+à tous les écrivains demandés : une même conversion produit plusieurs formats sans relire ni redécouper
+le fichier. Les écrivains écrivent au fil de l'eau dans un flux texte ; jCard et xCard ouvrent et
+referment eux-mêmes leur tableau JSON ou leur élément racine.
+
+Les trois formats vCard 4.0 partagent une même liste de propriétés par contact (nom, paramètres, type de
+valeur, valeurs), calculée une seule fois par contact et rendue ensuite dans la syntaxe de chaque format.
+"""
+
+import json
+import os
+from contextlib import ExitStack
+from functools import lru_cache
+from typing import Dict, List, Mapping, Optional, Sequence, TextIO, Tuple, Type, Union
+from json.encoder import encode_basestring
+
+from .conversion import ENCODAGE_PAR_DEFAUT, ecrire_vcf, generer_contacts
+from .echappement import echapper, echapper_liste, ligne_contenu
+from .plan import CHAMPS_OPTIONNELS, Contact, debut_carte, fin_carte
+from .telephone import PAYS_PAR_DEFAUT
+
+# Propriété vCard 4.0 : (nom, paramètres, type de valeur, valeurs). Les valeurs des propriétés de
+# _COMPOSANTES sont leurs composantes ; pour les autres, une ou plusieurs valeurs (CATEGORIES).
+_Propriete = Tuple[str, Tuple[Tuple[str, str], ...], str, Tuple[str, ...]]
+
+# Propriétés structurées et noms de leurs composantes (éléments xCard)
+_COMPOSANTES: Dict[str, Tuple[str, ...]] = {
+    'n': ('surname', 'given', 'additional', 'prefix', 'suffix'),
+    'adr': ('pobox', 'ext', 'street', 'locality', 'region', 'code', 'country'),
+}
+
+# Type de valeur par défaut des propriétés qui ne sont pas du texte (VALUE= n'est écrit qu'en cas d'écart)
+_TYPES_PAR_DEFAUT = {'uid': 'uri', 'related': 'uri', 'rev': 'timestamp'}
+
+# Champs optionnels en vCard 4.0 : type de champ -> (propriété, paramètres)
+_PROPRIETES_V4: Dict[str, Tuple[str, Tuple[Tuple[str, str], ...]]] = {
+    'role': ('title', ()),
+    'agent': ('related', (('type', 'agent'),)),
+    'relation': ('related', (('type', 'contact'),)),
+    'mots_cle': ('categories', ()),
+    'telephone': ('tel', (('type', 'cell'),)),
+    'email': ('email', ()),
+    'adresse': ('adr', (('type', 'home'),)),
+}
+
+# Début et fin de ligne des champs optionnels en vCard 3.0, comme les écrit PlanConversion
+_LIGNES_V3 = {type_champ: (debut, fin) for type_champ, debut, fin in CHAMPS_OPTIONNELS}
+
+# Les écrivains vCard 4.0, jCard et xCard reçoivent le même contact l'un après l'autre :
+# ses propriétés ne sont calculées que pour le premier
+@lru_cache(maxsize=1)
+def _proprietes_v4(contact: Contact) -> List[_Propriete]:
+    """Propriétés vCard 4.0 d'un contact, dans l'ordre d'écriture (sans BEGIN, END ni VERSION)."""
+    proprietes: List[_Propriete] = [
+        ('fn', (), 'text', (f"{contact.prenom} {contact.nom}",)),
+        ('n', (), 'text', (contact.nom, contact.prenom, "", "", "")),
+    ]
+    for type_champ, valeurs in contact.champs:
+        nom, parametres = _PROPRIETES_V4[type_champ]
+        if type_champ == 'mots_cle':
+            # Comme en vCard 3.0, les virgules d'une cellule séparent plusieurs mots-clés
+            mots_cles = tuple(mot.strip() for valeur in valeurs for mot in valeur.split(",") if mot.strip())
+            if mots_cles:
+                proprietes.append((nom, parametres, 'text', mots_cles))
+            continue
+        for valeur in valeurs:
+            if type_champ == 'adresse':
+                proprietes.append((nom, parametres, 'text', ("", "", valeur, "", "", "", "")))
+            elif type_champ == 'telephone' and valeur.lstrip("+").isdigit() and valeur.isascii():
+                # Numéro normalisé : écrit comme URI tel:, recommandé par la RFC 6350
+                proprietes.append((nom, parametres, 'uri', (f"tel:{valeur}",)))
+            else:
+                proprietes.append((nom, parametres, 'text', (valeur,)))
+    if contact.uid:
+        proprietes.append(('uid', (), 'uri', (contact.uid,)))
+    if contact.note:
+        proprietes.append(('note', (), 'text', (contact.note,)))
+    if contact.revision:
+        proprietes.append(('rev', (), 'timestamp', (contact.revision,)))
+    return proprietes
+
+
+class EcrivainContacts:
+    """
+    Écrivain de contacts dans un flux texte, au fil de l'eau.
+
+    Les sous-classes définissent `formater` (texte d'un contact) et, si le format a un début et une fin
+    de document, `commencer` et `terminer`.
+
+    Args:
+        destination: Flux texte ouvert en écriture
+    """
+
+    extension = ".vcf"
+    type_mime = "text/vcard"
+
+    def __init__(self, destination: TextIO):
+        self.write = destination.write
+        self.nb_fiches = 0
+
+    def commencer(self) -> None:
+        """Écrit le début du document (rien pour les formats vCard)."""
+
+    def ecrire(self, contact: Contact) -> None:
+        """Écrit un contact."""
+        self.ecrire_texte(self.formater(contact))
+
+    def ecrire_texte(self, texte: str) -> None:
+        """Écrit le texte d'un contact déjà mis en forme par `formater`."""
+        self.write(texte)
+        self.nb_fiches += 1
+
+    def terminer(self) -> None:
+        """Écrit la fin du document (rien pour les formats vCard)."""
+
+    def formater(self, contact: Contact) -> str:
+        """Texte d'un contact dans le format de l'écrivain."""
+        raise NotImplementedError
+
+
+class EcrivainVCard3(EcrivainContacts):
+    """vCard 3.0, identique octet pour octet à la sortie de `ecrire_vcf`."""
+
+    def formater(self, contact: Contact) -> str:
+        morceaux = [debut_carte(contact.prenom, contact.nom)]
+        for type_champ, valeurs in contact.champs:
+            debut, fin = _LIGNES_V3[type_champ]
+            if type_champ == 'mots_cle':
+                morceaux.append(ligne_contenu(debut, echapper_liste(",".join(valeurs)), fin))
+                continue
+            for valeur in valeurs:
+                morceaux.append(ligne_contenu(debut, echapper(valeur), fin))
+        if contact.uid:
+            morceaux += ("UID:", contact.uid, "\n")
+        morceaux.append(fin_carte(contact.note, contact.revision))
+        return "".join(morceaux)
+
+
+class EcrivainVCard4(EcrivainContacts):
+    """vCard 4.0 (RFC 6350)."""
+
+    def formater(self, contact: Contact) -> str:
+        morceaux = ["BEGIN:VCARD\nVERSION:4.0\n"]
+        for nom, parametres, type_valeur, valeurs in _proprietes_v4(contact):
+            if type_valeur == 'text':
+                valeurs = tuple(echapper(valeur) for valeur in valeurs)
+            morceaux.append(ligne_contenu(_debut_ligne_v4(nom, parametres, type_valeur),
+                                          (";" if nom in _COMPOSANTES else ",").join(valeurs)))
+        morceaux.append("END:VCARD\n\n")
+        return "".join(morceaux)
+
+
+@lru_cache(maxsize=None)
+def _debut_ligne_v4(nom: str, parametres: Tuple[Tuple[str, str], ...], type_valeur: str) -> str:
+    """Nom et paramètres d'une ligne vCard 4.0, jusqu'au deux-points (en nombre fini : mis en cache)."""
+    morceaux = [nom.upper()]
+    for parametre, valeur in parametres:
+        morceaux += (";", parametre.upper(), "=", valeur)
+    if type_valeur != _TYPES_PAR_DEFAUT.get(nom, 'text'):
+        morceaux += (";VALUE=", type_valeur)
+    morceaux.append(":")
+    return "".join(morceaux)
+
+
+class EcrivainJCard(EcrivainContacts):
+    """jCard (RFC 7095) : un tableau JSON de fiches, écrit fiche par fiche."""
+
+    extension = ".json"
+    type_mime = "application/vcard+json"
+
+    def commencer(self) -> None:
+        self.write("[")
+
+    def ecrire_texte(self, texte: str) -> None:
+        self.write(",\n" if self.nb_fiches else "\n")
+        super().ecrire_texte(texte)
+
+    def terminer(self) -> None:
+        self.write("\n]\n")
+
+    def formater(self, contact: Contact) -> str:
+        # Le JSON est assemblé directement, avec les séparateurs de json.dumps : seules les valeurs
+        # sont encodées à chaque fiche, le début de chaque propriété est mis en cache
+        morceaux = ['["vcard", [["version", {}, "text", "4.0"]']
+        for nom, parametres, type_valeur, valeurs in _proprietes_v4(contact):
+            if nom == 'rev':
+                # jCard écrit les horodatages au format ISO 8601 étendu
+                valeurs = tuple(_horodatage_etendu(valeur) for valeur in valeurs)
+            texte = ", ".join([encode_basestring(valeur) for valeur in valeurs])
+            if nom in _COMPOSANTES:
+                texte = f"[{texte}]"
+            morceaux += (_debut_propriete_json(nom, parametres, type_valeur), texte, "]")
+        morceaux.append("]]")
+        return "".join(morceaux)
+
+
+@lru_cache(maxsize=None)
+def _debut_propriete_json(nom: str, parametres: Tuple[Tuple[str, str], ...], type_valeur: str) -> str:
+    """Début d'une propriété jCard, jusqu'à sa première valeur (en nombre fini : mis en cache)."""
+    return ", " + json.dumps([nom, dict(parametres), type_valeur], ensure_ascii=False)[:-1] + ", "
+
+
+class EcrivainXCard(EcrivainContacts):
+    """xCard (RFC 6351) : un document XML `<vcards>`, écrit fiche par fiche."""
+
+    extension = ".xml"
+    type_mime = "application/vcard+xml"
+
+    def commencer(self) -> None:
+        self.write('<?xml version="1.0" encoding="UTF-8"?>\n<vcards xmlns="urn:ietf:params:xml:ns:vcard-4.0">\n')
+
+    def terminer(self) -> None:
+        self.write("</vcards>\n")
+
+    def formater(self, contact: Contact) -> str:
+        morceaux = ["<vcard>"]
+        for nom, parametres, type_valeur, valeurs in _proprietes_v4(contact):
+            if any("&" in valeur or "<" in valeur or ">" in valeur for valeur in valeurs):
+                valeurs = tuple(_echapper_xml(valeur) for valeur in valeurs)
+            morceaux.append(_gabarit_xml(nom, parametres, type_valeur, len(valeurs)).format(*valeurs))
+        morceaux.append("</vcard>\n")
+        return "".join(morceaux)
+
+
+def _echapper_xml(texte: str) -> str:
+    """
+    Échappe &, < et > pour le contenu d'un élément XML, comme `xml.sax.saxutils.escape` : importer
+    `xml.sax.saxutils` chargerait `urllib.request` (et avec lui http, email et ssl) au démarrage.
+    """
+    return texte.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+@lru_cache(maxsize=None)
+def _gabarit_xml(nom: str, parametres: Tuple[Tuple[str, str], ...], type_valeur: str, nb_valeurs: int) -> str:
+    """
+    Gabarit xCard d'une propriété (balises et paramètres, `{}` à la place des valeurs), pour `str.format`.
+    Les combinaisons sont en nombre fini : chaque gabarit est construit une fois.
+    """
+    morceaux = [f"<{nom}>"]
+    if parametres:
+        morceaux.append("<parameters>")
+        for parametre, valeur in parametres:
+            morceaux.append(f"<{parametre}><text>{_echapper_xml(valeur)}</text></{parametre}>")
+        morceaux.append("</parameters>")
+    for composante in _COMPOSANTES.get(nom) or (type_valeur,) * nb_valeurs:
+        morceaux.append(f"<{composante}>{{}}</{composante}>")
+    morceaux.append(f"</{nom}>")
+    return "".join(morceaux)
+
+
+def _horodatage_etendu(horodatage: str) -> str:
+    """"20250314T093000Z" -> "2025-03-14T09:30:00Z" (toute autre forme est rendue telle quelle)."""
+    if len(horodatage) == 16 and horodatage[8] == "T" and horodatage.endswith("Z"):
+        h = horodatage
+        return f"{h[:4]}-{h[4:6]}-{h[6:8]}T{h[9:11]}:{h[11:13]}:{h[13:15]}Z"
+    return horodatage
+
+
+# Formats de sortie disponibles, par nom
+FORMATS_SORTIE: Dict[str, Type[EcrivainContacts]] = {
+    'vcard3': EcrivainVCard3,
+    'vcard4': EcrivainVCard4,
+    'jcard': EcrivainJCard,
+    'xcard': EcrivainXCard,
+}
+FORMAT_PAR_DEFAUT = 'vcard3'
+
+
+def ecrire_contacts(
+    source: Union[str, "os.PathLike[str]", TextIO],
+    destinations: Mapping[str, Union[str, "os.PathLike[str]", TextIO]],
+    mappings_colonnes: Dict[str, str],
+    note_commune: Optional[str] = None,
+    delimiter: str = ';',
+    *,
+    pays_telephone: str = PAYS_PAR_DEFAUT,
+    encodage: str = ENCODAGE_PAR_DEFAUT,
+    guillemet: str = '"',
+    projection: bool = False,
+    fusionner_doublons: bool = False,
+    colonnes_uid: Optional[Sequence[str]] = None,
+    revision: Optional[str] = None
+) -> int:
+    """
+    Convertit un CSV dans un ou plusieurs formats en une seule lecture du fichier.
+
+    Args:
+        source: Chemin du fichier CSV ou flux texte déjà ouvert
+        destinations: Pour chaque format de FORMATS_SORTIE, chemin ou flux texte où l'écrire
+        mappings_colonnes: Dictionnaire associant les types de champs aux noms de colonnes du CSV
+        note_commune: Note à ajouter à toutes les fiches (optionnel)
+        delimiter: Délimiteur utilisé dans le CSV (par défaut ';')
+        pays_telephone: Pays dont l'indicatif est ajouté aux numéros sans indicatif (par défaut 'FR')
+        encodage: Encodage du fichier quand `source` est un chemin (par défaut 'utf-8-sig')
+        guillemet: Caractère de citation des champs (par défaut '"')
+        projection: Si True et que `source` est un chemin, seules les colonnes utilisées sont décodées
+        fusionner_doublons: Si True, les contacts en double sont fusionnés en une seule fiche
+        colonnes_uid: Si fourni, colonnes dont est calculé l'UID déterministe de chaque fiche
+        revision: Si fourni, horodatage écrit dans le champ REV de toutes les fiches
+
+    Returns:
+        Nombre de contacts écrits (dans chaque format)
+
+    Raises:
+        ValueError: Si un format est inconnu
+        ErreurConversion: Si aucune colonne n'est détectée ou si les colonnes du nom sont absentes
+    """
+    inconnus = set(destinations) - set(FORMATS_SORTIE)
+    if inconnus:
+        raise ValueError(f"Formats de sortie inconnus : {', '.join(sorted(inconnus))}")
+    if list(destinations) == ['vcard3']:
+        # vCard 3.0 seul : le plan écrit directement le texte des fiches, sans passer par les contacts
+        return ecrire_vcf(source, destinations['vcard3'], mappings_colonnes, note_commune, delimiter,
+                          pays_telephone=pays_telephone, encodage=encodage, guillemet=guillemet, projection=projection,
+                          fusionner_doublons=fusionner_doublons, colonnes_uid=colonnes_uid, revision=revision)
+
+    with ExitStack() as fichiers:
+        ecrivains = []
+        for nom_format, destination in destinations.items():
+            if isinstance(destination, (str, os.PathLike)):
+                destination = fichiers.enter_context(open(destination, 'w', encoding='utf-8'))
+            ecrivains.append(FORMATS_SORTIE[nom_format](destination))
+
+        for ecrivain in ecrivains:
+            ecrivain.commencer()
+        ecrire = [ecrivain.ecrire for ecrivain in ecrivains]
+        nb_fiches = 0
+        contacts = generer_contacts(source, mappings_colonnes, note_commune, delimiter, pays_telephone=pays_telephone,
+                                    encodage=encodage, guillemet=guillemet, projection=projection,
+                                    fusionner_doublons=fusionner_doublons, colonnes_uid=colonnes_uid,
+                                    revision=revision)
+        for contact in contacts:
+            for ecrire_contact in ecrire:
+                ecrire_contact(contact)
+            nb_fiches += 1
+        for ecrivain in ecrivains:
+            ecrivain.terminer()
+    return nb_fiches
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+Identifiants stables des fiches : UID déterministe calculé à partir de colonnes clés, et horodatage REV.
+
+Un même contact reçoit le même UID à chaque conversion : les carnets d'adresses qui importent le VCF
+mettent alors à jour la fiche existante au lieu d'en créer une seconde, et deux VCF se comparent par UID.
+L'UID est un simple condensat BLAKE2b de la clé, sans tirage aléatoire ni objet `uuid` par ligne.
+"""
+
+import hashlib
+import unicodedata
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Optional
+
+from .noms import TAILLE_CACHE_NOMS
+
+
+@lru_cache(maxsize=TAILLE_CACHE_NOMS)
+def cle_nom(prenom: str, nom: str) -> str:
+    """
+    Clé de comparaison d'un nom : sans accents, sans casse, espaces et tirets unifiés.
+
+    Exemple : ("Élodie", "DUPRÉ") et ("elodie", "Dupre") donnent la même clé.
+    """
+    texte = f"{nom}|{prenom}".replace("-", " ")
+    texte = "".join(c for c in unicodedata.normalize("NFKD", texte) if not unicodedata.combining(c))
+    return " ".join(texte.casefold().split())
+
+
+def uid_contact(cle: str) -> str:
+    """
+    UID stable d'un contact, calculé à partir de sa clé (même clé, même UID d'une conversion à l'autre).
+
+    Le condensat BLAKE2b de la clé est présenté comme un UUID de version 8 (format libre, RFC 9562).
+
+    Args:
+        cle: Clé du contact (par exemple la clé de nom de `cle_nom`)
+
+    Returns:
+        L'UID au format "urn:uuid:xxxxxxxx-xxxx-8xxx-yxxx-xxxxxxxxxxxx"
+    """
+    h = hashlib.blake2b(cle.encode("utf-8"), digest_size=16).hexdigest()
+    variante = "89ab"[int(h[16], 16) & 3]
+    return f"urn:uuid:{h[:8]}-{h[8:12]}-8{h[13:16]}-{variante}{h[17:20]}-{h[20:]}"
+
+
+def horodatage_revision(moment: Optional[datetime] = None) -> str:
+    """
+    Valeur du champ REV d'une conversion : horodatage UTC au format de base ISO 8601.
+
+    Args:
+        moment: Instant à horodater (par défaut : maintenant)
+
+    Returns:
+        L'horodatage, par exemple "20250314T093000Z"
+    """
+    moment = moment or datetime.now(timezone.utc)
+    return moment.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
@@ -0,0 +1,348 @@
+# -*- coding: utf-8 -*-
+"""
+Reconversion incrémentale : seules les lignes modifiées depuis la conversion précédente sont réécrites.
+
+Un fichier d'état, enregistré à côté du VCF (`<vcf>.etat`), garde pour chaque contact un UID stable dérivé
+de sa clé de nom (ou des colonnes choisies pour l'UID), l'empreinte des octets de sa ligne et la position
+de sa fiche dans le VCF. À la conversion suivante, une ligne dont l'empreinte n'a pas changé reprend les
+octets de sa fiche dans l'ancien VCF, sans même être découpée en colonnes ; un CSV identique au précédent
+n'est pas relu. Les contacts ajoutés, modifiés et supprimés sont renvoyés, et les fiches ajoutées ou
+modifiées peuvent être écrites dans un VCF delta.
+"""
+
+import codecs
+import csv
+import hashlib
+import io
+import json
+import mmap
+import os
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from .conversion import ENCODAGE_PAR_DEFAUT
+from .identifiants import cle_nom, uid_contact
+from .plan import ErreurConversion, PlanConversion
+from .projection import lire_entete_octets, lire_enregistrement_octets, projection_possible
+from .telephone import PAYS_PAR_DEFAUT
+
+# Version du format des fiches et de l'état : la changer invalide les états déjà enregistrés
+VERSION_ETAT = 1
+
+SUFFIXE_ETAT = ".etat"
+
+# Séparateur des cellules dans l'empreinte d'une ligne lue par csv.reader (absent des CSV exportés)
+_SEPARATEUR = "\x1f"
+
+_TAILLE_BLOC = 1024 * 1024
+
+
+class BilanIncremental(NamedTuple):
+    """Résultat d'une reconversion incrémentale. Les contacts sont désignés par leur UID."""
+    nb_fiches: int
+    ajoutes: List[str]
+    modifies: List[str]
+    supprimes: List[str]
+    nb_inchanges: int
+    fichier_inchange: bool = False
+
+
+def empreinte_fichier(chemin: str) -> str:
+    """Empreinte BLAKE2b du contenu d'un fichier, lu par blocs."""
+    condensat = hashlib.blake2b(digest_size=16)
+    with open(chemin, "rb") as fichier:
+        for bloc in iter(lambda: fichier.read(_TAILLE_BLOC), b""):
+            condensat.update(bloc)
+    return condensat.hexdigest()
+
+
+def _empreinte_configuration(mappings_colonnes: Dict[str, str], note_commune: Optional[str], delimiter: str,
+                             pays_telephone: str, encodage: str, guillemet: str,
+                             colonnes_uid: Optional[Sequence[str]], revision: bool) -> str:
+    """Empreinte de tout ce qui, en dehors des lignes elles-mêmes, change le texte des fiches."""
+    parametres = [VERSION_ETAT, sorted(mappings_colonnes.items()), note_commune, delimiter,
+                  pays_telephone, encodage, guillemet, os.linesep]
+    # L'horodatage REV change à chaque conversion : seule sa présence compte.
+    # Sans UID ni REV, l'empreinte reste celle des états déjà enregistrés.
+    if colonnes_uid is not None or revision:
+        parametres.append([None if colonnes_uid is None else list(colonnes_uid), revision])
+    return hashlib.blake2b(json.dumps(parametres).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _lire_entete_etat(chemin_etat: str, configuration: str) -> Optional[Dict[str, Any]]:
+    """
+    En-tête de l'état de la conversion précédente (configuration, empreintes du CSV et du VCF).
+
+    Returns:
+        L'en-tête, ou None si l'état est absent, illisible ou d'une autre configuration
+    """
+    try:
+        with open(chemin_etat, "r", encoding="utf-8") as fichier:
+            entete = json.loads(fichier.readline())
+    except (OSError, ValueError):
+        return None
+    if not isinstance(entete, dict) or entete.get("configuration") != configuration:
+        return None
+    return entete
+
+
+def _lire_contacts_etat(chemin_etat: str) -> Tuple[List[str], List[str], List[str], List[str]]:
+    """
+    Contacts de l'état précédent, dans l'ordre du VCF (une ligne par contact après l'en-tête : UID,
+    empreinte de la ligne, position et longueur de la fiche, séparés par des tabulations).
+
+    Returns:
+        (UID, empreintes, positions, longueurs), une liste par colonne
+    """
+    with open(chemin_etat, "r", encoding="utf-8") as fichier:
+        fichier.readline()
+        texte = fichier.read().rstrip("\n")
+    # Un seul découpage pour tout le fichier, bien plus rapide qu'un découpage par ligne
+    valeurs = texte.replace("\n", "\t").split("\t") if texte else []
+    return valeurs[0::4], valeurs[1::4], valeurs[2::4], valeurs[3::4]
+
+
+def _ecrire_etat(chemin_etat: str, entete: Dict[str, Any], contacts: List[Tuple[str, str, int, int]]) -> None:
+    """Enregistre l'état dans un fichier temporaire puis le met en place d'un coup."""
+    temporaire = f"{chemin_etat}.tmp"
+    with open(temporaire, "w", encoding="utf-8") as fichier:
+        fichier.write(json.dumps(entete) + "\n")
+        fichier.writelines(f"{uid}\t{empreinte}\t{debut}\t{longueur}\n"
+                           for uid, empreinte, debut, longueur in contacts)
+    os.replace(temporaire, chemin_etat)
+
+
+def _enregistrements(donnees: bytes, position: int, encodage: str, delimiter: str,
+                     guillemet: str) -> Iterator[bytes]:
+    """Octets de chaque enregistrement non vide qui suit `position`, sans sa fin de ligne."""
+    octet_guillemet = guillemet.encode("ascii")
+    find = donnees.find
+    fin = len(donnees)
+    while position < fin:
+        fin_ligne = find(b"\n", position)
+        suivant = fin_ligne + 1 if fin_ligne >= 0 else fin
+        if find(octet_guillemet, position, suivant) >= 0:
+            # Champ cité, éventuellement sur plusieurs lignes : csv.reader délimite l'enregistrement
+            _, suivant = lire_enregistrement_octets(donnees, position, fin, encodage, delimiter, guillemet)
+        brut = donnees[position:suivant].rstrip(b"\r\n")
+        position = suivant
+        if brut:
+            yield brut
+
+
+def _encoder(texte: str, fin_de_ligne: bytes) -> bytes:
+    """Octets d'une fiche tels que les écrit un fichier texte UTF-8 (fins de ligne de la plateforme)."""
+    donnees = texte.encode("utf-8")
+    return donnees if fin_de_ligne == b"\n" else donnees.replace(b"\n", fin_de_ligne)
+
+
+def _sans_revision(fiche: bytes) -> bytes:
+    """Octets d'une fiche sans sa ligne REV (la dernière avant END:VCARD)."""
+    debut = fiche.rfind(b"REV:")
+    if debut < 0:
+        return fiche
+    return fiche[:debut] + fiche[fiche.index(b"END:VCARD", debut):]
+
+
+def convertir_incremental(
+    chemin_csv: str,
+    chemin_vcf: str,
+    mappings_colonnes: Dict[str, str],
+    note_commune: Optional[str] = None,
+    delimiter: str = ';',
+    *,
+    pays_telephone: str = PAYS_PAR_DEFAUT,
+    encodage: str = ENCODAGE_PAR_DEFAUT,
+    guillemet: str = '"',
+    chemin_etat: Optional[str] = None,
+    chemin_delta: Optional[str] = None,
+    colonnes_uid: Optional[Sequence[str]] = None,
+    revision: Optional[str] = None
+) -> BilanIncremental:
+    """
+    Convertit un CSV en VCF en reprenant les fiches inchangées de la conversion précédente.
+
+    Le VCF complet est toujours réécrit, dans l'ordre des lignes du CSV. Sans `colonnes_uid` ni
+    `revision`, il est identique à celui d'une conversion complète ; sinon, seuls peuvent en différer
+    les UID des homonymes et l'horodatage REV des fiches inchangées. Sans état utilisable (première
+    conversion, autres mappings, autre note...), tous les contacts sont comptés comme ajoutés. Si
+    l'ancien VCF a été modifié depuis, ses fiches sont régénérées mais les contacts gardent leur UID.
+    Les homonymes reçoivent des UID distincts selon leur ordre d'apparition ; une ligne inchangée garde
+    son UID même si un homonyme a été ajouté ou supprimé avant elle, là où une conversion complète
+    renumérote les homonymes qui la suivent. Un contact n'est compté comme modifié que si le texte de sa fiche change
+    (une colonne inutilisée modifiée ne compte pas) ; avec `revision`, une fiche inchangée garde
+    l'horodatage REV de la conversion où elle a changé pour la dernière fois.
+
+    Args:
+        chemin_csv: Chemin du fichier CSV
+        chemin_vcf: Chemin du fichier VCF à écrire
+        mappings_colonnes: Dictionnaire associant les types de champs aux noms de colonnes du CSV
+        note_commune: Note à ajouter à toutes les fiches (optionnel)
+        delimiter: Délimiteur utilisé dans le CSV (par défaut ';')
+        pays_telephone: Pays dont l'indicatif est ajouté aux numéros sans indicatif (par défaut 'FR')
+        encodage: Encodage du fichier CSV
+        guillemet: Caractère de citation des champs (par défaut '"')
+        chemin_etat: Fichier d'état (par défaut `<chemin_vcf>.etat`)
+        chemin_delta: Si fourni, VCF où écrire seulement les fiches ajoutées ou modifiées
+        colonnes_uid: Si fourni, l'UID des contacts est calculé à partir de ces colonnes au lieu de la clé
+            de nom, et écrit dans chaque fiche (voir `PlanConversion`)
+        revision: Si fourni, horodatage écrit dans le champ REV des fiches ajoutées ou modifiées
+
+    Returns:
+        Bilan de la conversion : fiches écrites, contacts ajoutés, modifiés, supprimés et inchangés
+
+    Raises:
+        ErreurConversion: Si aucune colonne n'est détectée ou si les colonnes du nom sont absentes
+    """
+    chemin_etat = chemin_etat or chemin_vcf + SUFFIXE_ETAT
+    configuration = _empreinte_configuration(mappings_colonnes, note_commune, delimiter, pays_telephone,
+                                             encodage, guillemet, colonnes_uid, bool(revision))
+    with open(chemin_csv, "rb") as fichier_csv:
+        donnees = fichier_csv.read()
+    empreinte_csv = hashlib.blake2b(donnees, digest_size=16).hexdigest()
+
+    entete = _lire_entete_etat(chemin_etat, configuration)
+    vcf_intact = (entete is not None and os.path.exists(chemin_vcf)
+                  and entete.get("vcf") == empreinte_fichier(chemin_vcf))
+
+    # CSV identique à celui de la conversion précédente : le VCF déjà écrit est à jour
+    if entete is not None and vcf_intact and entete.get("fichier") == empreinte_csv:
+        if chemin_delta:
+            open(chemin_delta, "w", encoding="utf-8").close()
+        nb_contacts = entete.get("nb_contacts", 0)
+        return BilanIncremental(nb_contacts, [], [], [], nb_contacts, fichier_inchange=True)
+
+    uids, empreintes, debuts, longueurs = _lire_contacts_etat(chemin_etat) if entete is not None else ([],) * 4
+    index_uids = {uid: i for i, uid in enumerate(uids)}
+    # Fiches précédentes par empreinte de ligne : une ligne identique reprend son UID et sa fiche.
+    # Des lignes identiques dans le CSV précédent sont reprises dans leur ordre.
+    par_empreinte = {empreinte: i for i, empreinte in reversed(list(enumerate(empreintes)))}
+    suivantes: Dict[str, List[int]] = {}
+    if len(par_empreinte) < len(empreintes):
+        for index, empreinte in enumerate(empreintes):
+            if par_empreinte[empreinte] != index:
+                suivantes.setdefault(empreinte, []).append(index)
+
+    # Les lignes sont découpées sur les octets quand l'encodage le permet (voir convertisseur.projection) :
+    # l'empreinte porte alors sur les octets bruts et seules les lignes nouvelles sont découpées en colonnes
+    enregistrements: Iterator[Union[bytes, List[str]]]
+    colonnes_disponibles: Optional[List[str]]
+    if projection_possible(encodage, delimiter, guillemet):
+        position = 0
+        if codecs.lookup(encodage).name == 'utf-8-sig':
+            encodage = 'utf-8'
+            if donnees.startswith(codecs.BOM_UTF8):
+                position = len(codecs.BOM_UTF8)
+        colonnes_disponibles, position = lire_entete_octets(donnees, position, encodage, delimiter, guillemet)
+        enregistrements = _enregistrements(donnees, position, encodage, delimiter, guillemet)
+    else:
+        lecteur = csv.reader(io.StringIO(donnees.decode(encodage), newline=""),
+                             delimiter=delimiter, quotechar=guillemet)
+        colonnes_disponibles = next(lecteur, None)
+        while colonnes_disponibles == []:
+            colonnes_disponibles = next(lecteur, None)
+        enregistrements = lecteur
+    if not colonnes_disponibles:
+        raise ErreurConversion("Aucune colonne détectée dans le fichier CSV.")
+
+    plan = PlanConversion(colonnes_disponibles, mappings_colonnes, note_commune, pays_telephone,
+                          colonnes_uid=colonnes_uid, revision=revision)
+    avec_uid = plan.cles_uid is not None
+    nb_colonnes = plan.nb_colonnes
+    blake2b, separateur = hashlib.blake2b, _SEPARATEUR
+
+    # Premier passage : les lignes inchangées sont reconnues à leur seule empreinte ; les autres sont
+    # gardées pour le second passage (toutes si les fiches de l'ancien VCF sont inutilisables)
+    lignes: List[Tuple[str, Optional[int], Union[bytes, List[str], None]]] = []
+    for brut in enregistrements:
+        if not brut:
+            continue
+        empreinte = blake2b(brut if isinstance(brut, bytes) else separateur.join(brut).encode("utf-8"),
+                            digest_size=8).hexdigest()
+        if empreinte not in par_empreinte:
+            lignes.append((empreinte, None, brut))
+            continue
+        i = par_empreinte.pop(empreinte)
+        if suivantes and empreinte in suivantes:
+            par_empreinte[empreinte] = suivantes[empreinte].pop(0)
+            if not suivantes[empreinte]:
+                del suivantes[empreinte]
+        lignes.append((empreinte, i, None if vcf_intact else brut))
+
+    # Second passage : les autres lignes reçoivent l'UID de leur clé, avec un rang pour les
+    # homonymes ; une fiche dont l'UID existait et dont le texte a changé est une fiche modifiée
+    attribues = {uids[i] for _, i, _ in lignes if i is not None}
+    rangs: Dict[str, int] = {}
+    contacts: List[Tuple[str, str, int, int]] = []
+    ajoutes: List[str] = []
+    modifies: List[str] = []
+    condensat_vcf = hashlib.blake2b(digest_size=16)
+    fin_de_ligne = os.linesep.encode("ascii")
+    temporaire = f"{chemin_vcf}.tmp"
+
+    with open(chemin_vcf if vcf_intact else os.devnull, "rb") as fichier_ancien, \
+            open(temporaire, "wb") as fichier_vcf, \
+            open(chemin_delta or os.devnull, "w", encoding="utf-8") as fichier_delta:
+        ancien = (mmap.mmap(fichier_ancien.fileno(), 0, access=mmap.ACCESS_READ)
+                  if vcf_intact and os.path.getsize(chemin_vcf) else b"")
+        try:
+            write, write_delta = fichier_vcf.write, fichier_delta.write
+            position = 0
+            for empreinte, index_etat, enregistrement in lignes:
+                if enregistrement is None and index_etat is not None:
+                    uid = uids[index_etat]
+                    debut = int(debuts[index_etat])
+                    fiche = ancien[debut:debut + int(longueurs[index_etat])]
+                else:
+                    if isinstance(enregistrement, bytes):
+                        valeurs = next(csv.reader(io.StringIO(enregistrement.decode(encodage), newline=""),
+                                                  delimiter=delimiter, quotechar=guillemet), [])
+                    else:
+                        valeurs = enregistrement or []
+                    ligne = valeurs + [""] * (nb_colonnes - len(valeurs)) if len(valeurs) < nb_colonnes else valeurs
+                    noms = plan.noms(ligne)
+                    if noms is None:
+                        continue
+                    if index_etat is not None:
+                        uid = uids[index_etat]
+                    else:
+                        cle = plan.cle_uid(*noms, ligne) if avec_uid else cle_nom(*noms)
+                        # Les rangs déjà essayés pour cette clé sont pris : la recherche reprend au suivant
+                        rang = rangs.get(cle, 1)
+                        uid = uid_contact(cle if rang == 1 else f"{cle}#{rang}")
+                        while uid in attribues:
+                            rang += 1
+                            uid = uid_contact(f"{cle}#{rang}")
+                        rangs[cle] = rang + 1
+                        attribues.add(uid)
+                    texte = plan.carte(ligne, uid if avec_uid else None) or ""
+                    fiche = _encoder(texte, fin_de_ligne)
+                    if index_etat is None:
+                        j = index_uids.get(uid)
+                        precedente = (ancien[int(debuts[j]):int(debuts[j]) + int(longueurs[j])]
+                                      if j is not None and vcf_intact else None)
+                        if revision and precedente is not None and _sans_revision(precedente) == _sans_revision(fiche):
+                            # Seul l'horodatage diffère : la fiche garde sa révision précédente
+                            fiche = precedente
+                        elif j is None:
+                            ajoutes.append(uid)
+                            write_delta(texte)
+                        elif precedente != fiche:
+                            modifies.append(uid)
+                            write_delta(texte)
+                contacts.append((uid, empreinte, position, len(fiche)))
+                write(fiche)
+                condensat_vcf.update(fiche)
+                position += len(fiche)
+        finally:
+            if isinstance(ancien, mmap.mmap):
+                ancien.close()
+
+    os.replace(temporaire, chemin_vcf)
+    _ecrire_etat(chemin_etat, {"version": VERSION_ETAT, "configuration": configuration,
+                               "fichier": empreinte_csv, "vcf": condensat_vcf.hexdigest(),
+                               "nb_contacts": len(contacts)}, contacts)
+
+    actuels = {uid for uid, _, _, _ in contacts}
+    supprimes = [uid for uid in uids if uid not in actuels]
+    return BilanIncremental(len(contacts), ajoutes, modifies, supprimes,
+                            len(contacts) - len(ajoutes) - len(modifies))
@@ -0,0 +1,261 @@
+# -*- coding: utf-8 -*-
+"""
+Conversion inverse VCF -> CSV : relit un carnet d'adresses (vCard 3.0 ou 4.0) pour le remettre en CSV.
+
+Le VCF est lu en flux, ligne à ligne, en octets : les lignes pliées sont dépliées avant décodage (un
+pliage au milieu d'un caractère UTF-8 est donc sans effet), les valeurs sont déséchappées, et chaque fiche
+est écrite dans le CSV dès son END:VCARD. La mémoire reste constante quelle que soit la taille du fichier.
+
+Le CSV produit suit la configuration par défaut (`get_configuration_par_défaut`). Écrit dans un fichier,
+il est accompagné d'un `*_config.json` qui associe le prénom et le nom de famille à leurs colonnes : la
+conversion CSV -> VCF (`python -m convertisseur`) le reprend et redonne les mêmes fiches, ce qui permet
+de comparer deux carnets d'adresses ligne à ligne.
+
+Usage :
+    python -m convertisseur.lecture_vcf export_agence.vcf -o export_agence.csv
+"""
+
+import argparse
+import csv
+import os
+import sys
+from typing import BinaryIO, Dict, Iterator, List, NamedTuple, Optional, TextIO, Tuple, Union
+
+from .colonnes import get_configuration_par_défaut
+from .configuration import SUFFIXE_CONFIGURATION, ecrire_configuration
+from .echappement import desechapper
+from .noms import separer_prenom_nom_en_cache
+from .plan import CHAMPS_OPTIONNELS, Contact
+
+# Propriété vCard -> type de champ (RELATED dépend de son paramètre TYPE, voir _type_relation)
+_CHAMPS_PAR_PROPRIETE = {
+    'TITLE': 'role',
+    'TEL': 'telephone',
+    'EMAIL': 'email',
+    'ADR': 'adresse',
+    'CATEGORIES': 'mots_cle',
+}
+
+_ORDRE_CHAMPS = tuple(type_champ for type_champ, _, _ in CHAMPS_OPTIONNELS)
+
+
+class BilanVcfCsv(NamedTuple):
+    """Résultat d'une conversion VCF -> CSV."""
+    nb_fiches: int
+    # Valeurs en plus de la première pour un même champ (deuxième TEL, EMAIL...) : une cellule n'en garde qu'une
+    nb_valeurs_ignorees: int
+
+
+def _lignes_depliees(flux: BinaryIO) -> Iterator[bytes]:
+    """Lignes logiques d'un VCF, sans fin de ligne, les lignes de continuation recollées à la précédente."""
+    courante: Optional[bytes] = None
+    suite: List[bytes] = []
+    for ligne in flux:
+        ligne = ligne.rstrip(b"\r\n")
+        if ligne[:1] in (b" ", b"\t") and courante is not None:
+            suite.append(ligne[1:])
+            continue
+        if courante is not None:
+            yield b"".join((courante, *suite)) if suite else courante
+            suite.clear()
+        courante = ligne
+    if courante is not None:
+        yield b"".join((courante, *suite)) if suite else courante
+
+
+def _decouper_propriete(ligne: str) -> Tuple[str, Dict[str, str], str]:
+    """
+    Découpe une ligne de contenu en (nom en majuscules, paramètres en majuscules, valeur brute).
+
+    Le groupe éventuel (« item1.TEL ») est retiré ; un « : » entre guillemets dans un paramètre n'est pas
+    pris pour le début de la valeur.
+    """
+    entre_guillemets = False
+    for position, caractere in enumerate(ligne):
+        if caractere == '"':
+            entre_guillemets = not entre_guillemets
+        elif caractere == ':' and not entre_guillemets:
+            break
+    else:
+        return "", {}, ""
+    nom, *parametres = ligne[:position].split(";")
+    valeurs_parametres = {}
+    for parametre in parametres:
+        cle, _, valeur = parametre.partition("=")
+        valeurs_parametres[cle.strip().upper()] = valeur.strip('"').upper()
+    return nom.rpartition(".")[2].strip().upper(), valeurs_parametres, ligne[position + 1:]
+
+
+def _composantes(valeur: str) -> List[str]:
+    """Composantes déséchappées d'une valeur structurée (N, ADR), séparées par les « ; » non échappés."""
+    composantes, debut, i = [], 0, 0
+    while i < len(valeur):
+        if valeur[i] == "\\":
+            i += 2
+            continue
+        if valeur[i] == ";":
+            composantes.append(desechapper(valeur[debut:i]))
+            debut = i + 1
+        i += 1
+    composantes.append(desechapper(valeur[debut:]))
+    return composantes
+
+
+def _type_relation(parametres: Dict[str, str]) -> str:
+    """Type de champ d'une propriété RELATED : agent, sinon relation."""
+    return 'agent' if 'AGENT' in parametres.get('TYPE', "").split(",") else 'relation'
+
+
+def lire_contacts_vcf(
+    source: Union[str, "os.PathLike[str]", BinaryIO],
+    encodage: str = 'utf-8'
+) -> Iterator[Contact]:
+    """
+    Lit les fiches d'un VCF en flux et les rend sous forme de `Contact`.
+
+    Seules les propriétés du modèle de champs sont gardées (nom, TITLE, TEL, EMAIL, ADR, CATEGORIES,
+    RELATED) avec UID, NOTE et REV ; les autres (photos, dates...) sont ignorées.
+
+    Args:
+        source: Chemin du fichier VCF ou flux binaire déjà ouvert
+        encodage: Encodage du fichier (par défaut 'utf-8' ; un BOM éventuel est ignoré)
+
+    Yields:
+        Un contact par fiche, dans l'ordre du fichier
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as fichier:
+            yield from lire_contacts_vcf(fichier, encodage)
+        return
+
+    fiche: Optional[Dict[str, List[str]]] = None
+    noms: Tuple[str, str] = ("", "")
+    nom_affiche = ""
+    proprietes: Dict[str, str] = {}
+    for numero, octets in enumerate(_lignes_depliees(source)):
+        if numero == 0 and octets.startswith(b"\xef\xbb\xbf"):
+            octets = octets[3:]
+        nom, parametres, valeur = _decouper_propriete(octets.decode(encodage, errors='replace'))
+        if nom == 'BEGIN' and valeur.strip().upper() == 'VCARD':
+            fiche, noms, nom_affiche, proprietes = {}, ("", ""), "", {}
+        elif fiche is None:
+            continue
+        elif nom == 'END':
+            prenom, nom_famille = noms
+            if not (prenom or nom_famille) and nom_affiche:
+                prenom, nom_famille = separer_prenom_nom_en_cache(nom_affiche)
+            champs = tuple((type_champ, tuple(fiche[type_champ])) for type_champ in _ORDRE_CHAMPS
+                           if type_champ in fiche)
+            yield Contact(prenom, nom_famille, champs, proprietes.get('UID'), proprietes.get('NOTE'),
+                          proprietes.get('REV'))
+            fiche = None
+        elif nom == 'N':
+            composantes = _composantes(valeur) + ["", ""]
+            noms = (composantes[1].strip(), composantes[0].strip())
+        elif nom == 'FN':
+            nom_affiche = desechapper(valeur).strip()
+        elif nom in ('UID', 'NOTE', 'REV'):
+            proprietes[nom] = desechapper(valeur)
+        else:
+            type_champ = _type_relation(parametres) if nom == 'RELATED' else _CHAMPS_PAR_PROPRIETE.get(nom)
+            if type_champ is None:
+                continue
+            if type_champ == 'adresse':
+                # Rue, ville, région, code postal et pays réunis dans une seule cellule
+                valeur = ", ".join(composante.strip() for composante in _composantes(valeur)[2:] if composante.strip())
+            else:
+                # Les virgules de CATEGORIES, non échappées, restent les séparateurs de la cellule du CSV
+                valeur = desechapper(valeur).strip()
+                if type_champ == 'telephone' and valeur[:4].lower() == "tel:":
+                    valeur = valeur[4:]
+            if valeur:
+                fiche.setdefault(type_champ, []).append(valeur)
+
+
+def ecrire_csv_depuis_vcf(
+    source: Union[str, "os.PathLike[str]", BinaryIO],
+    destination: Union[str, "os.PathLike[str]", TextIO],
+    delimiter: str = ';',
+    *,
+    encodage: str = 'utf-8',
+    encodage_csv: str = 'utf-8-sig',
+    colonnes: Optional[Dict[str, str]] = None
+) -> BilanVcfCsv:
+    """
+    Convertit un VCF en CSV, fiche par fiche.
+
+    Chaque fiche donne une ligne. La colonne du nom complet reçoit « Prénom NOM » (nom en majuscules,
+    comme dans les listes d'équipe) pour la lecture ; les colonnes du prénom et du nom de famille reçoivent
+    chacune leur partie. Les mots-clés sont séparés par des virgules. Quand une fiche a plusieurs valeurs
+    pour un même champ, la cellule ne garde que la première.
+
+    Quand `destination` est un chemin, un `<nom>_config.json` est écrit à côté du CSV avec toutes les
+    colonnes sauf celle du nom complet : découper « Prénom NOM » ne redonne pas toujours le prénom et le
+    nom d'origine (nom de famille composé, prénom vide), alors que les deux colonnes séparées les
+    conservent tels quels.
+
+    Args:
+        source: Chemin du fichier VCF ou flux binaire déjà ouvert
+        destination: Chemin du fichier CSV ou flux texte ouvert en écriture (avec newline='')
+        delimiter: Délimiteur du CSV (par défaut ';')
+        encodage: Encodage du VCF (par défaut 'utf-8')
+        encodage_csv: Encodage du CSV quand `destination` est un chemin (par défaut 'utf-8-sig', lu par Excel)
+        colonnes: Type de champ -> nom de colonne (par défaut `get_configuration_par_défaut()`) ; l'ordre
+            des colonnes du CSV est celui de ce dictionnaire
+
+    Returns:
+        Nombre de fiches écrites et de valeurs ignorées
+    """
+    colonnes = colonnes or get_configuration_par_défaut()
+    if isinstance(destination, (str, os.PathLike)):
+        with open(destination, 'w', encoding=encodage_csv, newline='') as fichier_csv:
+            bilan = ecrire_csv_depuis_vcf(source, fichier_csv, delimiter, encodage=encodage, colonnes=colonnes)
+        chemin_csv = os.fspath(destination)
+        mappings = {type_champ: colonne for type_champ, colonne in colonnes.items() if type_champ != 'nom'}
+        ecrire_configuration(f"{os.path.splitext(chemin_csv)[0]}{SUFFIXE_CONFIGURATION}", mappings,
+                             os.path.basename(chemin_csv))
+        return bilan
+
+    types_champs = list(colonnes)
+    ecrivain = csv.writer(destination, delimiter=delimiter, lineterminator="\n")
+    ecrivain.writerow(colonnes.values())
+
+    nb_fiches = nb_ignorees = 0
+    for contact in lire_contacts_vcf(source, encodage):
+        valeurs = {
+            'nom': f"{contact.prenom} {contact.nom.upper()}".strip(),
+            'prenom': contact.prenom,
+            'nom_famille': contact.nom,
+        }
+        for type_champ, valeurs_champ in contact.champs:
+            valeurs[type_champ] = valeurs_champ[0]
+            nb_ignorees += len(valeurs_champ) - 1
+        ecrivain.writerow([valeurs.get(type_champ, "") for type_champ in types_champs])
+        nb_fiches += 1
+    return BilanVcfCsv(nb_fiches, nb_ignorees)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Point d'entrée de la ligne de commande. Renvoie le code de sortie du programme."""
+    parser = argparse.ArgumentParser(
+        prog="python -m convertisseur.lecture_vcf",
+        description="Convertit un fichier VCF en CSV, dans les colonnes de la configuration par défaut."
+    )
+    parser.add_argument("vcf", help="Fichier VCF à lire")
+    parser.add_argument("-o", "--sortie", help="Fichier CSV à écrire (par défaut : même nom, extension .csv)")
+    parser.add_argument("-d", "--delimiteur", default=";", help="Délimiteur du CSV (par défaut ';')")
+    args = parser.parse_args(argv)
+
+    chemin_csv = args.sortie or os.path.splitext(args.vcf)[0] + ".csv"
+    try:
+        bilan = ecrire_csv_depuis_vcf(args.vcf, chemin_csv, args.delimiteur.replace("\\t", "\t"))
+    except OSError as e:
+        print(f"ÉCHEC  {args.vcf} : {e}", file=sys.stderr)
+        return 1
+    ignorees = f", {bilan.nb_valeurs_ignorees} valeur(s) en plus ignorée(s)" if bilan.nb_valeurs_ignorees else ""
+    print(f"OK     {os.path.basename(args.vcf)} : {bilan.nb_fiches} fiche(s){ignorees} -> {chemin_csv}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,450 @@
+# -*- coding: utf-8 -*-
+"""
+Conversion par lots en ligne de commande : convertit des dossiers entiers de CSV en parallèle.
+
+Exemples :
+    python -m convertisseur data/
+    python -m convertisseur "data/*.csv" --sortie exports/ --note "Tournage 2025"
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from .colonnes import suggerer_colonnes
+from .configuration import charger_mappings, trouver_configuration
+from .conversion import ecrire_vcf, lire_entete
+from .decoupage import CRITERES_DECOUPAGE, ecrire_decoupe
+from .detection import FormatCsv, detecter_format_fichier
+from .ecrivains import FORMAT_PAR_DEFAUT, FORMATS_SORTIE, ecrire_contacts
+from .identifiants import horodatage_revision
+from .incremental import BilanIncremental, convertir_incremental
+from .noms import statistiques_cache_noms
+from .parallele import ecrire_vcf_parallele
+from .registre import RegistreConfigurations
+from .statistiques import StatistiquesConversion
+from .telephone import PAYS_PAR_DEFAUT, REGLES_PAYS
+
+
+class TacheConversion(NamedTuple):
+    """Description d'un fichier à convertir, transmise aux processus de travail."""
+    chemin_csv: str
+    chemin_vcf: str
+    mappings: Optional[Dict[str, str]]
+    note_commune: Optional[str]
+    delimiter: Optional[str]
+    pays_telephone: str = PAYS_PAR_DEFAUT
+    statistiques: bool = False
+    fusionner_doublons: bool = False
+    incremental: bool = False
+    delta: bool = False
+    colonnes_uid: Optional[Tuple[str, ...]] = None
+    revision: Optional[str] = None
+    formats: Tuple[str, ...] = (FORMAT_PAR_DEFAUT,)
+    vectorise: bool = False
+    critere_decoupage: Optional[str] = None
+    max_fiches: Optional[int] = None
+    max_octets: Optional[int] = None
+    archive_zip: bool = False
+    registre: bool = True
+    dossier_registre: Optional[str] = None
+    memoriser: bool = False
+
+    @property
+    def decoupee(self) -> bool:
+        """Indique si la sortie est découpée en plusieurs fichiers."""
+        return bool(self.critere_decoupage or self.max_fiches or self.max_octets)
+
+
+class ResultatFichier(NamedTuple):
+    """Résultat de la conversion d'un fichier."""
+    chemin_csv: str
+    chemin_vcf: str
+    nb_fiches: int
+    octets_lus: int
+    duree: float
+    origine_mappings: str
+    erreur: Optional[str] = None
+    taux_cache_noms: Optional[float] = None
+    format_csv: Optional[FormatCsv] = None
+    statistiques: Optional[StatistiquesConversion] = None
+    bilan: Optional[BilanIncremental] = None
+    chemins_sortie: Tuple[str, ...] = ()
+
+
+def lister_fichiers_csv(motifs: Iterable[str], recursif: bool = False) -> List[str]:
+    """
+    Développe une liste de dossiers, fichiers et motifs glob en chemins de fichiers CSV.
+
+    Args:
+        motifs: Dossiers, fichiers ou motifs glob (ex. "data/*.csv")
+        recursif: Si True, parcourt aussi les sous-dossiers
+
+    Returns:
+        Liste triée et sans doublon des chemins CSV trouvés
+    """
+    fichiers = set()
+    for motif in motifs:
+        if os.path.isdir(motif):
+            motif = os.path.join(motif, "**", "*.csv") if recursif else os.path.join(motif, "*.csv")
+        for chemin in glob.glob(motif, recursive=recursif):
+            if os.path.isfile(chemin) and chemin.lower().endswith(".csv"):
+                fichiers.add(os.path.normpath(chemin))
+    return sorted(fichiers)
+
+
+def chemins_sortie(chemin_vcf: str, formats: Iterable[str]) -> Dict[str, str]:
+    """
+    Chemin du fichier de chaque format : même nom que le VCF avec l'extension du format.
+
+    Si deux formats ont la même extension (vCard 3.0 et 4.0), le nom du format est ajouté au second :
+    `contacts.vcf` et `contacts.vcard4.vcf`.
+    """
+    base = os.path.splitext(chemin_vcf)[0]
+    chemins: Dict[str, str] = {}
+    for nom_format in formats:
+        extension = FORMATS_SORTIE[nom_format].extension
+        chemin = base + extension
+        if chemin in chemins.values():
+            chemin = f"{base}.{nom_format}{extension}"
+        chemins[nom_format] = chemin
+    return chemins
+
+
+def convertir_fichier(tache: TacheConversion, nb_processus: int = 1) -> ResultatFichier:
+    """
+    Convertit un fichier CSV en VCF. Exécutée dans un processus de travail.
+
+    Les mappings sont, par ordre de priorité : ceux passés dans la tâche, ceux du fichier
+    `*_config.json` voisin du CSV, ceux du registre pour la même disposition de colonnes (voir
+    `convertisseur.registre`), sinon ceux suggérés à partir de l'en-tête. Si la tâche le demande, les
+    mappings de la tâche ou du `*_config.json` sont enregistrés dans le registre.
+    L'encodage, le délimiteur (sauf s'il est imposé par la tâche) et le caractère de citation
+    sont détectés sur le début du fichier. Si la tâche demande des statistiques, la fusion des
+    doublons ou le nettoyage par blocs de colonnes, le fichier est converti sur un seul processus.
+    En mode incrémental, seules les lignes modifiées depuis la conversion précédente sont reconverties
+    (voir `convertisseur.incremental`).
+    Avec d'autres formats que vCard 3.0, tous les formats sont écrits en une seule lecture du fichier
+    (voir `convertisseur.ecrivains`). Une sortie découpée (par critère ou par taille) est écrite à côté
+    du VCF, ou dans une archive `<nom>.zip` (voir `convertisseur.decoupage`).
+
+    Args:
+        tache: Description du fichier à convertir
+        nb_processus: Si supérieur à 1, le fichier lui-même est découpé et converti sur plusieurs processus
+
+    Returns:
+        Résultat de la conversion (l'erreur éventuelle est renseignée plutôt que levée)
+    """
+    debut = time.perf_counter()
+    cache_avant = statistiques_cache_noms()
+    octets_lus = os.path.getsize(tache.chemin_csv)
+    origine_mappings = "option --config"
+    format_csv = None
+    statistiques = StatistiquesConversion() if tache.statistiques else None
+    bilan = None
+    sorties: Tuple[str, ...] = ()
+    try:
+        format_csv = detecter_format_fichier(tache.chemin_csv)
+        if tache.delimiter:
+            format_csv = format_csv._replace(delimiteur=tache.delimiter)
+
+        registre = RegistreConfigurations(tache.dossier_registre) if tache.registre else None
+        mappings = tache.mappings
+        entete = None
+        if mappings is None:
+            chemin_config = trouver_configuration(tache.chemin_csv)
+            if chemin_config:
+                mappings = charger_mappings(chemin_config)
+                origine_mappings = os.path.basename(chemin_config)
+            else:
+                entete = lire_entete(tache.chemin_csv, format_csv.delimiteur, encodage=format_csv.encodage,
+                                     guillemet=format_csv.guillemet)
+                mappings = registre.chercher(entete) if registre is not None else None
+                origine_mappings = "registre"
+                if mappings is None:
+                    mappings = suggerer_colonnes(entete)
+                    origine_mappings = "suggestion automatique"
+        if tache.memoriser and registre is not None and entete is None:
+            entete = lire_entete(tache.chemin_csv, format_csv.delimiteur, encodage=format_csv.encodage,
+                                 guillemet=format_csv.guillemet)
+            registre.enregistrer(entete, mappings, os.path.basename(tache.chemin_csv))
+
+        if tache.incremental:
+            chemin_delta = os.path.splitext(tache.chemin_vcf)[0] + ".delta.vcf" if tache.delta else None
+            bilan = convertir_incremental(tache.chemin_csv, tache.chemin_vcf, mappings, tache.note_commune,
+                                          format_csv.delimiteur, chemin_delta=chemin_delta,
+                                          pays_telephone=tache.pays_telephone, encodage=format_csv.encodage,
+                                          guillemet=format_csv.guillemet, colonnes_uid=tache.colonnes_uid,
+                                          revision=tache.revision)
+            nb_fiches = bilan.nb_fiches
+        elif tache.decoupee:
+            base = os.path.splitext(tache.chemin_vcf)[0]
+            destination = base + ".zip" if tache.archive_zip else os.path.dirname(base) or os.curdir
+            decoupage = ecrire_decoupe(tache.chemin_csv, destination, mappings, tache.note_commune,
+                                       format_csv.delimiteur, critere=tache.critere_decoupage,
+                                       max_fiches=tache.max_fiches, max_octets=tache.max_octets,
+                                       nom_format=tache.formats[0], nom_base=os.path.basename(base),
+                                       projection=True, fusionner_doublons=tache.fusionner_doublons,
+                                       pays_telephone=tache.pays_telephone, encodage=format_csv.encodage,
+                                       guillemet=format_csv.guillemet, colonnes_uid=tache.colonnes_uid,
+                                       revision=tache.revision)
+            nb_fiches = decoupage.nb_fiches
+            sorties = ((destination,) if tache.archive_zip
+                       else tuple(os.path.join(destination, nom) for nom, _ in decoupage.fichiers))
+        elif tache.formats != (FORMAT_PAR_DEFAUT,):
+            destinations = chemins_sortie(tache.chemin_vcf, tache.formats)
+            nb_fiches = ecrire_contacts(tache.chemin_csv, destinations, mappings, tache.note_commune,
+                                        format_csv.delimiteur, projection=True,
+                                        fusionner_doublons=tache.fusionner_doublons,
+                                        pays_telephone=tache.pays_telephone, encodage=format_csv.encodage,
+                                        guillemet=format_csv.guillemet, colonnes_uid=tache.colonnes_uid,
+                                        revision=tache.revision)
+            sorties = tuple(destinations.values())
+        elif nb_processus > 1 and statistiques is None and not tache.fusionner_doublons and not tache.vectorise:
+            nb_fiches = ecrire_vcf_parallele(tache.chemin_csv, tache.chemin_vcf, mappings, tache.note_commune,
+                                             format_csv.delimiteur, nb_processus,
+                                             pays_telephone=tache.pays_telephone, encodage=format_csv.encodage,
+                                             guillemet=format_csv.guillemet, colonnes_uid=tache.colonnes_uid,
+                                             revision=tache.revision)
+        else:
+            nb_fiches = ecrire_vcf(tache.chemin_csv, tache.chemin_vcf, mappings, tache.note_commune,
+                                   format_csv.delimiteur, projection=True, statistiques=statistiques,
+                                   fusionner_doublons=tache.fusionner_doublons, vectorise=tache.vectorise,
+                                   pays_telephone=tache.pays_telephone, encodage=format_csv.encodage,
+                                   guillemet=format_csv.guillemet, colonnes_uid=tache.colonnes_uid,
+                                   revision=tache.revision)
+    except Exception as e:
+        return ResultatFichier(tache.chemin_csv, tache.chemin_vcf, 0, octets_lus,
+                               time.perf_counter() - debut, origine_mappings, str(e), format_csv=format_csv)
+
+    return ResultatFichier(tache.chemin_csv, tache.chemin_vcf, nb_fiches, octets_lus,
+                           time.perf_counter() - debut, origine_mappings,
+                           taux_cache_noms=_taux_succes(cache_avant, statistiques_cache_noms()),
+                           format_csv=format_csv, statistiques=statistiques, bilan=bilan,
+                           chemins_sortie=sorties)
+
+
+def _taux_succes(avant: Dict[str, Dict[str, int]], apres: Dict[str, Dict[str, int]]) -> Optional[float]:
+    """Taux de succès des caches de noms entre deux relevés (None si aucun appel)."""
+    succes = sum(apres[nom]["succes"] - avant[nom]["succes"] for nom in apres)
+    echecs = sum(apres[nom]["echecs"] - avant[nom]["echecs"] for nom in apres)
+    return succes / (succes + echecs) if succes + echecs else None
+
+
+def _taille(texte: str) -> int:
+    """Taille en octets lue sur la ligne de commande : "500000", "500k" ou "5M"."""
+    multiplicateur = {"k": 1_000, "m": 1_000_000}.get(texte[-1:].lower(), 1)
+    try:
+        taille = int(texte[:-1] if multiplicateur > 1 else texte) * multiplicateur
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"taille invalide : {texte}") from None
+    if taille <= 0:
+        raise argparse.ArgumentTypeError(f"taille invalide : {texte}")
+    return taille
+
+
+def preparer_taches(
+    fichiers_csv: List[str],
+    dossier_sortie: Optional[str],
+    mappings: Optional[Dict[str, str]],
+    note_commune: Optional[str],
+    delimiter: Optional[str],
+    pays_telephone: str = PAYS_PAR_DEFAUT,
+    statistiques: bool = False,
+    fusionner_doublons: bool = False,
+    incremental: bool = False,
+    delta: bool = False,
+    colonnes_uid: Optional[Tuple[str, ...]] = None,
+    revision: Optional[str] = None,
+    formats: Tuple[str, ...] = (FORMAT_PAR_DEFAUT,),
+    vectorise: bool = False,
+    critere_decoupage: Optional[str] = None,
+    max_fiches: Optional[int] = None,
+    max_octets: Optional[int] = None,
+    archive_zip: bool = False,
+    registre: bool = True,
+    dossier_registre: Optional[str] = None,
+    memoriser: bool = False
+) -> List[TacheConversion]:
+    """Associe à chaque CSV le chemin de son fichier VCF (même nom, dossier de sortie ou dossier du CSV)."""
+    taches = []
+    for chemin_csv in fichiers_csv:
+        nom_base = os.path.splitext(os.path.basename(chemin_csv))[0]
+        dossier = dossier_sortie or os.path.dirname(chemin_csv)
+        taches.append(TacheConversion(chemin_csv, os.path.join(dossier, f"{nom_base}.vcf"),
+                                      mappings, note_commune, delimiter, pays_telephone, statistiques,
+                                      fusionner_doublons, incremental, delta, colonnes_uid, revision,
+                                      formats, vectorise, critere_decoupage, max_fiches, max_octets,
+                                      archive_zip, registre, dossier_registre, memoriser))
+    return taches
+
+
+def convertir_lot(taches: List[TacheConversion], nb_processus: Optional[int] = None) -> Iterable[ResultatFichier]:
+    """
+    Convertit une liste de fichiers sur un pool de processus (un par cœur par défaut).
+
+    Args:
+        taches: Fichiers à convertir
+        nb_processus: Nombre de processus de travail (par défaut : nombre de cœurs)
+
+    Yields:
+        Le résultat de chaque fichier, dans l'ordre de fin de conversion
+    """
+    nb_processus = nb_processus or os.cpu_count() or 1
+    if len(taches) == 1:
+        # Un seul fichier : c'est le fichier lui-même qui est découpé entre les processus
+        yield convertir_fichier(taches[0], nb_processus)
+        return
+
+    nb_processus = min(nb_processus, len(taches))
+    if nb_processus <= 1:
+        for tache in taches:
+            yield convertir_fichier(tache)
+        return
+
+    with ProcessPoolExecutor(max_workers=nb_processus) as executeur:
+        futures = [executeur.submit(convertir_fichier, tache) for tache in taches]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Point d'entrée de la ligne de commande. Renvoie le code de sortie du programme."""
+    parser = argparse.ArgumentParser(
+        prog="convertisseur",
+        description="Convertit en VCF tous les fichiers CSV d'un ou plusieurs dossiers, en parallèle."
+    )
+    parser.add_argument("chemins", nargs="+", help="Dossiers, fichiers CSV ou motifs glob (ex. \"data/*.csv\")")
+    parser.add_argument("-o", "--sortie", help="Dossier des fichiers VCF (par défaut : à côté de chaque CSV)")
+    parser.add_argument("-c", "--config", help="Fichier *_config.json à appliquer à tous les CSV")
+    parser.add_argument("-n", "--note", help="Note commune ajoutée à toutes les fiches")
+    parser.add_argument("-d", "--delimiteur", help="Délimiteur du CSV (par défaut : détecté sur chaque fichier)")
+    parser.add_argument("--pays", default=PAYS_PAR_DEFAUT, type=str.upper, choices=sorted(REGLES_PAYS),
+                        help=f"Pays des numéros sans indicatif international (par défaut {PAYS_PAR_DEFAUT})")
+    parser.add_argument("-p", "--processus", type=int, help="Nombre de processus (par défaut : un par cœur)")
+    parser.add_argument("-r", "--recursif", action="store_true", help="Parcourir aussi les sous-dossiers")
+    parser.add_argument("-s", "--statistiques", action="store_true",
+                        help="Afficher le temps par étape et les taux de succès des caches de chaque fichier")
+    parser.add_argument("-f", "--fusionner-doublons", action="store_true",
+                        help="Fusionner les contacts en double (même email, téléphone ou nom) en une seule fiche")
+    parser.add_argument("-i", "--incremental", action="store_true",
+                        help="Ne reconvertir que les lignes modifiées depuis la conversion précédente "
+                             "(état enregistré dans <vcf>.etat)")
+    parser.add_argument("--delta", action="store_true",
+                        help="Avec --incremental, écrire aussi <nom>.delta.vcf avec les seules fiches ajoutées "
+                             "ou modifiées")
+    parser.add_argument("--uid", action="store_true",
+                        help="Ajouter à chaque fiche un UID déterministe, calculé à partir du nom")
+    parser.add_argument("--colonnes-uid", metavar="COLONNES",
+                        help="Clés de l'UID séparées par des virgules : types de champs (nom, email, telephone...) "
+                             "ou noms de colonnes du CSV (implique --uid)")
+    parser.add_argument("--rev", action="store_true",
+                        help="Ajouter à chaque fiche un champ REV horodaté (le même pour toute la conversion)")
+    parser.add_argument("--formats", default=FORMAT_PAR_DEFAUT, metavar="FORMATS",
+                        help=f"Formats de sortie séparés par des virgules, écrits en une seule lecture du CSV : "
+                             f"{', '.join(FORMATS_SORTIE)} (par défaut {FORMAT_PAR_DEFAUT})")
+    parser.add_argument("--vectorise", action="store_true",
+                        help="Nettoyer les lignes par blocs de colonnes avec pandas (sans pandas : conversion "
+                             "ligne à ligne habituelle)")
+    parser.add_argument("--decouper-par", choices=list(CRITERES_DECOUPAGE),
+                        help="Écrire un fichier par catégorie (mots_cle), par agent ou par rôle, en une seule "
+                             "lecture du CSV")
+    parser.add_argument("--max-fiches", type=int, metavar="N", help="Nombre maximal de fiches par fichier")
+    parser.add_argument("--max-octets", type=_taille, metavar="TAILLE",
+                        help="Taille maximale des fiches d'un fichier, en octets (suffixes k, M acceptés : 5M)")
+    parser.add_argument("--zip", action="store_true",
+                        help="Avec --decouper-par, --max-fiches ou --max-octets, réunir les fichiers dans <nom>.zip")
+    parser.add_argument("--registre", metavar="DOSSIER",
+                        help="Dossier du registre des configurations par en-tête (par défaut : variable "
+                             "CONVERTISSEUR_REGISTRE, sinon ~/.config/convertisseur/registre)")
+    parser.add_argument("--sans-registre", action="store_true",
+                        help="Ne pas chercher dans le registre les correspondances des CSV sans configuration")
+    parser.add_argument("--memoriser", action="store_true",
+                        help="Enregistrer dans le registre les correspondances de --config ou des *_config.json, "
+                             "pour tous les CSV qui ont le même en-tête")
+    args = parser.parse_args(argv)
+    formats = tuple(dict.fromkeys(nom.strip().lower() for nom in args.formats.split(",") if nom.strip()))
+    inconnus = [nom for nom in formats if nom not in FORMATS_SORTIE]
+    if not formats or inconnus:
+        parser.error(f"formats inconnus : {', '.join(inconnus) or '(aucun)'} "
+                     f"(disponibles : {', '.join(FORMATS_SORTIE)})")
+    if formats != (FORMAT_PAR_DEFAUT,) and (args.incremental or args.statistiques):
+        parser.error("--formats ne se combine ni avec --incremental ni avec --statistiques")
+    if args.incremental and (args.fusionner_doublons or args.statistiques):
+        parser.error("--incremental ne se combine ni avec --fusionner-doublons ni avec --statistiques")
+    if args.delta and not args.incremental:
+        parser.error("--delta nécessite --incremental")
+    decoupee = bool(args.decouper_par or args.max_fiches or args.max_octets)
+    if args.max_fiches is not None and args.max_fiches <= 0:
+        parser.error("--max-fiches doit être positif")
+    if decoupee and (args.incremental or args.statistiques or len(formats) > 1):
+        parser.error("--decouper-par, --max-fiches et --max-octets ne se combinent ni avec --incremental, "
+                     "ni avec --statistiques, ni avec plusieurs formats")
+    if args.memoriser and args.sans_registre:
+        parser.error("--memoriser ne se combine pas avec --sans-registre")
+    if args.zip and not decoupee:
+        parser.error("--zip nécessite --decouper-par, --max-fiches ou --max-octets")
+
+    fichiers_csv = lister_fichiers_csv(args.chemins, args.recursif)
+    if not fichiers_csv:
+        print("Aucun fichier CSV trouvé.", file=sys.stderr)
+        return 1
+
+    mappings = charger_mappings(args.config) if args.config else None
+    colonnes_uid = None
+    if args.colonnes_uid:
+        colonnes_uid = tuple(colonne.strip() for colonne in args.colonnes_uid.split(",") if colonne.strip())
+    elif args.uid:
+        colonnes_uid = ()
+    # Un seul horodatage pour toute la conversion, quel que soit le nombre de fichiers et de processus
+    revision = horodatage_revision() if args.rev else None
+    if args.sortie:
+        os.makedirs(args.sortie, exist_ok=True)
+
+    taches = preparer_taches(fichiers_csv, args.sortie, mappings, args.note, args.delimiteur, args.pays,
+                             args.statistiques, args.fusionner_doublons, args.incremental, args.delta,
+                             colonnes_uid, revision, formats, args.vectorise, args.decouper_par,
+                             args.max_fiches, args.max_octets, args.zip, not args.sans_registre, args.registre,
+                             args.memoriser)
+
+    debut = time.perf_counter()
+    nb_fiches = octets_lus = nb_erreurs = 0
+    for resultat in convertir_lot(taches, args.processus):
+        nom = os.path.basename(resultat.chemin_csv)
+        if resultat.erreur:
+            nb_erreurs += 1
+            print(f"ÉCHEC  {nom} : {resultat.erreur}")
+            continue
+        nb_fiches += resultat.nb_fiches
+        octets_lus += resultat.octets_lus
+        cache = f", cache noms {resultat.taux_cache_noms:.0%}" if resultat.taux_cache_noms is not None else ""
+        sorties = ", ".join(resultat.chemins_sortie) or resultat.chemin_vcf
+        if len(resultat.chemins_sortie) > 3:
+            sorties = f"{len(resultat.chemins_sortie)} fichiers dans {os.path.dirname(resultat.chemins_sortie[0])}"
+        print(f"OK     {nom} : {resultat.nb_fiches} fiche(s) en {resultat.duree:.2f} s "
+              f"({resultat.origine_mappings}{cache}) -> {sorties}")
+        if resultat.format_csv is not None:
+            print(f"       format : {resultat.format_csv.description()}")
+        if resultat.bilan is not None:
+            bilan = resultat.bilan
+            etat = "CSV inchangé" if bilan.fichier_inchange else (
+                f"{len(bilan.ajoutes)} ajoutée(s), {len(bilan.modifies)} modifiée(s), "
+                f"{len(bilan.supprimes)} supprimée(s), {bilan.nb_inchanges} inchangée(s)")
+            print(f"       incrémental : {etat}")
+        if resultat.statistiques is not None:
+            print("       " + resultat.statistiques.rapport().replace("\n", "\n       "))
+    duree = time.perf_counter() - debut
+
+    print(f"\n{len(taches) - nb_erreurs}/{len(taches)} fichier(s) converti(s), {nb_fiches} fiche(s) en {duree:.2f} s")
+    if duree > 0:
+        fiches_par_seconde = f"{nb_fiches / duree:,.0f}".replace(",", " ")
+        print(f"Débit : {fiches_par_seconde} fiches/s, {octets_lus / duree / 1_000_000:.1f} Mo/s")
+    return 1 if nb_erreurs else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
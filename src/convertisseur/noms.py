@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+Formatage des noms et séparation prénom/nom.
+
+Les listes d'équipe répètent sans cesse les mêmes prénoms, noms et agents : le convertisseur passe
+par les variantes en cache (`separer_prenom_nom_en_cache`, `formater_nom_en_cache`), bornées en taille
+avec éviction LRU, plutôt que de refaire le découpage et la mise en forme à chaque ligne.
+"""
+
+from functools import lru_cache
+from typing import Dict, Tuple
+
+# Nombre maximal de chaînes distinctes gardées en cache par fonction
+TAILLE_CACHE_NOMS = 65536
+
+
+def formater_nom(nom: str, conserver_majuscules: bool = False) -> str:
+    """
+    Formate un nom pour avoir les premières lettres de chaque mot en majuscules, y compris après un tiret.
+    Exemple: "DUPONT" -> "Dupont", "DE LA TOUR" -> "De La Tour", "jean-pierre" -> "Jean-Pierre"
+
+    Un nom déjà formaté est rendu tel quel : un CSV relu depuis un VCF (`convertisseur.lecture_vcf`)
+    redonne les mêmes prénoms et noms.
+
+    Args:
+        nom: Le nom à formater
+        conserver_majuscules: Si True, conserve les noms entiers en majuscules tels quels
+    """
+    if not nom:
+        return ""
+
+    # Si le nom est entièrement en majuscules et qu'on veut conserver cela
+    if conserver_majuscules and nom.upper() == nom:
+        return nom
+
+    # Séparer les mots, et les parties des mots composés, et les formater individuellement
+    mots = nom.lower().split()
+    mots_formates = ["-".join(partie.capitalize() for partie in mot.split("-")) for mot in mots]
+
+    return " ".join(mots_formates)
+
+
+def separer_prenom_nom(chaine: str) -> Tuple[str, str]:
+    """
+    Sépare une chaîne contenant prénom et nom.
+    Le prénom est supposé être en premier, et le nom (souvent en majuscules) après.
+
+    Exemples:
+    - "Michel DUPONT" -> ("Michel", "Dupont")
+    - "Jean-Pierre MARTIN" -> ("Jean-Pierre", "Martin")
+    - "Marie-France de la TOUR" -> ("Marie-France", "De La Tour")
+    """
+    if not chaine:
+        return "", ""
+
+    # Diviser la chaîne en mots
+    mots = chaine.strip().split()
+    if not mots:
+        return "", ""
+
+    # Si un seul mot, le considérer comme prénom
+    if len(mots) == 1:
+        return mots[0], ""
+
+    # Chercher la position de transition prénom/nom
+    position_nom = 1  # Position par défaut
+
+    # Cas spéciaux pour les prénoms composés avec tiret
+    if len(mots) >= 2 and "-" in mots[0]:
+        position_nom = 1
+
+    # Cas des prénoms composés (Jean Pierre, Marie France, etc.)
+    elif len(mots) >= 3:
+        # Si le deuxième mot n'est pas en majuscules, il fait probablement partie du prénom
+        if not mots[1].isupper() and len(mots[1]) > 1:
+            position_nom = 2
+
+    # Construire le prénom et le nom
+    prenom = " ".join(mots[:position_nom])
+    nom = " ".join(mots[position_nom:])
+
+    # Formater le nom avec les premières lettres en majuscules
+    nom = formater_nom(nom)
+
+    return prenom, nom
+
+
+separer_prenom_nom_en_cache = lru_cache(maxsize=TAILLE_CACHE_NOMS)(separer_prenom_nom)
+formater_nom_en_cache = lru_cache(maxsize=TAILLE_CACHE_NOMS)(formater_nom)
+
+
+def statistiques_cache_noms() -> Dict[str, Dict[str, int]]:
+    """
+    Renvoie les compteurs des caches de noms du processus courant.
+
+    Returns:
+        Pour chaque fonction en cache : succès, échecs, nombre d'entrées et taille maximale
+    """
+    statistiques = {}
+    for nom, fonction in (("separer_prenom_nom", separer_prenom_nom_en_cache),
+                          ("formater_nom", formater_nom_en_cache)):
+        info = fonction.cache_info()
+        statistiques[nom] = {"succes": info.hits, "echecs": info.misses,
+                             "entrees": info.currsize, "taille_max": info.maxsize or 0}
+    return statistiques
+
+
+def vider_cache_noms() -> None:
+    """Vide les caches de noms et remet leurs compteurs à zéro."""
+    separer_prenom_nom_en_cache.cache_clear()
+    formater_nom_en_cache.cache_clear()
@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+"""
+Conversion multi-cœur d'un seul gros fichier CSV.
+
+Le fichier est découpé en morceaux sur des limites d'enregistrement (un saut de ligne situé hors
+de tout champ entre guillemets), chaque morceau est converti dans un processus de travail, puis
+les fiches sont écrites dans l'ordre d'origine des lignes.
+"""
+
+import codecs
+import mmap
+import os
+import re
+from collections import deque
+from contextlib import closing
+from functools import partial
+from itertools import chain, islice
+from typing import Callable, Deque, Dict, Generator, Iterable, List, Optional, Sequence, TextIO, Tuple, Union
+
+from .conversion import ENCODAGE_PAR_DEFAUT, ecrire_vcf
+from .projection import generer_cartes_vcf_projetees, projection_possible
+from .telephone import PAYS_PAR_DEFAUT
+
+# Taille visée pour un morceau : assez gros pour amortir l'envoi au processus, assez petit pour
+# équilibrer la charge et garder en mémoire peu de résultats à la fois
+TAILLE_MORCEAU_DEFAUT = 16 * 1024 * 1024
+
+# En dessous de cette taille, lancer des processus coûte plus cher que la conversion elle-même
+TAILLE_MINIMALE_PARALLELE = 4 * 1024 * 1024
+
+# Morceaux soumis d'avance à chaque processus : assez pour qu'aucun n'attende, assez peu pour borner
+# le nombre de résultats gardés en mémoire en attendant leur tour d'écriture
+MORCEAUX_EN_ATTENTE_PAR_PROCESSUS = 2
+
+
+def _champs_cites(donnees: mmap.mmap, debut: int, delimiter: str,
+                  guillemet: str) -> Generator[Tuple[int, int], None, None]:
+    """
+    Intervalles (début, fin) en octets des champs entre guillemets situés après `debut`, début d'un enregistrement.
+
+    Les règles sont celles de `csv.reader` avec ses options par défaut (doublequote, sans escapechar) : un
+    guillemet n'ouvre un champ cité qu'au début d'un champ (après le délimiteur ou un saut de ligne) ;
+    ailleurs, comme dans « écran 5" pouces », c'est un caractère ordinaire. Dans un champ cité, un guillemet
+    doublé est un guillemet ; le premier guillemet seul ferme le champ. Un champ jamais fermé s'étend
+    jusqu'à la fin du fichier.
+    """
+    g, d = re.escape(guillemet.encode('ascii')), re.escape(delimiter.encode('ascii'))
+    # La recherche commence par le guillemet, ce qui permet à `re` de sauter directement d'un guillemet au
+    # suivant ; le lookbehind vérifie ensuite que le guillemet est en début de champ
+    contenu = rb'(?:[^%s]++|%s%s)*+(?:%s|\Z)' % (g, g, g, g)
+    premier = re.compile(g + contenu).match(donnees, debut)
+    if premier is not None:
+        yield premier.span()
+        debut = premier.end()
+    for champ in re.compile(rb'%s(?<=[%s\r\n]%s)' % (g, d, g) + contenu).finditer(donnees, debut):
+        yield champ.span()
+
+
+def _morceaux(donnees: mmap.mmap, nb_morceaux: int, delimiter: str, guillemet: str,
+              encodage: str) -> Generator[Tuple[int, int], None, None]:
+    """
+    Intervalles (début, fin) en octets des morceaux d'enregistrements complets qui suivent l'en-tête,
+    calculés au fur et à mesure : chaque limite n'est cherchée qu'au moment où elle est demandée.
+
+    La recherche garde une vue sur `donnees` : le générateur doit être fermé avant la projection.
+    """
+    taille = len(donnees)
+    position = 0
+    if codecs.lookup(encodage).name == 'utf-8-sig' and donnees[:len(codecs.BOM_UTF8)] == codecs.BOM_UTF8:
+        position = len(codecs.BOM_UTF8)
+    champs_cites = _champs_cites(donnees, position, delimiter, guillemet)
+    champ = (-1, -1)
+
+    def fin_enregistrement(position: int) -> int:
+        """Position qui suit le premier saut de ligne hors guillemets à partir de `position`."""
+        nonlocal champ
+        while position < taille:
+            while champ[1] <= position:
+                champ = next(champs_cites, (taille, taille))
+            if champ[0] < position:
+                # Position à l'intérieur d'un champ cité : la chercher après sa fin
+                position = champ[1]
+                continue
+            fin_ligne = donnees.find(b"\n", position, champ[0])
+            if fin_ligne >= 0:
+                return fin_ligne + 1
+            position = champ[1]
+        return taille
+
+    try:
+        debut = fin_enregistrement(position)
+        pas = max(1, (taille - debut) // max(1, nb_morceaux))
+        while debut < taille:
+            fin = fin_enregistrement(min(taille, debut + pas))
+            yield debut, fin
+            debut = fin
+    finally:
+        champs_cites.close()
+
+
+def decouper_csv(chemin_csv: str, nb_morceaux: int, delimiter: str = ';', guillemet: str = '"',
+                 encodage: str = 'utf-8-sig') -> Tuple[int, List[Tuple[int, int]]]:
+    """
+    Découpe un fichier CSV en morceaux d'enregistrements complets, sans le décoder.
+
+    Une limite de morceau est un saut de ligne situé hors de tout champ entre guillemets, au sens de
+    `csv.reader` (voir `_champs_cites`) : les champs sur plusieurs lignes ne sont jamais coupés, et un
+    guillemet isolé au milieu d'un champ non cité ne décale pas les limites suivantes. Derrière un champ
+    cité jamais fermé, aucune limite ne peut être confirmée : la fin du fichier forme un seul morceau.
+
+    Args:
+        chemin_csv: Chemin du fichier CSV
+        nb_morceaux: Nombre de morceaux souhaités (le résultat peut en contenir moins)
+        delimiter: Délimiteur utilisé dans le CSV (par défaut ';')
+        guillemet: Caractère de citation des champs (par défaut '"')
+        encodage: Encodage du fichier, pour sauter son BOM éventuel (par défaut 'utf-8-sig')
+
+    Returns:
+        Position de fin de l'en-tête, et liste des intervalles (début, fin) en octets de chaque morceau
+    """
+    with open(chemin_csv, "rb") as fichier:
+        taille = os.fstat(fichier.fileno()).st_size
+        if taille == 0:
+            return 0, []
+        with mmap.mmap(fichier.fileno(), 0, access=mmap.ACCESS_READ) as donnees, \
+                closing(_morceaux(donnees, nb_morceaux, delimiter, guillemet, encodage)) as morceaux:
+            intervalles = list(morceaux)
+    # Sans données après l'en-tête, celui-ci s'étend jusqu'à la fin du fichier
+    return intervalles[0][0] if intervalles else taille, intervalles
+
+
+def _convertir_morceau(
+    chemin_csv: str,
+    mappings_colonnes: Dict[str, str],
+    note_commune: Optional[str],
+    delimiter: str,
+    pays_telephone: str,
+    encodage: str,
+    guillemet: str,
+    revision: Optional[str],
+    debut: int,
+    fin: int
+) -> Tuple[str, int]:
+    """Convertit un morceau du fichier (exécutée dans un processus de travail)."""
+    # Le fichier est projeté en mémoire : seuls l'en-tête et les colonnes utilisées du morceau sont décodés
+    cartes = list(generer_cartes_vcf_projetees(chemin_csv, mappings_colonnes, note_commune, delimiter,
+                                               pays_telephone=pays_telephone, encodage=encodage,
+                                               guillemet=guillemet, debut=debut, fin=fin,
+                                               revision=revision))
+    return "".join(cartes), len(cartes)
+
+
+def ecrire_vcf_parallele(
+    chemin_csv: str,
+    destination: Union[str, "os.PathLike[str]", TextIO],
+    mappings_colonnes: Dict[str, str],
+    note_commune: Optional[str] = None,
+    delimiter: str = ';',
+    nb_processus: Optional[int] = None,
+    taille_morceau: int = TAILLE_MORCEAU_DEFAUT,
+    *,
+    pays_telephone: str = PAYS_PAR_DEFAUT,
+    encodage: str = ENCODAGE_PAR_DEFAUT,
+    guillemet: str = '"',
+    colonnes_uid: Optional[Sequence[str]] = None,
+    revision: Optional[str] = None
+) -> int:
+    """
+    Convertit un gros fichier CSV en VCF en répartissant les lignes sur plusieurs processus.
+
+    Le résultat est identique, octet pour octet, à celui de `ecrire_vcf`. Les petits fichiers,
+    les encodages où un saut de ligne ne tient pas sur un octet (UTF-16) et les conversions avec UID
+    (les homonymes sont numérotés dans l'ordre de tout le fichier) sont convertis directement, sans
+    lancer de processus.
+
+    Args:
+        chemin_csv: Chemin du fichier CSV (un fichier sur disque est nécessaire pour le découpage)
+        destination: Chemin du fichier VCF ou flux texte ouvert en écriture
+        mappings_colonnes: Dictionnaire associant les types de champs aux noms de colonnes du CSV
+        note_commune: Note à ajouter à toutes les fiches (optionnel)
+        delimiter: Délimiteur utilisé dans le CSV (par défaut ';')
+        nb_processus: Nombre de processus de travail (par défaut : nombre de cœurs)
+        taille_morceau: Taille visée de chaque morceau, en octets
+        pays_telephone: Pays dont l'indicatif est ajouté aux numéros sans indicatif (par défaut 'FR')
+        encodage: Encodage du fichier (par défaut 'utf-8-sig')
+        guillemet: Caractère de citation des champs (par défaut '"')
+        colonnes_uid: Si fourni, colonnes dont est calculé l'UID déterministe de chaque fiche
+        revision: Si fourni, horodatage écrit dans le champ REV de toutes les fiches
+
+    Returns:
+        Nombre de fiches écrites
+    """
+    nb_processus = nb_processus or os.cpu_count() or 1
+    taille = os.path.getsize(chemin_csv)
+    if (nb_processus > 1 and taille >= max(1, TAILLE_MINIMALE_PARALLELE) and colonnes_uid is None
+            and projection_possible(encodage, delimiter, guillemet)):
+        # Au moins quelques morceaux par processus pour équilibrer la charge
+        nb_morceaux = max(nb_processus * 4, taille // taille_morceau)
+        with open(chemin_csv, "rb") as fichier, mmap.mmap(fichier.fileno(), 0, access=mmap.ACCESS_READ) as donnees, \
+                closing(_morceaux(donnees, nb_morceaux, delimiter, guillemet, encodage)) as morceaux:
+            # Les limites suivantes sont cherchées pendant que les processus convertissent les premiers morceaux
+            premiers = list(islice(morceaux, 2))
+            if len(premiers) == 2:
+                convertir_morceau = partial(_convertir_morceau, chemin_csv, mappings_colonnes, note_commune,
+                                            delimiter, pays_telephone, encodage, guillemet, revision)
+                intervalles = chain(premiers, morceaux)
+                if isinstance(destination, (str, os.PathLike)):
+                    with open(destination, 'w', encoding='utf-8') as fichier_vcf:
+                        return _ecrire_morceaux(convertir_morceau, intervalles, fichier_vcf, nb_processus)
+                return _ecrire_morceaux(convertir_morceau, intervalles, destination, nb_processus)
+
+    # Conversion directe : fichier trop petit ou sans données après l'en-tête (le convertisseur en flux
+    # valide alors les colonnes et n'écrit rien), UID demandés, ou aucune limite d'enregistrement confirmée
+    return ecrire_vcf(chemin_csv, destination, mappings_colonnes, note_commune, delimiter,
+                      pays_telephone=pays_telephone, encodage=encodage, guillemet=guillemet, projection=True,
+                      colonnes_uid=colonnes_uid, revision=revision)
+
+
+def _ecrire_morceaux(
+    convertir_morceau: Callable[[int, int], Tuple[str, int]],
+    intervalles: Iterable[Tuple[int, int]],
+    destination: TextIO,
+    nb_processus: int
+) -> int:
+    """
+    Convertit les morceaux dans `nb_processus` processus de travail et écrit leurs fiches dans l'ordre.
+
+    Seuls MORCEAUX_EN_ATTENTE_PAR_PROCESSUS morceaux par processus sont soumis d'avance : un morceau
+    terminé avant ceux qui le précèdent attend en mémoire son tour d'écriture, et ces résultats en attente
+    restent ainsi en nombre borné quelle que soit la taille du fichier.
+
+    Returns:
+        Nombre de fiches écrites
+    """
+    # Importé ici : concurrent.futures.process charge multiprocessing, inutile sans conversion parallèle
+    from concurrent.futures import Future, ProcessPoolExecutor
+
+    nb_fiches = 0
+    write = destination.write
+    en_attente: Deque["Future[Tuple[str, int]]"] = deque()
+    with ProcessPoolExecutor(max_workers=nb_processus) as executeur:
+        for debut, fin in intervalles:
+            if len(en_attente) >= nb_processus * MORCEAUX_EN_ATTENTE_PAR_PROCESSUS:
+                # Le plus ancien morceau est écrit avant d'en soumettre un autre : l'ordre des lignes est gardé
+                texte, nb = en_attente.popleft().result()
+                write(texte)
+                nb_fiches += nb
+            en_attente.append(executeur.submit(convertir_morceau, debut, fin))
+        while en_attente:
+            texte, nb = en_attente.popleft().result()
+            write(texte)
+            nb_fiches += nb
+    return nb_fiches
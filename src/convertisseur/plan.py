@@ -0,0 +1,368 @@
+# -*- coding: utf-8 -*-
+"""
+Plan de conversion compilé une fois par fichier à partir des mappings de colonnes.
+
+Le plan résout une fois pour toutes les noms de colonnes en positions et fige la liste des champs
+à écrire : la boucle sur les lignes ne fait plus ni recherche dans un dictionnaire, ni test sur les
+mappings, ni création de fonction. Chaque ligne est une simple liste lue par `csv.reader`.
+
+Le plan écrit directement le texte vCard 3.0 (`carte`), le chemin le plus rapide, ou rend un `Contact`
+indépendant du format de sortie (`contact`) pour les écrivains de `convertisseur.ecrivains`. Les valeurs
+écrites sont échappées et les lignes trop longues pliées (voir `convertisseur.echappement`) ; la place
+disponible sur la ligne de chaque champ est calculée une fois dans le plan.
+"""
+
+from functools import lru_cache
+from re import Match
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from .echappement import (A_ECHAPPER, A_ECHAPPER_LISTE, LONGUEUR_MAX_LIGNE, echapper, echapper_liste,
+                          ligne_contenu)
+from .identifiants import cle_nom, uid_contact
+from .noms import TAILLE_CACHE_NOMS, formater_nom_en_cache, separer_prenom_nom_en_cache
+from .statistiques import StatistiquesConversion, chronometrer
+from .telephone import PAYS_PAR_DEFAUT, NormaliseurTelephone
+
+
+class ErreurConversion(ValueError):
+    """Erreur levée quand le CSV ne peut pas être converti avec les mappings fournis."""
+
+
+# Champs optionnels dans l'ordre d'écriture de la fiche vCard 3.0 : (type de champ, début de ligne, fin de ligne).
+# Cet ordre est aussi celui des champs d'un `Contact` et des colonnes relues d'un VCF
+CHAMPS_OPTIONNELS: Tuple[Tuple[str, str, str], ...] = (
+    ('role', "TITLE:", "\n"),
+    ('agent', "RELATED;type=agent:", "\n"),
+    ('relation', "RELATED;type=relation:", "\n"),
+    ('mots_cle', "CATEGORIES:", "\n"),
+    ('telephone', "TEL;TYPE=CELL:", "\n"),
+    ('email', "EMAIL;TYPE=INTERNET:", "\n"),
+    ('adresse', "ADR;TYPE=HOME:;;", ";;;;\n"),
+)
+
+
+# Champ compilé du plan : (position, début de ligne, fin de ligne, transformation, recherche des caractères à
+# échapper, échappement, place), où `place` est la longueur de valeur ASCII qui tient sur la ligne sans la plier
+_Champ = Tuple[int, str, str, Optional[Callable[[str], str]], Callable[[str], Optional[Match[str]]],
+               Callable[[str], str], int]
+
+# Clé de l'UID : None pour la clé de nom, sinon (position, transformation) de la colonne
+_CleUid = Optional[Tuple[int, Optional[Callable[[str], str]]]]
+
+
+class Contact(NamedTuple):
+    """Contact extrait d'une ligne (ou d'un groupe de doublons), avant mise en forme dans un format de sortie."""
+    prenom: str
+    nom: str
+    # (type de champ, valeurs non vides) dans l'ordre de CHAMPS_OPTIONNELS, sans les champs vides
+    champs: Tuple[Tuple[str, Tuple[str, ...]], ...]
+    uid: Optional[str] = None
+    note: Optional[str] = None
+    revision: Optional[str] = None
+
+
+# Un même nom revient souvent dans une liste : son début de fiche, échappé et plié, est mis en cache
+@lru_cache(maxsize=TAILLE_CACHE_NOMS)
+def debut_carte(prenom: str, nom: str) -> str:
+    """Début d'une fiche vCard 3.0 jusqu'au nom affiché, commun au plan et aux écrivains."""
+    # Format VCF: N:Nom_de_famille;Prénom;Nom_additionnel;Préfix;Suffix et FN:Affichage_complet_du_nom
+    prenom, nom_famille = echapper(prenom), echapper(nom)
+    return (f"BEGIN:VCARD\nVERSION:3.0\n{ligne_contenu('N:', f'{nom_famille};{prenom};;;')}"
+            f"{ligne_contenu('FN:', f'{prenom} {nom_famille}')}")
+
+
+def fin_carte(note_commune: Optional[str], revision: Optional[str]) -> str:
+    """Fin d'une fiche après l'UID : note commune, révision et END:VCARD suivi d'une ligne vide."""
+    morceaux = [ligne_contenu("NOTE:", echapper(note_commune))] if note_commune else []
+    if revision:
+        morceaux.append(ligne_contenu("REV:", revision))
+    morceaux.append("END:VCARD\n\n")
+    return "".join(morceaux)
+
+
+class PlanConversion:
+    """
+    Plan compilé pour convertir les lignes d'un CSV donné en fiches VCF.
+
+    Args:
+        colonnes: Noms des colonnes du CSV (ligne d'en-tête)
+        mappings_colonnes: Dictionnaire associant les types de champs aux noms de colonnes du CSV
+        note_commune: Note à ajouter à toutes les fiches (optionnel)
+        pays_telephone: Pays dont l'indicatif est ajouté aux numéros sans indicatif international
+        statistiques: Si fourni, le temps passé sur les noms et les téléphones y est cumulé
+        colonnes_uid: Si fourni, chaque fiche reçoit un UID déterministe calculé à partir de ces clés :
+            types de champs des mappings ('nom' pour la clé de nom, 'email', 'telephone'...) ou noms de
+            colonnes du CSV. Une liste vide équivaut à ('nom',)
+        revision: Si fourni, horodatage écrit dans le champ REV de toutes les fiches
+
+    Raises:
+        ErreurConversion: Si les colonnes du nom ne sont pas présentes dans l'en-tête, si une colonne
+            de l'UID est introuvable, ou si le pays des numéros de téléphone est inconnu
+    """
+
+    __slots__ = ("nb_colonnes", "index_prenom_nom", "index_prenom", "index_nom_famille", "champs", "types_champs",
+                 "fin_carte", "normaliseur_telephone", "separer_prenom_nom", "formater_nom", "cles_uid",
+                 "occurrences_uid", "note_commune", "revision")
+
+    def __init__(
+        self,
+        colonnes: Sequence[str],
+        mappings_colonnes: Dict[str, str],
+        note_commune: Optional[str] = None,
+        pays_telephone: str = PAYS_PAR_DEFAUT,
+        statistiques: Optional[StatistiquesConversion] = None,
+        colonnes_uid: Optional[Sequence[str]] = None,
+        revision: Optional[str] = None
+    ):
+        self.nb_colonnes = len(colonnes)
+
+        # Comme csv.DictReader, une colonne en double est lue dans sa dernière occurrence
+        positions = {nom: index for index, nom in enumerate(colonnes)}
+
+        def position(type_champ: str) -> Optional[int]:
+            colonne = mappings_colonnes.get(type_champ)
+            return positions.get(colonne) if colonne else None
+
+        # Deux cas possibles : soit on a une colonne combinée nom/prénom, soit deux colonnes séparées
+        self.index_prenom_nom = position('nom')
+        self.index_prenom = position('prenom')
+        self.index_nom_famille = position('nom_famille')
+        if self.index_prenom_nom is None and self.index_prenom is None and self.index_nom_famille is None:
+            raise ErreurConversion(
+                "Les colonnes pour le nom et le prénom ne sont pas correctement configurées dans le mapping.")
+
+        try:
+            self.normaliseur_telephone = NormaliseurTelephone(pays_telephone)
+        except ValueError as e:
+            raise ErreurConversion(str(e)) from e
+
+        # Transformations appliquées à la valeur (déjà nettoyée) de certains champs
+        transformations: Dict[str, Callable[[str], str]] = {
+            'telephone': self.normaliseur_telephone.normaliser,
+        }
+        self.separer_prenom_nom: Callable[[str], Tuple[str, str]] = separer_prenom_nom_en_cache
+        self.formater_nom: Callable[..., str] = formater_nom_en_cache
+        if statistiques is not None:
+            durees = statistiques.durees
+            transformations['telephone'] = chronometrer(transformations['telephone'], durees, "telephones")
+            self.separer_prenom_nom = chronometrer(separer_prenom_nom_en_cache, durees, "noms")
+            self.formater_nom = chronometrer(formater_nom_en_cache, durees, "noms")
+
+        champs: List[_Champ] = []
+        types_champs: List[str] = []
+        for type_champ, debut, fin in CHAMPS_OPTIONNELS:
+            index = position(type_champ)
+            if index is not None:
+                echappement = echapper_liste if type_champ == 'mots_cle' else echapper
+                a_echapper = (A_ECHAPPER_LISTE if type_champ == 'mots_cle' else A_ECHAPPER).search
+                place = LONGUEUR_MAX_LIGNE + 1 - len(debut) - len(fin)
+                champs.append((index, debut, fin, transformations.get(type_champ), a_echapper, echappement,
+                               place))
+                types_champs.append(type_champ)
+        self.champs = tuple(champs)
+        self.types_champs = tuple(types_champs)
+
+        self.cles_uid: Optional[Tuple[_CleUid, ...]] = None
+        self.occurrences_uid: Dict[str, int] = {}
+        if colonnes_uid is not None:
+            cles_uid: List[_CleUid] = []
+            for cle in colonnes_uid or ('nom',):
+                if cle in ('nom', 'prenom', 'nom_famille'):
+                    cles_uid.append(None)
+                    continue
+                index = position(cle) if cle in mappings_colonnes else positions.get(cle)
+                if index is None:
+                    raise ErreurConversion(f"Colonne de l'UID introuvable : {cle}")
+                cles_uid.append((index, transformations.get(cle)))
+            self.cles_uid = tuple(cles_uid)
+
+        self.note_commune = note_commune or None
+        self.revision = revision or None
+        # La note commune et la révision sont identiques pour toutes les fiches : elles font partie de la fin de fiche
+        self.fin_carte = fin_carte(self.note_commune, self.revision)
+
+    def colonnes_utilisees(self) -> Tuple[int, ...]:
+        """Positions triées des colonnes lues par le plan (nom, prénom et champs optionnels)."""
+        indices = {champ[0] for champ in self.champs}
+        indices.update(index for index in (self.index_prenom_nom, self.index_prenom, self.index_nom_famille)
+                       if index is not None)
+        indices.update(cle[0] for cle in self.cles_uid or () if cle is not None)
+        return tuple(sorted(indices))
+
+    def noms(self, ligne: Sequence[str]) -> Optional[Tuple[str, str]]:
+        """
+        Lit et met en forme le prénom et le nom d'une ligne déjà complétée à `nb_colonnes` valeurs.
+
+        Returns:
+            (prénom, nom), ou None si la ligne n'a ni nom ni prénom
+        """
+        if self.index_prenom_nom is not None:
+            prenom_nom = ligne[self.index_prenom_nom].strip()
+            # Ne créer une carte que si au moins le nom ou le prénom est présent
+            if not prenom_nom:
+                return None
+            return self.separer_prenom_nom(prenom_nom)
+
+        prenom = ligne[self.index_prenom].strip() if self.index_prenom is not None else ""
+        nom = ligne[self.index_nom_famille].strip() if self.index_nom_famille is not None else ""
+        if not prenom and not nom:
+            return None
+        if prenom:
+            prenom = self.formater_nom(prenom)
+        # Pour le nom de famille, on conserve les majuscules si c'est le cas dans le CSV
+        if nom:
+            nom = self.formater_nom(nom, True)
+        return prenom, nom
+
+    def cle_uid(self, prenom: str, nom: str, ligne: Sequence[str]) -> str:
+        """
+        Clé d'un contact pour son UID : valeurs nettoyées des colonnes clés, sans tenir compte de la casse.
+
+        Si toutes les colonnes clés sont vides, la clé de nom est utilisée.
+
+        Args:
+            prenom: Prénom déjà mis en forme
+            nom: Nom déjà mis en forme
+            ligne: Valeurs de la ligne, dans l'ordre des colonnes de l'en-tête
+        """
+        parties = []
+        for cle in self.cles_uid or (None,):
+            if cle is None:
+                parties.append(cle_nom(prenom, nom))
+                continue
+            index, transformation = cle
+            valeur = ligne[index].strip() if index < len(ligne) else ""
+            if valeur and transformation is not None:
+                valeur = transformation(valeur)
+            parties.append(valeur.casefold())
+        if not any(parties):
+            return cle_nom(prenom, nom)
+        return "\x1f".join(parties)
+
+    def identifiant(self, cle: str) -> str:
+        """
+        UID de la fiche suivante de clé `cle` : les homonymes sont numérotés dans leur ordre d'apparition.
+        """
+        rang = self.occurrences_uid.get(cle, 0) + 1
+        self.occurrences_uid[cle] = rang
+        return uid_contact(cle if rang == 1 else f"{cle}#{rang}")
+
+    def carte(self, ligne: List[str], uid: Optional[str] = None) -> Optional[str]:
+        """
+        Convertit une ligne du CSV en fiche VCF.
+
+        Args:
+            ligne: Valeurs de la ligne, dans l'ordre des colonnes de l'en-tête
+            uid: UID à écrire dans la fiche ; par défaut, celui des `colonnes_uid` du plan s'il y en a
+
+        Returns:
+            Le texte de la fiche, ou None si la ligne n'a ni nom ni prénom
+        """
+        if len(ligne) < self.nb_colonnes:
+            ligne = ligne + [""] * (self.nb_colonnes - len(ligne))
+
+        noms = self.noms(ligne)
+        if noms is None:
+            return None
+        prenom, nom = noms
+
+        morceaux = [debut_carte(prenom, nom)]
+        for index, debut, fin, transformation, a_echapper, echappement, place in self.champs:
+            valeur = ligne[index].strip()
+            if valeur and transformation is not None:
+                # Une cellule faite de séparateurs (« - », « () ») devient vide : le champ est alors omis
+                valeur = transformation(valeur)
+            if valeur:
+                # Recherche en ligne : l'appel d'`echappement` n'est payé que si la valeur en a besoin
+                if a_echapper(valeur) is not None:
+                    valeur = echappement(valeur)
+                if len(valeur) <= place and valeur.isascii():
+                    morceaux += (debut, valeur, fin)
+                else:
+                    morceaux.append(ligne_contenu(debut, valeur, fin))
+        if uid is None and self.cles_uid is not None:
+            uid = self.identifiant(self.cle_uid(prenom, nom, ligne))
+        if uid is not None:
+            morceaux += ("UID:", uid, "\n")
+        morceaux.append(self.fin_carte)
+        return "".join(morceaux)
+
+    def extraire(self, ligne: List[str]) -> Optional[Tuple[str, str, Tuple[str, ...]]]:
+        """
+        Extrait les valeurs nettoyées d'une ligne, sans écrire la fiche.
+
+        Args:
+            ligne: Valeurs de la ligne, dans l'ordre des colonnes de l'en-tête
+
+        Returns:
+            (prénom, nom, valeurs) où `valeurs` contient un élément par champ de `champs` (chaîne vide si
+            la cellule est vide), ou None si la ligne n'a ni nom ni prénom
+        """
+        if len(ligne) < self.nb_colonnes:
+            ligne = ligne + [""] * (self.nb_colonnes - len(ligne))
+
+        noms = self.noms(ligne)
+        if noms is None:
+            return None
+
+        valeurs = []
+        for index, _, _, transformation, _, _, _ in self.champs:
+            valeur = ligne[index].strip()
+            if valeur and transformation is not None:
+                valeur = transformation(valeur)
+            valeurs.append(valeur)
+        return noms[0], noms[1], tuple(valeurs)
+
+    def contact(self, ligne: List[str]) -> Optional[Contact]:
+        """
+        Extrait le contact d'une ligne du CSV, pour un écrivain de `convertisseur.ecrivains`.
+
+        Args:
+            ligne: Valeurs de la ligne, dans l'ordre des colonnes de l'en-tête
+
+        Returns:
+            Le contact (avec son UID si le plan en calcule), ou None si la ligne n'a ni nom ni prénom
+        """
+        extrait = self.extraire(ligne)
+        if extrait is None:
+            return None
+        prenom, nom, valeurs = extrait
+        uid = self.identifiant(self.cle_uid(prenom, nom, ligne)) if self.cles_uid is not None else None
+        return self.contact_multiple(prenom, nom, [(valeur,) if valeur else () for valeur in valeurs], uid)
+
+    def contact_multiple(self, prenom: str, nom: str, valeurs_par_champ: Sequence[Sequence[str]],
+                         uid: Optional[str] = None) -> Contact:
+        """Contact dont chaque champ peut avoir plusieurs valeurs (voir `carte_multiple`)."""
+        champs = tuple((type_champ, tuple(valeurs))
+                       for type_champ, valeurs in zip(self.types_champs, valeurs_par_champ) if valeurs)
+        return Contact(prenom, nom, champs, uid, self.note_commune, self.revision)
+
+    def carte_multiple(self, prenom: str, nom: str, valeurs_par_champ: Sequence[Sequence[str]],
+                       uid: Optional[str] = None) -> str:
+        """
+        Écrit une fiche dont chaque champ peut avoir plusieurs valeurs (contacts fusionnés).
+
+        Avec une seule valeur par champ, le texte est identique à celui de `carte`. Les mots-clés sont
+        réunis sur une seule ligne CATEGORIES, séparés par des virgules. Les valeurs sont brutes :
+        elles sont échappées ici.
+
+        Args:
+            prenom: Prénom déjà mis en forme
+            nom: Nom déjà mis en forme
+            valeurs_par_champ: Pour chaque champ de `champs`, la liste de ses valeurs non vides
+            uid: UID à écrire dans la fiche (optionnel)
+
+        Returns:
+            Le texte de la fiche
+        """
+        morceaux = [debut_carte(prenom, nom)]
+        for (_, debut, fin, _, _, echappement, _), type_champ, valeurs in zip(self.champs, self.types_champs,
+                                                                            valeurs_par_champ):
+            if type_champ == 'mots_cle' and len(valeurs) > 1:
+                valeurs = (",".join(valeurs),)
+            for valeur in valeurs:
+                morceaux.append(ligne_contenu(debut, echappement(valeur), fin))
+        if uid is not None:
+            morceaux += ("UID:", uid, "\n")
+        morceaux.append(self.fin_carte)
+        return "".join(morceaux)
@@ -0,0 +1,288 @@
+# -*- coding: utf-8 -*-
+"""
+Lecture projetée d'un CSV local : le fichier est projeté en mémoire (mmap) et seuls les champs utiles sont décodés.
+
+Les enregistrements sont découpés directement sur les octets du fichier, sans décoder le texte :
+une ligne sans guillemet est coupée par `bytes.split` jusqu'à la dernière colonne utilisée, puis
+seules les colonnes citées dans les mappings sont décodées en chaînes Python. Les autres colonnes
+des exports larges (40 colonnes et plus, la plupart inutilisées) ne sont jamais décodées.
+
+Les lignes contenant un guillemet passent par `csv.reader`, ligne à ligne, pour garder exactement
+ses règles (champs sur plusieurs lignes, guillemets doublés). Quand la plupart des colonnes sont
+utilisées, les lignes sont simplement décodées et lues par `csv.reader`, plus rapide dans ce cas.
+"""
+
+import codecs
+import csv
+import io
+import mmap
+import os
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, TextIO, Tuple, Union
+
+from .plan import Contact, ErreurConversion, PlanConversion
+from .telephone import PAYS_PAR_DEFAUT
+
+_Donnees = Union[bytes, mmap.mmap]
+
+# La lecture projetée ne paie que si les colonnes utilisées sont minoritaires : décoder chaque champ
+# séparément coûte plus cher que `csv.reader` dès que la plupart des colonnes sont lues. En dessous
+# de ce rapport (nombre de colonnes / colonnes utilisées), les lignes sont décodées en entier.
+RAPPORT_MINIMAL_PROJECTION = 3
+
+
+def projection_possible(encodage: str, delimiter: str = ';', guillemet: str = '"') -> bool:
+    """
+    Indique si un CSV peut être découpé sur ses octets : le saut de ligne, le délimiteur et le guillemet
+    doivent chacun se coder sur un seul octet ASCII (vrai pour UTF-8, Windows-1252, Latin-1 ; faux pour UTF-16).
+
+    Args:
+        encodage: Encodage du fichier
+        delimiter: Délimiteur utilisé dans le CSV
+        guillemet: Caractère de citation des champs
+
+    Returns:
+        True si la lecture projetée est possible
+    """
+    caracteres = "\n" + delimiter + guillemet
+    try:
+        return len(caracteres) == 3 and caracteres.encode('ascii').decode(encodage) == caracteres
+    except (UnicodeError, LookupError):
+        return False
+
+
+def lire_enregistrement_octets(
+    donnees: _Donnees,
+    position: int,
+    fin: int,
+    encodage: str,
+    delimiter: str,
+    guillemet: str
+) -> Tuple[List[str], int]:
+    """
+    Lit un enregistrement avec `csv.reader`, en ne décodant que les lignes qu'il consomme.
+
+    Args:
+        donnees: Contenu du fichier (mmap ou bytes)
+        position: Position du début de l'enregistrement
+        fin: Position au-delà de laquelle rien n'est lu
+        encodage: Encodage des lignes
+        delimiter: Délimiteur utilisé dans le CSV
+        guillemet: Caractère de citation des champs
+
+    Returns:
+        Valeurs de l'enregistrement et position qui le suit
+    """
+    lu = [position]
+
+    def lignes() -> Iterator[str]:
+        while lu[0] < fin:
+            fin_ligne = donnees.find(b"\n", lu[0], fin)
+            suivant = fin_ligne + 1 if fin_ligne >= 0 else fin
+            texte = donnees[lu[0]:suivant].decode(encodage)
+            lu[0] = suivant
+            yield texte
+
+    ligne = next(csv.reader(lignes(), delimiter=delimiter, quotechar=guillemet), [])
+    return ligne, lu[0]
+
+
+def lire_entete_octets(donnees: _Donnees, position: int, encodage: str, delimiter: str,
+                 guillemet: str) -> Tuple[List[str], int]:
+    """Lit l'en-tête (les lignes vides qui le précèdent sont ignorées) et renvoie la position qui le suit."""
+    taille = len(donnees)
+    while position < taille:
+        colonnes, position = lire_enregistrement_octets(donnees, position, taille, encodage, delimiter,
+                                                        guillemet)
+        if colonnes:
+            return colonnes, position
+    return [], position
+
+
+def _generer_cartes(
+    donnees: _Donnees,
+    debut: int,
+    fin: int,
+    carte: Callable[[List[str]], Any],
+    indices: Sequence[int],
+    encodage: str,
+    delimiter: str,
+    guillemet: str
+) -> Iterator[Any]:
+    """
+    Convertit les enregistrements situés entre `debut` et `fin`, en ne décodant que les colonnes `indices`.
+
+    Args:
+        donnees: Contenu du fichier (mmap ou bytes)
+        debut: Position du premier enregistrement
+        fin: Position qui suit le dernier enregistrement
+        carte: Fonction de conversion d'une ligne projetée (valeurs des colonnes `indices`, dans l'ordre),
+            qui rend la fiche ou None pour une ligne sans nom
+        indices: Positions triées des colonnes utilisées
+        encodage: Encodage des champs
+        delimiter: Délimiteur utilisé dans le CSV
+        guillemet: Caractère de citation des champs
+    """
+    octet_delimiteur = delimiter.encode('ascii')
+    octet_guillemet = guillemet.encode('ascii')
+    index_max = indices[-1]
+    vides = [b""] * (index_max + 1)
+    find = donnees.find
+
+    position = debut
+    while position < fin:
+        fin_ligne = find(b"\n", position, fin)
+        if fin_ligne < 0:
+            fin_ligne = suivant = fin
+        else:
+            suivant = fin_ligne + 1
+
+        if find(octet_guillemet, position, fin_ligne) >= 0:
+            # Champ cité (éventuellement sur plusieurs lignes) : les règles exactes du module csv s'appliquent
+            ligne, suivant = lire_enregistrement_octets(donnees, position, fin, encodage, delimiter, guillemet)
+            nb_valeurs = len(ligne)
+            valeurs = [ligne[i] if i < nb_valeurs else "" for i in indices]
+        else:
+            if fin_ligne > position and donnees[fin_ligne - 1] == 13:  # \r de fin de ligne Windows
+                fin_ligne -= 1
+            if fin_ligne == position:
+                position = suivant
+                continue
+            # Le dernier morceau contient toutes les colonnes inutilisées qui suivent, sans les découper
+            champs = donnees[position:fin_ligne].split(octet_delimiteur, index_max + 1)
+            if len(champs) <= index_max:
+                champs += vides[len(champs):]
+            valeurs = [champs[i].decode(encodage) for i in indices]
+
+        position = suivant
+        texte = carte(valeurs)
+        if texte is not None:
+            yield texte
+
+
+def generer_cartes_vcf_projetees(
+    chemin_csv: Union[str, "os.PathLike[str]"],
+    mappings_colonnes: Dict[str, str],
+    note_commune: Optional[str] = None,
+    delimiter: str = ';',
+    *,
+    pays_telephone: str = PAYS_PAR_DEFAUT,
+    encodage: str = 'utf-8-sig',
+    guillemet: str = '"',
+    debut: int = 0,
+    fin: Optional[int] = None,
+    colonnes_uid: Optional[Sequence[str]] = None,
+    revision: Optional[str] = None
+) -> Iterator[str]:
+    """
+    Génère les fiches VCF d'un fichier CSV projeté en mémoire, comme `generer_cartes_vcf`.
+
+    Le résultat est identique à celui de `generer_cartes_vcf`. L'encodage doit permettre le découpage
+    sur les octets (voir `projection_possible`). Si moins d'une colonne sur RAPPORT_MINIMAL_PROJECTION
+    n'est pas utilisée, les lignes sont décodées en entier (voir RAPPORT_MINIMAL_PROJECTION).
+
+    Args:
+        chemin_csv: Chemin du fichier CSV
+        mappings_colonnes: Dictionnaire associant les types de champs aux noms de colonnes du CSV
+        note_commune: Note à ajouter à toutes les fiches (optionnel)
+        delimiter: Délimiteur utilisé dans le CSV (par défaut ';')
+        pays_telephone: Pays dont l'indicatif est ajouté aux numéros sans indicatif (par défaut 'FR')
+        encodage: Encodage du fichier (par défaut 'utf-8-sig')
+        guillemet: Caractère de citation des champs (par défaut '"')
+        debut: Ne convertir que les enregistrements à partir de cette position (en octets)
+        fin: Ne convertir que les enregistrements avant cette position (par défaut : fin du fichier)
+        colonnes_uid: Si fourni, colonnes dont est calculé l'UID déterministe de chaque fiche
+        revision: Si fourni, horodatage écrit dans le champ REV de toutes les fiches
+
+    Yields:
+        Le texte d'une fiche VCF (BEGIN:VCARD ... END:VCARD suivi d'une ligne vide)
+
+    Raises:
+        ErreurConversion: Si aucune colonne n'est détectée ou si les colonnes du nom sont absentes
+        ValueError: Si l'encodage, le délimiteur ou le guillemet ne se découpent pas sur les octets
+    """
+    return _generer_projetees(chemin_csv, mappings_colonnes, note_commune, delimiter, pays_telephone, encodage,
+                              guillemet, debut, fin, colonnes_uid, revision, contacts=False)
+
+
+def generer_contacts_projetes(
+    chemin_csv: Union[str, "os.PathLike[str]"],
+    mappings_colonnes: Dict[str, str],
+    note_commune: Optional[str] = None,
+    delimiter: str = ';',
+    *,
+    pays_telephone: str = PAYS_PAR_DEFAUT,
+    encodage: str = 'utf-8-sig',
+    guillemet: str = '"',
+    debut: int = 0,
+    fin: Optional[int] = None,
+    colonnes_uid: Optional[Sequence[str]] = None,
+    revision: Optional[str] = None
+) -> Iterator[Contact]:
+    """
+    Comme `generer_cartes_vcf_projetees`, mais rend des `Contact` pour `convertisseur.ecrivains`.
+
+    Yields:
+        Le contact de chaque ligne qui a un nom ou un prénom
+    """
+    return _generer_projetees(chemin_csv, mappings_colonnes, note_commune, delimiter, pays_telephone, encodage,
+                              guillemet, debut, fin, colonnes_uid, revision, contacts=True)
+
+
+def _generer_projetees(
+    chemin_csv: Union[str, "os.PathLike[str]"],
+    mappings_colonnes: Dict[str, str],
+    note_commune: Optional[str],
+    delimiter: str,
+    pays_telephone: str,
+    encodage: str,
+    guillemet: str,
+    debut: int,
+    fin: Optional[int],
+    colonnes_uid: Optional[Sequence[str]],
+    revision: Optional[str],
+    contacts: bool
+) -> Iterator[Any]:
+    """Lecture projetée commune : rend le texte des fiches, ou des `Contact` si `contacts` est vrai."""
+    if not projection_possible(encodage, delimiter, guillemet):
+        raise ValueError(f"Lecture projetée impossible avec l'encodage {encodage} et le délimiteur {delimiter!r}.")
+
+    with open(chemin_csv, 'rb') as fichier:
+        if os.fstat(fichier.fileno()).st_size == 0:
+            raise ErreurConversion("Aucune colonne détectée dans le fichier CSV.")
+        with mmap.mmap(fichier.fileno(), 0, access=mmap.ACCESS_READ) as donnees:
+            # Le BOM est sauté une fois pour toutes : les champs sont ensuite décodés en UTF-8 simple
+            position = 0
+            if codecs.lookup(encodage).name == 'utf-8-sig':
+                encodage = 'utf-8'
+                if donnees[:len(codecs.BOM_UTF8)] == codecs.BOM_UTF8:
+                    position = len(codecs.BOM_UTF8)
+            colonnes, fin_entete = lire_entete_octets(donnees, position, encodage, delimiter, guillemet)
+            if not colonnes:
+                raise ErreurConversion("Aucune colonne détectée dans le fichier CSV.")
+
+            plan = PlanConversion(colonnes, mappings_colonnes, note_commune, pays_telephone,
+                                  colonnes_uid=colonnes_uid, revision=revision)
+            indices = plan.colonnes_utilisees()
+            debut = max(debut, fin_entete)
+
+            if len(colonnes) < RAPPORT_MINIMAL_PROJECTION * len(indices):
+                # Peu de colonnes inutilisées : décoder les lignes entières revient moins cher
+                flux: TextIO
+                if fin is None:
+                    fichier.seek(debut)
+                    flux = io.TextIOWrapper(fichier, encoding=encodage, newline='')
+                else:
+                    flux = io.StringIO(donnees[debut:fin].decode(encodage), newline='')
+                carte = plan.contact if contacts else plan.carte
+                for ligne in csv.reader(flux, delimiter=delimiter, quotechar=guillemet):
+                    texte = carte(ligne)
+                    if texte is not None:
+                        yield texte
+                return
+
+            # Le plan est compilé sur les seules colonnes utilisées, dans l'ordre du fichier
+            plan = PlanConversion([colonnes[i] for i in indices], mappings_colonnes, note_commune,
+                                  pays_telephone, colonnes_uid=colonnes_uid, revision=revision)
+            carte = plan.contact if contacts else plan.carte
+            fin = len(donnees) if fin is None else fin
+            yield from _generer_cartes(donnees, debut, fin, carte, indices, encodage, delimiter, guillemet)
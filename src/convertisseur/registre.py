@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+Registre local des configurations, retrouvées à partir de l'en-tête du CSV.
+
+Un même export (feuille de service, liste d'équipe...) garde d'une fois sur l'autre les mêmes colonnes,
+même si le nom du fichier change. Le registre associe à l'empreinte de l'en-tête les correspondances de
+colonnes choisies une fois : tout fichier qui a la même disposition de colonnes les retrouve sans
+réimporter de `*_config.json`, dans l'application comme en ligne de commande.
+
+L'empreinte ne dépend ni de l'ordre des colonnes, ni des majuscules, ni des espaces en trop. Chaque
+configuration est un fichier `<empreinte>.json` du dossier du registre, au format des `*_config.json` :
+une recherche est une seule ouverture de fichier, quel que soit le nombre de configurations. Un
+enregistrement écrit un fichier temporaire puis le met en place d'un coup (`os.replace`) : plusieurs
+processus de l'application peuvent lire et écrire en même temps, un lecteur voit l'ancienne ou la
+nouvelle configuration, jamais un fichier à moitié écrit.
+"""
+
+import datetime
+import hashlib
+import json
+import os
+import unicodedata
+from typing import Dict, Optional, Sequence
+
+from .configuration import ErreurConfiguration, lire_configuration
+
+# Variable d'environnement qui désigne le dossier du registre
+VARIABLE_REGISTRE = "CONVERTISSEUR_REGISTRE"
+
+
+def dossier_registre_par_defaut() -> str:
+    """
+    Dossier du registre : celui de la variable CONVERTISSEUR_REGISTRE, sinon
+    `~/.config/convertisseur/registre` (ou `$XDG_CONFIG_HOME/convertisseur/registre`).
+    """
+    dossier = os.environ.get(VARIABLE_REGISTRE)
+    if dossier:
+        return dossier
+    configuration = os.environ.get("XDG_CONFIG_HOME") or os.path.join(os.path.expanduser("~"), ".config")
+    return os.path.join(configuration, "convertisseur", "registre")
+
+
+def _normaliser_colonne(colonne: str) -> str:
+    """Nom de colonne comparable : forme NFKC, sans casse, sans BOM, espaces unifiés."""
+    return " ".join(unicodedata.normalize("NFKC", colonne.lstrip("\ufeff")).casefold().split())
+
+
+def empreinte_entete(colonnes: Sequence[str]) -> str:
+    """
+    Empreinte d'un en-tête de CSV, indépendante de l'ordre des colonnes, des majuscules et des espaces.
+
+    Les colonnes sans nom (délimiteur en fin de ligne) sont ignorées.
+
+    Args:
+        colonnes: Noms des colonnes de l'en-tête
+
+    Returns:
+        Empreinte hexadécimale de 32 caractères
+    """
+    noms = sorted({nom for nom in map(_normaliser_colonne, colonnes) if nom})
+    return hashlib.blake2b("\x1f".join(noms).encode("utf-8"), digest_size=16).hexdigest()
+
+
+class RegistreConfigurations:
+    """
+    Configurations enregistrées, retrouvées par l'empreinte de l'en-tête du CSV.
+
+    Args:
+        dossier: Dossier du registre (par défaut : `dossier_registre_par_defaut()`), créé au premier
+            enregistrement
+    """
+
+    def __init__(self, dossier: Optional[str] = None):
+        self.dossier = dossier or dossier_registre_par_defaut()
+
+    def chemin(self, colonnes: Sequence[str]) -> str:
+        """Chemin du fichier de configuration d'un en-tête."""
+        return os.path.join(self.dossier, f"{empreinte_entete(colonnes)}.json")
+
+    def chercher(self, colonnes: Sequence[str]) -> Optional[Dict[str, str]]:
+        """
+        Cherche la configuration enregistrée pour un en-tête.
+
+        Les noms de colonnes des correspondances sont ceux de `colonnes` : un en-tête écrit en majuscules
+        ou dans un autre ordre reçoit des correspondances directement utilisables.
+
+        Args:
+            colonnes: Noms des colonnes de l'en-tête
+
+        Returns:
+            Dictionnaire associant les types de champs aux noms de colonnes, ou None si l'en-tête est
+            inconnu (ou sa configuration illisible)
+        """
+        try:
+            with open(self.chemin(colonnes), 'r', encoding='utf-8') as fichier:
+                mappings = lire_configuration(fichier.read())["mappings"]
+        except (OSError, UnicodeDecodeError, ErreurConfiguration):
+            return None
+        par_nom = {_normaliser_colonne(colonne): colonne for colonne in colonnes}
+        resultat = {}
+        for type_champ, colonne in mappings.items():
+            colonne = par_nom.get(_normaliser_colonne(colonne)) if isinstance(colonne, str) else None
+            if colonne is not None:
+                resultat[type_champ] = colonne
+        return resultat or None
+
+    def enregistrer(self, colonnes: Sequence[str], mappings: Dict[str, str], nom_fichier: Optional[str] = None) -> str:
+        """
+        Enregistre (ou remplace) la configuration d'un en-tête.
+
+        Args:
+            colonnes: Noms des colonnes de l'en-tête
+            mappings: Dictionnaire associant les types de champs aux noms de colonnes
+            nom_fichier: Nom du CSV d'origine, gardé pour information
+
+        Returns:
+            Chemin du fichier de configuration écrit
+
+        Raises:
+            OSError: Si le dossier du registre n'est pas accessible en écriture
+        """
+        os.makedirs(self.dossier, exist_ok=True)
+        chemin = self.chemin(colonnes)
+        config = {
+            "nom_fichier": nom_fichier,
+            "date_creation": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "colonnes": list(colonnes),
+            "mappings": dict(mappings),
+        }
+        import tempfile  # importé ici : la plupart des exécutions ne font que chercher
+
+        # Un fichier temporaire propre à ce processus, mis en place d'un coup : deux processus qui
+        # enregistrent en même temps ne mélangent jamais leurs écritures, le dernier l'emporte
+        descripteur, temporaire = tempfile.mkstemp(prefix=".", suffix=".tmp", dir=self.dossier)
+        try:
+            with open(descripteur, 'w', encoding='utf-8') as fichier:
+                json.dump(config, fichier, indent=4, ensure_ascii=False)
+            os.replace(temporaire, chemin)
+        except BaseException:
+            os.unlink(temporaire)
+            raise
+        return chemin
+
+    def supprimer(self, colonnes: Sequence[str]) -> bool:
+        """Supprime la configuration d'un en-tête. Renvoie False si elle n'existait pas."""
+        try:
+            os.remove(self.chemin(colonnes))
+        except FileNotFoundError:
+            return False
+        return True
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+Mesures facultatives d'une conversion : lignes traitées, temps par étape et taux de succès des caches.
+
+L'instrumentation n'est active que si un objet `StatistiquesConversion` est passé au convertisseur ;
+sans lui, la boucle de conversion n'exécute aucun chronométrage.
+"""
+
+import time
+from functools import wraps
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+# Étapes chronométrées, dans l'ordre du traitement d'une ligne
+ETAPES = ("decodage", "lecture_csv", "noms", "telephones", "assemblage", "ecriture")
+
+LIBELLES_ETAPES = {
+    "decodage": "Décodage du texte",
+    "lecture_csv": "Découpage CSV",
+    "noms": "Prénoms et noms",
+    "telephones": "Téléphones",
+    "assemblage": "Assemblage des fiches",
+    "ecriture": "Écriture",
+}
+
+_R = TypeVar("_R")
+
+
+class StatistiquesConversion:
+    """
+    Compteurs et chronométrages d'une conversion, remplis par le convertisseur.
+
+    Attributes:
+        lignes_lues: Lignes de données lues (hors en-tête)
+        fiches_emises: Fiches VCF produites
+        lignes_ignorees: Lignes sans nom ni prénom, sautées
+        durees: Temps passé dans chaque étape, en secondes (voir ETAPES)
+        caches: Succès et échecs de chaque cache pendant la conversion
+        duree_totale: Durée de bout en bout de la conversion, en secondes
+    """
+
+    __slots__ = ("lignes_lues", "fiches_emises", "lignes_ignorees", "durees", "caches", "duree_totale")
+
+    def __init__(self) -> None:
+        self.lignes_lues = 0
+        self.fiches_emises = 0
+        self.lignes_ignorees = 0
+        self.durees: Dict[str, float] = dict.fromkeys(ETAPES, 0.0)
+        self.caches: Dict[str, Dict[str, int]] = {}
+        self.duree_totale = 0.0
+
+    def ajouter_cache(self, nom: str, avant: Dict[str, int], apres: Dict[str, int]) -> None:
+        """Cumule les succès et échecs d'un cache entre deux relevés."""
+        cumul = self.caches.setdefault(nom, {"succes": 0, "echecs": 0})
+        cumul["succes"] += apres["succes"] - avant["succes"]
+        cumul["echecs"] += apres["echecs"] - avant["echecs"]
+
+    def taux_cache(self, nom: str) -> Optional[float]:
+        """Taux de succès d'un cache (None s'il n'a pas été appelé)."""
+        cache = self.caches.get(nom)
+        if not cache or not cache["succes"] + cache["echecs"]:
+            return None
+        return cache["succes"] / (cache["succes"] + cache["echecs"])
+
+    def en_dict(self) -> Dict[str, Any]:
+        """Version sérialisable en JSON des statistiques."""
+        return {
+            "lignes_lues": self.lignes_lues,
+            "fiches_emises": self.fiches_emises,
+            "lignes_ignorees": self.lignes_ignorees,
+            "duree_totale_s": self.duree_totale,
+            "durees_s": dict(self.durees),
+            "caches": {nom: dict(cache, taux=self.taux_cache(nom)) for nom, cache in self.caches.items()},
+        }
+
+    def rapport(self) -> str:
+        """Rapport lisible, une ligne par étape et par cache."""
+        lignes = [f"{self.lignes_lues} ligne(s) lue(s) : {self.fiches_emises} fiche(s) émise(s), "
+                  f"{self.lignes_ignorees} ignorée(s) (sans nom) en {self.duree_totale:.3f} s"]
+        for etape in ETAPES:
+            duree = self.durees[etape]
+            part = duree / self.duree_totale if self.duree_totale else 0.0
+            lignes.append(f"  {LIBELLES_ETAPES[etape]:<22} {duree:8.3f} s  {part:6.1%}")
+        for nom in self.caches:
+            taux = self.taux_cache(nom)
+            lignes.append(f"  Cache {nom:<20} {'-' if taux is None else f'{taux:.0%}':>5} de succès")
+        return "\n".join(lignes)
+
+
+def chronometrer(fonction: Callable[..., _R], durees: Dict[str, float], etape: str) -> Callable[..., _R]:
+    """
+    Enveloppe une fonction pour cumuler son temps d'exécution dans `durees[etape]`.
+
+    Args:
+        fonction: Fonction à chronométrer
+        durees: Dictionnaire des durées par étape
+        etape: Étape à laquelle imputer le temps
+
+    Returns:
+        Fonction de mêmes arguments et même résultat
+    """
+    horloge = time.perf_counter
+
+    @wraps(fonction)
+    def fonction_chronometree(*args: Any) -> _R:
+        debut = horloge()
+        try:
+            return fonction(*args)
+        finally:
+            durees[etape] += horloge() - debut
+
+    return fonction_chronometree
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+Table de contacts en colonnes, pour les étapes qui doivent garder tout un lot en mémoire (fusion des
+doublons).
+
+Une ligne du CSV n'est pas gardée : seules les valeurs des champs du plan le sont, rangées dans une
+liste par champ (plus une liste des prénoms et une des noms). Un contact ne coûte alors qu'un pointeur
+par champ, là où un dictionnaire par ligne garde toutes les colonnes du fichier, leurs clés et la table
+de hachage. Les cellules vides partagent toutes la même chaîne vide. Une étape par lot parcourt une
+colonne entière d'une seule boucle, sans passer par les contacts un à un.
+"""
+
+from typing import Iterator, List, Sequence, Tuple
+
+
+class TableContacts:
+    """
+    Contacts extraits par `PlanConversion.extraire`, rangés par colonne.
+
+    Args:
+        types_champs: Type de chaque champ, dans l'ordre des valeurs extraites (`PlanConversion.types_champs`)
+    """
+
+    __slots__ = ('types_champs', 'prenoms', 'noms', 'colonnes')
+
+    def __init__(self, types_champs: Sequence[str]):
+        self.types_champs = tuple(types_champs)
+        self.prenoms: List[str] = []
+        self.noms: List[str] = []
+        # Une liste de valeurs par champ, toutes de la longueur de la table
+        self.colonnes: Tuple[List[str], ...] = tuple([] for _ in self.types_champs)
+
+    def __len__(self) -> int:
+        return len(self.noms)
+
+    def ajouter(self, prenom: str, nom: str, valeurs: Sequence[str]) -> int:
+        """
+        Ajoute un contact à la fin de la table.
+
+        Args:
+            prenom: Prénom du contact
+            nom: Nom de famille du contact
+            valeurs: Une valeur par champ (chaîne vide si la cellule est vide)
+
+        Returns:
+            Le rang du contact dans la table
+        """
+        self.prenoms.append(prenom)
+        self.noms.append(nom)
+        for colonne, valeur in zip(self.colonnes, valeurs):
+            colonne.append(valeur)
+        return len(self.noms) - 1
+
+    def colonne(self, type_champ: str) -> List[str]:
+        """
+        Valeurs d'un champ pour tous les contacts de la table.
+
+        Raises:
+            KeyError: Si le champ n'est pas dans la table
+        """
+        try:
+            return self.colonnes[self.types_champs.index(type_champ)]
+        except ValueError:
+            raise KeyError(type_champ) from None
+
+    def valeurs(self, rang: int) -> Tuple[str, ...]:
+        """Valeurs des champs du contact de rang `rang`, dans l'ordre de `types_champs`."""
+        return tuple(colonne[rang] for colonne in self.colonnes)
+
+    def __iter__(self) -> Iterator[Tuple[str, str, Tuple[str, ...]]]:
+        """Parcourt les contacts sous la forme (prénom, nom, valeurs), comme `PlanConversion.extraire`."""
+        return zip(self.prenoms, self.noms, zip(*self.colonnes) if self.colonnes else ((),) * len(self))
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""
+Normalisation des numéros de téléphone au format international (+<indicatif><numéro>).
+
+Règles appliquées :
+- les séparateurs usuels (espaces, points, tirets, parenthèses, barres obliques) sont retirés
+  en une seule passe `bytes.translate` sur une table de suppression précompilée (cas courant d'un
+  numéro ASCII), ou `str.translate` pour les numéros contenant des espaces insécables ;
+- un numéro commençant par `+` ou `00` est déjà international : seul le `(0)` national
+  éventuel (« +33 (0)6 ... ») est retiré ;
+- sinon, le préfixe national du pays par défaut (le `0` en France) est remplacé par son indicatif.
+"""
+
+from functools import lru_cache
+from typing import Dict, NamedTuple
+
+
+class RegleTelephone(NamedTuple):
+    """Règle de numérotation d'un pays."""
+    indicatif: str
+    prefixe_national: str
+
+
+# Indicatif international et préfixe national (à retirer devant l'indicatif) par code pays ISO
+REGLES_PAYS: Dict[str, RegleTelephone] = {
+    'FR': RegleTelephone("33", "0"),
+    'BE': RegleTelephone("32", "0"),
+    'CH': RegleTelephone("41", "0"),
+    'LU': RegleTelephone("352", ""),
+    'MC': RegleTelephone("377", ""),
+    'DE': RegleTelephone("49", "0"),
+    'ES': RegleTelephone("34", ""),
+    'IT': RegleTelephone("39", ""),  # Le 0 des fixes italiens fait partie du numéro
+    'PT': RegleTelephone("351", ""),
+    'NL': RegleTelephone("31", "0"),
+    'GB': RegleTelephone("44", "0"),
+    'IE': RegleTelephone("353", "0"),
+    'US': RegleTelephone("1", "1"),
+    'CA': RegleTelephone("1", "1"),
+    'MA': RegleTelephone("212", "0"),
+    'DZ': RegleTelephone("213", "0"),
+    'TN': RegleTelephone("216", ""),
+}
+
+PAYS_PAR_DEFAUT = 'FR'
+
+# Nombre maximal de numéros distincts gardés en cache par normaliseur
+TAILLE_CACHE_TELEPHONES = 65536
+
+# Séparateurs retirés des numéros : version octets pour le cas ASCII (bien plus rapide que
+# str.translate avec suppression), version texte pour les espaces insécables copiés d'Excel
+_SEPARATEURS_ASCII = b" .-()/\t"
+_TABLE_SEPARATEURS = str.maketrans("", "", " .-()/\t\u00a0\u202f")
+
+
+class NormaliseurTelephone:
+    """
+    Normalise les numéros de téléphone pour un pays par défaut donné.
+
+    Args:
+        pays: Code pays ISO (ex. 'FR') appliqué aux numéros sans indicatif international
+        taille_cache: Nombre de numéros distincts mémorisés (0 pour désactiver le cache)
+
+    Raises:
+        ValueError: Si le pays n'a pas de règle connue dans REGLES_PAYS
+    """
+
+    __slots__ = ("pays", "prefixe_international", "prefixe_national", "normaliser")
+
+    def __init__(self, pays: str = PAYS_PAR_DEFAUT, taille_cache: int = TAILLE_CACHE_TELEPHONES):
+        pays = pays.upper()
+        if pays not in REGLES_PAYS:
+            raise ValueError(f"Pays inconnu pour les numéros de téléphone : {pays} "
+                             f"(pays connus : {', '.join(sorted(REGLES_PAYS))})")
+        regle = REGLES_PAYS[pays]
+        self.pays = pays
+        self.prefixe_international = f"+{regle.indicatif}"
+        self.prefixe_national = regle.prefixe_national
+        self.normaliser = lru_cache(maxsize=taille_cache)(self._normaliser) if taille_cache else self._normaliser
+
+    def __call__(self, numero: str) -> str:
+        return self.normaliser(numero)
+
+    def _normaliser(self, numero: str) -> str:
+        """
+        Normalise un numéro (sans passer par le cache).
+
+        Exemples (pays 'FR'):
+        - "06.12.34.56.78" -> "+33612345678"
+        - "0032 2-123 45 67" -> "+3221234567"
+        - "+33 (0)6 12 34 56 78" -> "+33612345678"
+        """
+        international = numero[:1] == '+' or numero[:2] == '00'
+        if international and "(0)" in numero:
+            # Numéro déjà international : « +33 (0)6 » se compose sans le 0 national
+            numero = numero.replace("(0)", "")
+
+        try:
+            chiffres = numero.encode('ascii').translate(None, _SEPARATEURS_ASCII).decode('ascii')
+        except UnicodeEncodeError:
+            chiffres = numero.translate(_TABLE_SEPARATEURS)
+
+        if international:
+            return chiffres if chiffres[:1] == '+' else f"+{chiffres[2:]}"
+        if not chiffres:
+            return ""
+        if self.prefixe_national and chiffres.startswith(self.prefixe_national):
+            chiffres = chiffres[len(self.prefixe_national):]
+        return f"{self.prefixe_international}{chiffres}"
+
+    def statistiques_cache(self) -> Dict[str, int]:
+        """Renvoie les succès, échecs et le nombre d'entrées du cache (zéros si le cache est désactivé)."""
+        if not hasattr(self.normaliser, "cache_info"):
+            return {"succes": 0, "echecs": 0, "entrees": 0, "taille_max": 0}
+        info = self.normaliser.cache_info()
+        return {"succes": info.hits, "echecs": info.misses, "entrees": info.currsize, "taille_max": info.maxsize or 0}
+
+
+def normaliser_telephone(numero: str, pays: str = PAYS_PAR_DEFAUT) -> str:
+    """
+    Normalise un numéro de téléphone au format international.
+
+    Pour convertir beaucoup de numéros, créer plutôt un `NormaliseurTelephone` une fois pour toutes.
+
+    Args:
+        numero: Numéro tel que saisi dans le CSV
+        pays: Code pays ISO appliqué si le numéro n'a pas d'indicatif international
+
+    Returns:
+        Numéro normalisé (ex. "+33612345678"), ou chaîne vide si le numéro est vide
+    """
+    numero = numero.strip()
+    if not numero:
+        return ""
+    return NormaliseurTelephone(pays, taille_cache=0)(numero)
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+Moteur de conversion par blocs : les lignes sont chargées par blocs de colonnes et nettoyées par des
+opérations pandas sur des colonnes entières plutôt qu'une ligne à la fois.
+
+Dans un bloc, seules les colonnes utilisées par le plan sont gardées. Le retrait des espaces, la
+normalisation des téléphones (séparateurs, `(0)`, indicatif), la recherche des caractères à échapper et
+le test des lignes à plier s'appliquent à toute une colonne ; les noms, très répétés, ne sont découpés
+et mis en forme qu'une fois par valeur distincte du bloc (`pandas.factorize`). Les fiches sont ensuite
+assemblées à partir des colonnes nettoyées. Elles sont identiques à celles de `PlanConversion.carte` :
+en particulier, un champ que le nettoyage vide (téléphone fait de séparateurs) est omis dans les deux cas.
+
+pandas est facultatif pour le paquet : il n'est importé qu'à la première conversion par blocs, et sans
+lui les lignes passent par la boucle Python habituelle.
+"""
+
+import importlib.util
+from itertools import islice, repeat
+from operator import itemgetter
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from .echappement import A_ECHAPPER, A_ECHAPPER_LISTE, ligne_contenu
+from .plan import PlanConversion, debut_carte
+
+# Lignes chargées par bloc : assez pour amortir les opérations sur les colonnes, sans garder le fichier
+TAILLE_BLOC = 20_000
+
+# Séparateurs retirés des numéros, comme `convertisseur.telephone`
+# (espaces insécables écrits en clair : la syntaxe RE2 de pyarrow ne connaît pas \\u)
+_SEPARATEURS_TELEPHONE = "[ .\\-()/\t\u00a0\u202f]"
+
+_pandas: Any = None
+
+
+_type_chaines: Any = object
+
+
+def _importer_pandas() -> Any:
+    """Module pandas, importé au premier appel ; None s'il n'est pas installé."""
+    global _pandas, _type_chaines
+    if _pandas is None:
+        try:
+            import pandas
+        except ImportError:
+            pandas = False
+        else:
+            # Avec pyarrow, les opérations sur les chaînes sont de vrais noyaux en C++ ; sans lui, pandas
+            # boucle en Python sur des objets, ce qui reste correct mais ne gagne rien
+            if importlib.util.find_spec("pyarrow") is not None:
+                _type_chaines = "string[pyarrow]"
+        _pandas = pandas
+    return _pandas or None
+
+
+def vectorisation_possible() -> bool:
+    """Indique si pandas est installé, donc si la conversion par blocs de colonnes est disponible."""
+    return _importer_pandas() is not None
+
+
+def generer_cartes_vectorisees(
+    lignes: Iterable[List[str]],
+    plan: PlanConversion,
+    taille_bloc: int = TAILLE_BLOC
+) -> Iterator[str]:
+    """
+    Convertit des lignes en fiches VCF, par blocs de `taille_bloc` lignes nettoyés colonne par colonne.
+
+    Sans pandas, chaque ligne passe par `plan.carte` : le résultat est le même, seule la vitesse change.
+
+    Args:
+        lignes: Lignes de données du CSV (sans l'en-tête)
+        plan: Plan de conversion compilé pour l'en-tête du CSV
+        taille_bloc: Nombre de lignes chargées et nettoyées ensemble
+
+    Yields:
+        Le texte de chaque fiche, dans l'ordre des lignes
+    """
+    pd = _importer_pandas()
+    if pd is None:
+        for texte in map(plan.carte, lignes):
+            if texte is not None:
+                yield texte
+        return
+
+    lignes = iter(lignes)
+    while True:
+        bloc = list(islice(lignes, taille_bloc))
+        if not bloc:
+            return
+        yield from _convertir_bloc(pd, bloc, plan)
+
+
+def _convertir_bloc(pd: Any, bloc: List[List[str]], plan: PlanConversion) -> Iterator[str]:
+    """Convertit un bloc de lignes : nettoyage par colonnes, puis assemblage des fiches."""
+    nb_colonnes = plan.nb_colonnes
+    if min(map(len, bloc)) < nb_colonnes:
+        # Comme `plan.carte` : les lignes courtes sont complétées par des cellules vides
+        bloc = [ligne if len(ligne) >= nb_colonnes else ligne + [""] * (nb_colonnes - len(ligne)) for ligne in bloc]
+
+    # Seules les colonnes utilisées sont extraites, une passe `map` par colonne
+    colonnes = {index: pd.Series(list(map(itemgetter(index), bloc)), dtype=_type_chaines).str.strip()
+                for index in plan.colonnes_utilisees()}
+
+    prenoms, noms, gardees = _noms(pd, plan, colonnes)
+    if not gardees.any():
+        return
+    if not gardees.all():
+        colonnes = {index: colonne[gardees] for index, colonne in colonnes.items()}
+        prenoms, noms = prenoms[gardees], noms[gardees]
+        bloc = [ligne for ligne, gardee in zip(bloc, gardees.tolist()) if gardee]
+
+    prenoms, noms = prenoms.tolist(), noms.tolist()
+    morceaux: List[Iterable[str]] = [map(debut_carte, prenoms, noms)]
+    for (index, debut, fin, _, _, echappement, place), type_champ in zip(plan.champs, plan.types_champs):
+        valeurs = colonnes[index]
+        if type_champ == 'telephone':
+            valeurs = _normaliser_telephones(valeurs, plan)
+        morceaux.append(_lignes_champ(valeurs, debut, fin, echappement, place, type_champ == 'mots_cle'))
+    if plan.cles_uid is not None:
+        # L'UID numérote les homonymes dans l'ordre des lignes : il reste calculé ligne à ligne
+        morceaux.append(f"UID:{plan.identifiant(plan.cle_uid(prenom, nom, ligne))}\n"
+                        for prenom, nom, ligne in zip(prenoms, noms, bloc))
+    morceaux.append(repeat(plan.fin_carte))
+    yield from map("".join, zip(*morceaux))
+
+
+def _noms(pd: Any, plan: PlanConversion, colonnes: Dict[int, Any]) -> Tuple[Any, Any, Any]:
+    """
+    Prénoms et noms mis en forme d'un bloc, et masque des lignes qui ont un nom ou un prénom.
+
+    Chaque valeur distincte n'est découpée ou mise en forme qu'une fois.
+    """
+    def appliquer(colonne: Any, fonction: Any) -> Any:
+        codes, distinctes = pd.factorize(colonne)
+        return pd.Series([fonction(valeur) for valeur in distinctes], dtype=object).take(codes).reset_index(drop=True)
+
+    if plan.index_prenom_nom is not None:
+        prenom_nom = colonnes[plan.index_prenom_nom]
+        codes, distinctes = pd.factorize(prenom_nom)
+        separes = [plan.separer_prenom_nom(valeur) if valeur else ("", "") for valeur in distinctes]
+        prenoms = pd.Series([prenom for prenom, _ in separes], dtype=object).take(codes).reset_index(drop=True)
+        noms = pd.Series([nom for _, nom in separes], dtype=object).take(codes).reset_index(drop=True)
+        return prenoms, noms, prenom_nom != ""
+
+    vide = pd.Series([""] * len(next(iter(colonnes.values()))), dtype=_type_chaines)
+    prenoms = colonnes[plan.index_prenom] if plan.index_prenom is not None else vide
+    noms = colonnes[plan.index_nom_famille] if plan.index_nom_famille is not None else vide
+    gardees = (prenoms != "") | (noms != "")
+    prenoms = appliquer(prenoms, lambda valeur: plan.formater_nom(valeur) if valeur else "")
+    # Pour le nom de famille, on conserve les majuscules si c'est le cas dans le CSV
+    noms = appliquer(noms, lambda valeur: plan.formater_nom(valeur, True) if valeur else "")
+    return prenoms, noms, gardees
+
+
+def _normaliser_telephones(numeros: Any, plan: PlanConversion) -> Any:
+    """Colonne des numéros normalisés, avec les règles de `NormaliseurTelephone` appliquées à la colonne."""
+    normaliseur = plan.normaliseur_telephone
+    international = numeros.str.startswith("+") | numeros.str.startswith("00")
+    # Numéro déjà international : « +33 (0)6 » se compose sans le 0 national
+    numeros = numeros.mask(international, numeros.str.replace("(0)", "", regex=False))
+    chiffres = numeros.str.replace(_SEPARATEURS_TELEPHONE, "", regex=True)
+
+    prefixe = normaliseur.prefixe_national
+    nationaux = chiffres
+    if prefixe:
+        nationaux = nationaux.mask(nationaux.str.startswith(prefixe), nationaux.str[len(prefixe):])
+    nationaux = (normaliseur.prefixe_international + nationaux).mask(chiffres == "", "")
+    internationaux = chiffres.mask(~chiffres.str.startswith("+"), "+" + chiffres.str[2:])
+    # Une cellule vide reste vide : le champ n'est pas écrit
+    return internationaux.where(international, nationaux).mask(numeros == "", "")
+
+
+def _lignes_champ(valeurs: Any, debut: str, fin: str, echappement: Any, place: int, liste: bool) -> List[str]:
+    """Lignes d'un champ pour toutes les fiches du bloc (chaîne vide quand la valeur est vide)."""
+    a_echapper = valeurs.str.contains((A_ECHAPPER_LISTE if liste else A_ECHAPPER).pattern, regex=True)
+    if a_echapper.any():
+        valeurs = valeurs.mask(a_echapper, valeurs[a_echapper].map(echappement))
+    lignes = debut + valeurs + fin
+    a_plier = (valeurs.str.len() > place) | ~valeurs.str.isascii()
+    if a_plier.any():
+        lignes = lignes.mask(a_plier, valeurs[a_plier].map(lambda valeur: ligne_contenu(debut, valeur, fin)))
+    resultat: List[str] = lignes.mask(valeurs == "", "").tolist()
+    return resultat
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+Données communes aux tests : une liste d'équipe synthétique qui réunit les cas délicats des vraies listes
+(homonymes, doublons, lignes sans nom, adresses sur plusieurs lignes, guillemet isolé dans un champ).
+"""
+
+import os
+import random
+from typing import Dict, List
+
+import pytest
+
+DOSSIER_DATA = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "data"))
+
+ENTETE_EQUIPE = ["Role", "Prénom Nom", "Téléphone", "Mail", "Adresse", "Agent", "Mots clé"]
+
+MAPPINGS_EQUIPE: Dict[str, str] = {
+    'nom': "Prénom Nom",
+    'role': "Role",
+    'telephone': "Téléphone",
+    'email': "Mail",
+    'adresse': "Adresse",
+    'agent': "Agent",
+    'mots_cle': "Mots clé",
+}
+
+PRENOMS = ["Lucas", "Noham", "Théo", "Yousra", "Marie-France", "Élodie", "Zoé", "Loïc"]
+NOMS = ["ENGLANDER", "EDJE", "HELLERMANN", "EL ABDELLAOUI", "de la TOUR", "Martin", "N'DIAYE"]
+ROLES = ["Réalisateur", "Productrice", "Scripte", "Régisseur", "Chef électro", 'Écran 5" pouces', ""]
+ADRESSES = ["", "", "12 rue de la Paix, 75002 Paris", "3 impasse des Lilas\n93100 Montreuil",
+            '8 place de l\'Église; "Le Moulin"', "1 avenue Foch\r\n69003 Lyon"]
+TELEPHONES = ["", "--", "()", "07.68.28.30.66", "06 47 23 90 47", "+33 6 12 34 56 78", "0612345678"]
+
+
+def _champ_csv(valeur: str) -> str:
+    """
+    Écrit un champ comme le ferait un tableur peu rigoureux : entre guillemets seulement s'il contient le
+    délimiteur, un saut de ligne ou commence par un guillemet ; un guillemet au milieu d'un champ est laissé
+    tel quel (csv.reader le lit comme un caractère ordinaire).
+    """
+    if ";" in valeur or "\n" in valeur or "\r" in valeur or valeur.startswith('"'):
+        return '"' + valeur.replace('"', '""') + '"'
+    return valeur
+
+
+def lignes_equipe(nb_lignes: int, graine: int = 7) -> List[List[str]]:
+    """En-tête puis `nb_lignes` lignes d'une liste d'équipe reproductible."""
+    aleatoire = random.Random(graine)
+    lignes = [list(ENTETE_EQUIPE)]
+    for i in range(nb_lignes):
+        # Peu de noms différents : homonymes et doublons sont fréquents
+        nom = f"{aleatoire.choice(PRENOMS)} {aleatoire.choice(NOMS)}" if aleatoire.random() > 0.03 else ""
+        mail = f"contact{aleatoire.randint(0, nb_lignes // 3)}@exemple.fr" if aleatoire.random() < 0.7 else ""
+        agent = f"{aleatoire.choice(PRENOMS)} - Adéquat" if aleatoire.random() < 0.2 else ""
+        mots_cle = aleatoire.choice(["", "Technique", "Artistique,Régie"])
+        lignes.append([aleatoire.choice(ROLES), nom, aleatoire.choice(TELEPHONES), mail,
+                       aleatoire.choice(ADRESSES), agent, mots_cle])
+        if i % 500 == 250:
+            # Ligne vide au milieu du fichier
+            lignes.append([])
+    return lignes
+
+
+def texte_csv(lignes: List[List[str]]) -> str:
+    """Texte d'un CSV délimité par des points-virgules."""
+    return "".join(";".join(_champ_csv(valeur) for valeur in ligne) + "\n" for ligne in lignes)
+
+
+@pytest.fixture(scope="session")
+def contenu_equipe() -> str:
+    """Texte d'une liste d'équipe de 3000 lignes."""
+    return texte_csv(lignes_equipe(3000))
+
+
+@pytest.fixture
+def csv_equipe(tmp_path: "os.PathLike[str]", contenu_equipe: str) -> str:
+    """Chemin d'une liste d'équipe de 3000 lignes, en UTF-8 avec BOM comme les exports Excel."""
+    chemin = os.path.join(tmp_path, "equipe.csv")
+    with open(chemin, "w", encoding="utf-8-sig", newline="") as fichier:
+        fichier.write(contenu_equipe)
+    return chemin
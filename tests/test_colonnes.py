@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""Suggestion des colonnes : noms exacts comme la recherche historique, cas normalisés et approchés."""
+
+import random
+from typing import Dict, List
+
+import pytest
+
+from convertisseur import get_colonnes_suggérées, suggerer_colonnes
+
+
+def _suggestions_historiques(colonnes: List[str]) -> Dict[str, str]:
+    """Recherche d'avant l'index : pour chaque champ, le premier nom suggéré présent tel quel."""
+    suggestions = {}
+    for type_champ, noms_possibles in get_colonnes_suggérées().items():
+        for nom in noms_possibles:
+            if nom in colonnes:
+                suggestions[type_champ] = nom
+                break
+    return suggestions
+
+
+def test_noms_exacts_identiques_a_la_recherche_historique() -> None:
+    aleatoire = random.Random(3)
+    noms = [nom for noms_possibles in get_colonnes_suggérées().values() for nom in noms_possibles]
+    for _ in range(300):
+        colonnes = aleatoire.sample(noms, aleatoire.randint(1, 12)) + ["Colonne 1", "Remarques"]
+        aleatoire.shuffle(colonnes)
+        suggestions = suggerer_colonnes(colonnes, approchee=False)
+        historiques = _suggestions_historiques(colonnes)
+        # Mêmes colonnes pour les champs trouvés par nom exact ; la forme normalisée peut en trouver d'autres
+        assert {type_champ: suggestions.get(type_champ) for type_champ in historiques} == historiques
+        assert set(suggestions.values()) <= set(colonnes) - {"Colonne 1", "Remarques"}
+
+
+@pytest.mark.parametrize("colonnes, attendu", [
+    # Forme normalisée : casse, accents et ponctuation
+    (["PRENOM NOM", "TÉL.", "e-mail"], {'nom': "PRENOM NOM", 'telephone': "TÉL.", 'email': "e-mail"}),
+    # « nom » à la casse près : nom de famille avec une colonne de prénom, laissé au choix sinon
+    (["Prénom", "nom", "Tel"], {'prenom': "Prénom", 'nom_famille': "nom", 'telephone': "Tel"}),
+    (["nom", "Tel"], {'telephone': "Tel"}),
+    # Noms exacts : « Nom » est le nom complet, « NOM » le nom de famille
+    (["Nom", "NOM", "Prénom"], {'nom': "Nom", 'prenom': "Prénom", 'nom_famille': "NOM"}),
+    # Correspondances approchées, sauf après un mot de liaison
+    (["Nom du projet", "E-mail pro", "Telephnoe"], {'telephone': "Telephnoe", 'email': "E-mail pro"}),
+])
+def test_correspondances_normalisees_et_approchees(colonnes: List[str], attendu: Dict[str, str]) -> None:
+    assert suggerer_colonnes(colonnes) == attendu
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""Découpage de la sortie : les fichiers réunis redonnent les fiches d'une conversion complète."""
+
+import io
+import zipfile
+from collections import Counter
+from pathlib import Path
+from typing import List
+
+from convertisseur import ecrire_decoupe, ecrire_vcf
+
+from conftest import MAPPINGS_EQUIPE
+
+
+def _fiches(texte: str) -> List[str]:
+    return [fiche.lstrip("\n") + "END:VCARD\n" for fiche in texte.split("END:VCARD\n") if fiche.strip()]
+
+
+def _conversion_complete(csv_equipe: str) -> str:
+    sortie = io.StringIO()
+    ecrire_vcf(csv_equipe, sortie, MAPPINGS_EQUIPE, "Tournage")
+    return sortie.getvalue()
+
+
+def test_parties_bout_a_bout_identiques(csv_equipe: str, tmp_path: Path) -> None:
+    bilan = ecrire_decoupe(csv_equipe, tmp_path / "parties", MAPPINGS_EQUIPE, "Tournage", max_fiches=400)
+    assert len(bilan.fichiers) > 1
+    assert all(nb_fiches <= 400 for _, nb_fiches in bilan.fichiers)
+    texte = "".join((tmp_path / "parties" / nom).read_text(encoding="utf-8") for nom, _ in bilan.fichiers)
+    assert texte == _conversion_complete(csv_equipe)
+
+    # Même contenu quand les parties sont compressées directement dans une archive
+    bilan_zip = ecrire_decoupe(csv_equipe, tmp_path / "parties.zip", MAPPINGS_EQUIPE, "Tournage", max_fiches=400)
+    assert bilan_zip == bilan
+    with zipfile.ZipFile(tmp_path / "parties.zip") as archive:
+        assert "".join(archive.read(nom).decode("utf-8") for nom, _ in bilan.fichiers) == texte
+
+
+def test_decoupage_par_role_reunit_toutes_les_fiches(csv_equipe: str, tmp_path: Path) -> None:
+    bilan = ecrire_decoupe(csv_equipe, tmp_path / "roles", MAPPINGS_EQUIPE, "Tournage", critere='role',
+                           max_octets=64 * 1024)
+    fiches: Counter = Counter()
+    for nom, nb_fiches in bilan.fichiers:
+        fiches_fichier = _fiches((tmp_path / "roles" / nom).read_text(encoding="utf-8"))
+        assert len(fiches_fichier) == nb_fiches
+        fiches.update(fiches_fichier)
+    # Un seul rôle par contact : chaque fiche est dans un seul fichier
+    assert fiches == Counter(_fiches(_conversion_complete(csv_equipe)))
+    assert sum(fiches.values()) == bilan.nb_fiches
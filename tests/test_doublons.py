@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""Fusion des doublons : mêmes groupes qu'une comparaison deux à deux, même fiche qu'avant sans doublon."""
+
+import io
+from typing import List, Set
+
+from convertisseur import convertir_csv_en_vcf, ecrire_contacts, ecrire_vcf
+from convertisseur.doublons import generer_cartes_fusionnees
+from convertisseur.identifiants import cle_nom
+from convertisseur.plan import PlanConversion
+
+from conftest import ENTETE_EQUIPE, MAPPINGS_EQUIPE, lignes_equipe, texte_csv
+
+
+def _groupes_deux_a_deux(lignes: List[List[str]], plan: PlanConversion) -> List[List[int]]:
+    """Groupes de contacts par fermeture transitive des comparaisons deux à deux (référence lente)."""
+    contacts = [contact for contact in map(plan.extraire, lignes) if contact is not None]
+    index_email, index_telephone = plan.types_champs.index('email'), plan.types_champs.index('telephone')
+
+    def cles(contact: tuple) -> Set[tuple]:
+        prenom, nom, valeurs = contact
+        candidates = {('email', valeurs[index_email].casefold()), ('telephone', valeurs[index_telephone]),
+                      ('nom', cle_nom(prenom, nom))}
+        return {cle for cle in candidates if cle[1]}
+
+    groupes: List[List[int]] = []
+    cles_groupes: List[Set[tuple]] = []
+    for i, contact in enumerate(contacts):
+        cles_contact = cles(contact)
+        lies = [n for n, cles_groupe in enumerate(cles_groupes) if cles_groupe & cles_contact]
+        groupe, cles_groupe = [i], set(cles_contact)
+        for n in reversed(lies):
+            groupe += groupes.pop(n)
+            cles_groupe |= cles_groupes.pop(n)
+        groupes.append(sorted(groupe))
+        cles_groupes.append(cles_groupe)
+    return sorted(groupes)
+
+
+def test_groupes_identiques_a_la_comparaison_deux_a_deux() -> None:
+    lignes = [ligne for ligne in lignes_equipe(600, graine=5)[1:] if ligne]
+    plan = PlanConversion(list(ENTETE_EQUIPE), MAPPINGS_EQUIPE, "Tournage")
+    groupes = _groupes_deux_a_deux(lignes, plan)
+    assert len(groupes) < len(lignes)
+
+    fiches = list(generer_cartes_fusionnees(lignes, plan))
+    assert len(fiches) == len(groupes)
+    # Chaque fiche reprend le nom de la première ligne de son groupe, dans l'ordre de ces premières lignes
+    contacts = [contact for contact in map(plan.extraire, lignes) if contact is not None]
+    for fiche, groupe in zip(fiches, groupes):
+        prenom, nom, _ = contacts[groupe[0]]
+        assert f"\nFN:{prenom} {nom}\n" in fiche
+
+
+def test_sans_doublon_fiches_inchangees() -> None:
+    lignes = [ENTETE_EQUIPE] + [
+        ["Scripte", f"Prénom{i} NOM{i}", f"06 00 00 {i // 100:02d} {i % 100:02d}", f"contact{i}@exemple.fr",
+         "", "", "Technique" if i % 2 else ""]
+        for i in range(300)
+    ]
+    contenu = texte_csv(lignes)
+    assert (convertir_csv_en_vcf(contenu, MAPPINGS_EQUIPE, "Tournage", fusionner_doublons=True)
+            == convertir_csv_en_vcf(contenu, MAPPINGS_EQUIPE, "Tournage"))
+
+
+def test_fusion_attendue() -> None:
+    contenu = ("Role;Prénom Nom;Téléphone;Mail\n"
+               "Réalisateur;Lucas ENGLANDER;06 12 34 56 78;lucas@exemple.fr\n"
+               "Scripte;Noham EDJE;;NOHAM@exemple.fr\n"
+               "Producteur;Lucas Englander;07 00 00 00 01;\n"
+               "Régisseur;Noham E.;0612345679;noham@exemple.fr\n"
+               "Stagiaire;Zoé MARTIN;;\n")
+    mappings = {'nom': "Prénom Nom", 'role': "Role", 'telephone': "Téléphone", 'email': "Mail"}
+    vcf = convertir_csv_en_vcf(contenu, mappings, fusionner_doublons=True)
+    fiches = vcf.split("END:VCARD\n\n")[:-1]
+    assert len(fiches) == 3
+    # Même nom : les deux lignes de Lucas, téléphones et rôles réunis
+    assert "TITLE:Réalisateur\nTITLE:Producteur\n" in fiches[0]
+    assert "TEL;TYPE=CELL:+33612345678\nTEL;TYPE=CELL:+33700000001\n" in fiches[0]
+    # Même email à la casse près : une seule adresse gardée, dans sa première écriture
+    assert fiches[1].count("EMAIL") == 1 and "EMAIL;TYPE=INTERNET:NOHAM@exemple.fr" in fiches[1]
+    assert "N:Martin;Zoé;;;" in fiches[2]
+
+
+def test_contacts_fusionnes_identiques_aux_fiches(csv_equipe: str) -> None:
+    attendu = io.StringIO()
+    ecrire_vcf(csv_equipe, attendu, MAPPINGS_EQUIPE, "Tournage", fusionner_doublons=True, colonnes_uid=["email"])
+    vcard3, vcard4 = io.StringIO(), io.StringIO()
+    ecrire_contacts(csv_equipe, {'vcard3': vcard3, 'vcard4': vcard4}, MAPPINGS_EQUIPE, "Tournage",
+                    fusionner_doublons=True, colonnes_uid=["email"])
+    assert vcard3.getvalue() == attendu.getvalue()
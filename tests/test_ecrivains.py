@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+"""Écrivains de contacts : la vCard 3.0 passée par les contacts est celle de `ecrire_vcf`."""
+
+import io
+import json
+from typing import Optional, Sequence
+
+import pytest
+
+from convertisseur import ecrire_contacts, ecrire_vcf
+
+from conftest import MAPPINGS_EQUIPE
+
+
+@pytest.mark.parametrize("colonnes_uid", [None, ["email"]])
+def test_vcard3_identique_a_ecrire_vcf(csv_equipe: str, colonnes_uid: Optional[Sequence[str]]) -> None:
+    attendu = io.StringIO()
+    nb_attendu = ecrire_vcf(csv_equipe, attendu, MAPPINGS_EQUIPE, "Tournage", colonnes_uid=colonnes_uid,
+                            revision="20260101T000000Z")
+
+    # Avec un second format, la vCard 3.0 est écrite par EcrivainVCard3 à partir des contacts
+    vcard3, jcard = io.StringIO(), io.StringIO()
+    nb_fiches = ecrire_contacts(csv_equipe, {'vcard3': vcard3, 'jcard': jcard}, MAPPINGS_EQUIPE, "Tournage",
+                                colonnes_uid=colonnes_uid, revision="20260101T000000Z")
+    assert nb_fiches == nb_attendu
+    assert vcard3.getvalue() == attendu.getvalue()
+    assert len(json.loads(jcard.getvalue())) == nb_fiches
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""Reconversion incrémentale : même VCF qu'une conversion complète, UID des homonymes mis à part."""
+
+from pathlib import Path
+from typing import Optional, Sequence
+
+from convertisseur import convertir_incremental, ecrire_vcf
+
+from conftest import MAPPINGS_EQUIPE, lignes_equipe, texte_csv
+
+
+def _conversion_complete(chemin_csv: Path, chemin_vcf: Path, colonnes_uid: Optional[Sequence[str]] = None) -> bytes:
+    ecrire_vcf(str(chemin_csv), str(chemin_vcf), MAPPINGS_EQUIPE, "Tournage", colonnes_uid=colonnes_uid)
+    return chemin_vcf.read_bytes()
+
+
+def test_sans_uid_identique_a_une_conversion_complete(tmp_path: Path) -> None:
+    lignes = lignes_equipe(2000)
+    chemin_csv, chemin_vcf = tmp_path / "equipe.csv", tmp_path / "equipe.vcf"
+    chemin_csv.write_text(texte_csv(lignes), encoding="utf-8-sig")
+    bilan = convertir_incremental(str(chemin_csv), str(chemin_vcf), MAPPINGS_EQUIPE, "Tournage")
+    assert bilan.nb_fiches == len(bilan.ajoutes)
+    assert chemin_vcf.read_bytes() == _conversion_complete(chemin_csv, tmp_path / "complet.vcf")
+
+    # Une ligne modifiée, une supprimée et une ajoutée
+    lignes[10][0] = "Cascadeur"
+    del lignes[20]
+    lignes.append(["Doublure", "Zoé NOUVELLE", "06 12 34 56 78", "", "", "", ""])
+    chemin_csv.write_text(texte_csv(lignes), encoding="utf-8-sig")
+    bilan = convertir_incremental(str(chemin_csv), str(chemin_vcf), MAPPINGS_EQUIPE, "Tournage")
+    assert (len(bilan.ajoutes), len(bilan.modifies), len(bilan.supprimes)) == (1, 1, 1)
+    assert chemin_vcf.read_bytes() == _conversion_complete(chemin_csv, tmp_path / "complet.vcf")
+
+    bilan = convertir_incremental(str(chemin_csv), str(chemin_vcf), MAPPINGS_EQUIPE, "Tournage")
+    assert bilan.fichier_inchange
+
+
+def test_avec_uid_seuls_les_uid_des_homonymes_different(tmp_path: Path) -> None:
+    lignes = lignes_equipe(2000)
+    chemin_csv, chemin_vcf = tmp_path / "equipe.csv", tmp_path / "equipe.vcf"
+    chemin_csv.write_text(texte_csv(lignes), encoding="utf-8-sig")
+    convertir_incremental(str(chemin_csv), str(chemin_vcf), MAPPINGS_EQUIPE, "Tournage", colonnes_uid=["nom"])
+    complet = _conversion_complete(chemin_csv, tmp_path / "complet.vcf", colonnes_uid=["nom"])
+    assert chemin_vcf.read_bytes() == complet
+
+    # Supprimer la première ligne décale le rang des homonymes qui la suivent dans une conversion complète
+    del lignes[1]
+    chemin_csv.write_text(texte_csv(lignes), encoding="utf-8-sig")
+    convertir_incremental(str(chemin_csv), str(chemin_vcf), MAPPINGS_EQUIPE, "Tournage", colonnes_uid=["nom"])
+    lignes_incremental = chemin_vcf.read_bytes().splitlines()
+    lignes_complet = _conversion_complete(chemin_csv, tmp_path / "complet.vcf", colonnes_uid=["nom"]).splitlines()
+    assert len(lignes_incremental) == len(lignes_complet)
+    differences = [(a, b) for a, b in zip(lignes_incremental, lignes_complet) if a != b]
+    assert differences
+    assert all(a.startswith(b"UID:") and b.startswith(b"UID:") for a, b in differences)
+    uids = [ligne for ligne in lignes_incremental if ligne.startswith(b"UID:")]
+    assert len(set(uids)) == len(uids)
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+"""Conversion inverse : un VCF remis en CSV redonne le même VCF."""
+
+import os
+from pathlib import Path
+from typing import Dict, List
+
+from convertisseur.configuration import trouver_configuration
+from convertisseur.lecture_vcf import ecrire_csv_depuis_vcf
+from convertisseur.lot import convertir_lot, lister_fichiers_csv, preparer_taches
+
+from conftest import DOSSIER_DATA
+
+
+def _convertir(fichiers: List[str], dossier: Path) -> Dict[str, bytes]:
+    dossier.mkdir()
+    taches = preparer_taches(fichiers, str(dossier), None, "Tournage", None, registre=False)
+    assert [resultat.erreur for resultat in convertir_lot(taches, 1)] == [None] * len(fichiers)
+    return {chemin.name: chemin.read_bytes() for chemin in dossier.iterdir()}
+
+
+def test_aller_retour_csv_vcf_csv_vcf(tmp_path: Path) -> None:
+    fichiers = lister_fichiers_csv([DOSSIER_DATA])
+    premiers = _convertir(fichiers, tmp_path / "premiers")
+
+    relus = tmp_path / "relus"
+    relus.mkdir()
+    for nom_vcf in premiers:
+        chemin_csv = relus / (os.path.splitext(nom_vcf)[0] + ".csv")
+        bilan = ecrire_csv_depuis_vcf(tmp_path / "premiers" / nom_vcf, chemin_csv)
+        assert bilan.nb_fiches == premiers[nom_vcf].count(b"BEGIN:VCARD")
+        assert trouver_configuration(str(chemin_csv)) is not None
+
+    seconds = _convertir(lister_fichiers_csv([str(relus)]), tmp_path / "seconds")
+    assert seconds == premiers
+    assert b"N:ENGLANDER;" in premiers["toto.vcf"]
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""Conversion par lots : mêmes fichiers VCF en parallèle que fichier par fichier."""
+
+import os
+from pathlib import Path
+
+import pytest
+
+from convertisseur import ecrire_vcf
+from convertisseur.configuration import charger_mappings, trouver_configuration
+from convertisseur.detection import detecter_format_fichier
+from convertisseur.lot import convertir_lot, lister_fichiers_csv, main, preparer_taches
+
+from conftest import DOSSIER_DATA
+
+
+def test_lot_parallele_identique_au_lot_sequentiel(tmp_path: Path) -> None:
+    fichiers = lister_fichiers_csv([DOSSIER_DATA])
+    assert len(fichiers) >= 4
+    sorties = {}
+    for nom, nb_processus in (("sequentiel", 1), ("parallele", 2)):
+        dossier = tmp_path / nom
+        dossier.mkdir()
+        taches = preparer_taches(fichiers, str(dossier), None, "Tournage", None, registre=False)
+        resultats = list(convertir_lot(taches, nb_processus))
+        assert [resultat.erreur for resultat in resultats] == [None] * len(fichiers)
+        sorties[nom] = {chemin.name: chemin.read_bytes() for chemin in dossier.iterdir()}
+    assert len(sorties["parallele"]) == len(fichiers)
+    assert sorties["parallele"] == sorties["sequentiel"]
+
+    # Un CSV accompagné de son *_config.json est converti avec ces correspondances
+    for chemin_csv in fichiers:
+        chemin_config = trouver_configuration(chemin_csv)
+        if chemin_config is None:
+            continue
+        format_csv = detecter_format_fichier(chemin_csv)
+        attendu = tmp_path / "attendu.vcf"
+        ecrire_vcf(chemin_csv, str(attendu), charger_mappings(chemin_config), "Tournage", format_csv.delimiteur,
+                   encodage=format_csv.encodage, guillemet=format_csv.guillemet)
+        nom_vcf = os.path.splitext(os.path.basename(chemin_csv))[0] + ".vcf"
+        assert sorties["parallele"][nom_vcf] == attendu.read_bytes()
+
+
+def test_ligne_de_commande(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    assert main([os.path.join(DOSSIER_DATA, "toto.csv"), "-o", str(tmp_path), "--sans-registre"]) == 0
+    sortie = capsys.readouterr().out
+    assert "OK     toto.csv" in sortie and "format : " in sortie
+    assert (tmp_path / "toto.vcf").read_text(encoding="utf-8").startswith("BEGIN:VCARD\n")
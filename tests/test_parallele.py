@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""Conversion multi-cœur : même VCF, octet pour octet, que la conversion en flux."""
+
+import concurrent.futures
+import csv
+import io
+from pathlib import Path
+from typing import Any, List, Optional
+
+import pytest
+
+from convertisseur import ecrire_vcf, parallele
+from convertisseur.parallele import decouper_csv, ecrire_vcf_parallele
+
+from conftest import MAPPINGS_EQUIPE
+
+
+def _enregistrements(donnees: bytes) -> List[List[str]]:
+    return list(csv.reader(io.StringIO(donnees.decode("utf-8-sig"), newline=""), delimiter=";"))
+
+
+def test_morceaux_sur_des_limites_d_enregistrement(csv_equipe: str) -> None:
+    with open(csv_equipe, "rb") as fichier:
+        donnees = fichier.read()
+    assert b'5" pouces' in donnees and b'"3 impasse des Lilas\n' in donnees
+    fin_entete, intervalles = decouper_csv(csv_equipe, 50)
+    assert len(intervalles) > 10
+    assert intervalles[0][0] == fin_entete and intervalles[-1][1] == len(donnees)
+    morceaux = [_enregistrements(donnees[debut:fin]) for debut, fin in intervalles]
+    assert [ligne for morceau in morceaux for ligne in morceau] == _enregistrements(donnees[fin_entete:])
+
+
+def test_guillemet_initial_et_champ_non_termine(tmp_path: Path) -> None:
+    chemin = tmp_path / "cite.csv"
+    chemin.write_bytes(b'\xef\xbb\xbf"Pr\xc3\xa9nom Nom";"Adresse"\n"Lucas\nENGLANDER";a\nZo\xc3\xa9;"b\n\nc\n')
+    fin_entete, intervalles = decouper_csv(str(chemin), 10)
+    assert fin_entete == len(b'\xef\xbb\xbf"Pr\xc3\xa9nom Nom";"Adresse"\n')
+    # Le guillemet ouvert et jamais fermé s'étend jusqu'à la fin : aucune limite après lui
+    assert intervalles == [(fin_entete, fin_entete + len(b'"Lucas\nENGLANDER";a\n')),
+                           (fin_entete + len(b'"Lucas\nENGLANDER";a\n'), chemin.stat().st_size)]
+
+
+@pytest.mark.parametrize("colonnes_uid", [None, ["email"]])
+def test_vcf_identique_a_la_conversion_en_flux(csv_equipe: str, tmp_path: Path, monkeypatch: pytest.MonkeyPatch,
+                                                 colonnes_uid: Optional[List[str]]) -> None:
+    monkeypatch.setattr(parallele, "TAILLE_MINIMALE_PARALLELE", 0)
+    attendu, obtenu = tmp_path / "flux.vcf", tmp_path / "parallele.vcf"
+    nb_attendu = ecrire_vcf(csv_equipe, str(attendu), MAPPINGS_EQUIPE, "Tournage", colonnes_uid=colonnes_uid)
+    nb_obtenu = ecrire_vcf_parallele(csv_equipe, str(obtenu), MAPPINGS_EQUIPE, "Tournage", nb_processus=2,
+                                     taille_morceau=4096, colonnes_uid=colonnes_uid)
+    assert nb_obtenu == nb_attendu
+    assert obtenu.read_bytes() == attendu.read_bytes()
+
+
+
+def test_resultats_en_attente_bornes(csv_equipe: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(parallele, "TAILLE_MINIMALE_PARALLELE", 0)
+    ecrits, soumis, en_attente = [], [], []
+
+    class Destination(io.StringIO):
+        def write(self, texte: str) -> int:
+            ecrits.append(texte)
+            return super().write(texte)
+
+    class Executeur(concurrent.futures.ThreadPoolExecutor):
+        def submit(self, *args: Any, **kwargs: Any) -> "concurrent.futures.Future[Any]":
+            soumis.append(args)
+            en_attente.append(len(soumis) - len(ecrits))
+            return super().submit(*args, **kwargs)
+
+    # Des fils à la place des processus, pour compter les morceaux soumis et pas encore écrits
+    monkeypatch.setattr(concurrent.futures, "ProcessPoolExecutor", Executeur)
+    destination = Destination()
+    ecrire_vcf_parallele(csv_equipe, destination, MAPPINGS_EQUIPE, nb_processus=2, taille_morceau=4096)
+    assert len(soumis) > 20
+    assert max(en_attente) == 2 * parallele.MORCEAUX_EN_ATTENTE_PAR_PROCESSUS
+    attendu = io.StringIO()
+    ecrire_vcf(csv_equipe, attendu, MAPPINGS_EQUIPE)
+    assert destination.getvalue() == attendu.getvalue()
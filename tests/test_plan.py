@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""Plan de conversion compilé : texte des fiches et équivalence de ses différentes sorties."""
+
+import csv
+import io
+
+from convertisseur import convertir_csv_en_vcf
+from convertisseur.plan import PlanConversion
+
+from conftest import MAPPINGS_EQUIPE
+
+
+def test_fiche_attendue() -> None:
+    contenu = ("Role;Prénom Nom;Téléphone;Mail;Adresse\n"
+               "Réalisateur;Théo HELLERMANN;07.61.49.34.15;hellertheo@hotmail.com;3 rue d'Alésia, Paris\n"
+               ";;--;;\n")
+    mappings = {'nom': "Prénom Nom", 'role': "Role", 'telephone': "Téléphone", 'email': "Mail",
+                'adresse': "Adresse"}
+    assert convertir_csv_en_vcf(contenu, mappings, "Tournage; été") == (
+        "BEGIN:VCARD\nVERSION:3.0\nN:Hellermann;Théo;;;\nFN:Théo Hellermann\nTITLE:Réalisateur\n"
+        "TEL;TYPE=CELL:+33761493415\nEMAIL;TYPE=INTERNET:hellertheo@hotmail.com\n"
+        "ADR;TYPE=HOME:;;3 rue d'Alésia\\, Paris;;;;\nNOTE:Tournage\\; été\nEND:VCARD\n\n")
+
+
+def test_telephone_fait_de_separateurs_omis() -> None:
+    contenu = "Prénom;NOM;Téléphone\nLucas;ENGLANDER;--\nNoham;EDJE;()\n"
+    vcf = convertir_csv_en_vcf(contenu, {'prenom': "Prénom", 'nom_famille': "NOM", 'telephone': "Téléphone"})
+    assert vcf.count("BEGIN:VCARD") == 2
+    assert "TEL" not in vcf
+
+
+def test_carte_multiple_identique_a_carte(contenu_equipe: str) -> None:
+    lecteur = csv.reader(io.StringIO(contenu_equipe), delimiter=';')
+    plan = PlanConversion(next(lecteur), MAPPINGS_EQUIPE, "Tournage")
+    for ligne in lecteur:
+        extrait = plan.extraire(ligne)
+        if extrait is None:
+            assert plan.carte(ligne) is None
+            continue
+        prenom, nom, valeurs = extrait
+        valeurs_par_champ = [(valeur,) if valeur else () for valeur in valeurs]
+        assert plan.carte_multiple(prenom, nom, valeurs_par_champ) == plan.carte(ligne)
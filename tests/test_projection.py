@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""Lecture projetée : mêmes fiches et mêmes contacts que la lecture en flux par csv.reader."""
+
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from convertisseur import generer_cartes_vcf, generer_contacts
+from convertisseur.projection import RAPPORT_MINIMAL_PROJECTION, generer_cartes_vcf_projetees, generer_contacts_projetes
+
+from conftest import MAPPINGS_EQUIPE, lignes_equipe, texte_csv
+
+# Colonnes inutilisées d'un export large, dont certaines citées ou sur plusieurs lignes
+NB_COLONNES_INUTILES = 24
+VALEURS_INUTILES = ["", "x", "valeur; citée", 'guillemet " au milieu', "sur\ndeux lignes", "é" * 40]
+
+
+def _lignes_larges(nb_lignes: int) -> List[List[str]]:
+    lignes = lignes_equipe(nb_lignes, graine=3)
+    lignes[0] += [f"Inutile {i}" for i in range(NB_COLONNES_INUTILES)]
+    for n, ligne in enumerate(lignes[1:]):
+        if ligne:
+            ligne += [VALEURS_INUTILES[(n + i) % len(VALEURS_INUTILES)] for i in range(NB_COLONNES_INUTILES)]
+    # Ligne qui s'arrête avant la dernière colonne utilisée
+    lignes[4] = lignes[4][:3]
+    return lignes
+
+
+@pytest.mark.parametrize("large", [False, True])
+@pytest.mark.parametrize("encodage", ["utf-8-sig", "cp1252"])
+def test_projection_identique_au_flux(tmp_path: Path, large: bool, encodage: str) -> None:
+    lignes = _lignes_larges(2000) if large else lignes_equipe(2000, graine=3)
+    # Étroit : lignes décodées en entier ; large : seules les colonnes utilisées sont décodées
+    assert (len(lignes[0]) >= RAPPORT_MINIMAL_PROJECTION * len(MAPPINGS_EQUIPE)) == large
+    chemin = tmp_path / "equipe.csv"
+    chemin.write_text(texte_csv(lignes), encoding=encodage, newline="")
+
+    projetees = generer_cartes_vcf_projetees(chemin, MAPPINGS_EQUIPE, "Tournage", encodage=encodage,
+                                             colonnes_uid=["email"])
+    assert list(projetees) == list(generer_cartes_vcf(str(chemin), MAPPINGS_EQUIPE, "Tournage", encodage=encodage,
+                                                      colonnes_uid=["email"]))
+    contacts = generer_contacts_projetes(chemin, MAPPINGS_EQUIPE, "Tournage", encodage=encodage,
+                                         colonnes_uid=["email"])
+    assert list(contacts) == list(generer_contacts(str(chemin), MAPPINGS_EQUIPE, "Tournage", encodage=encodage,
+                                                   colonnes_uid=["email"]))
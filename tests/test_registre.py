@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""Registre des configurations : un CSV de même en-tête est converti comme avec son *_config.json."""
+
+import os
+import shutil
+from pathlib import Path
+
+from convertisseur.configuration import ecrire_configuration
+from convertisseur.lot import convertir_lot, preparer_taches
+from convertisseur.registre import RegistreConfigurations, empreinte_entete
+
+from conftest import DOSSIER_DATA
+
+NOM_CSV = "dossier csv pour papa (liste technique QLMNR)"
+
+
+def test_empreinte_independante_de_l_ecriture_de_l_entete() -> None:
+    entete = ["Prénom Nom", "Téléphone", "Mail"]
+    assert empreinte_entete(entete) == empreinte_entete(["\ufeffMAIL ", "téléphone", "prénom   nom", ""])
+    assert empreinte_entete(entete) != empreinte_entete(entete + ["Adresse"])
+
+
+def test_chercher_rend_les_noms_de_l_entete(tmp_path: Path) -> None:
+    registre = RegistreConfigurations(str(tmp_path / "registre"))
+    entete = ["Prénom Nom", "Téléphone", "Mail"]
+    assert registre.chercher(entete) is None
+    registre.enregistrer(entete, {'nom': "Prénom Nom", 'email': "Mail", 'adresse': "Adresse"}, "equipe.csv")
+    # Colonne absente de l'en-tête écartée, noms repris tels qu'écrits dans le nouvel en-tête
+    assert registre.chercher(["MAIL", "prénom nom", "Téléphone"]) == {'nom': "prénom nom", 'email': "MAIL"}
+    assert registre.supprimer(entete)
+    assert registre.chercher(entete) is None
+
+
+def test_lot_par_le_registre_identique_a_la_configuration(tmp_path: Path) -> None:
+    dossier_registre = str(tmp_path / "registre")
+    avec_config = tmp_path / "avec_config"
+    avec_config.mkdir()
+    shutil.copy(os.path.join(DOSSIER_DATA, NOM_CSV + ".csv"), avec_config)
+    # Sans le rôle, que la suggestion automatique aurait retenu
+    ecrire_configuration(str(avec_config / f"{NOM_CSV}_config.json"),
+                         {'nom': "Prénom Nom", 'telephone': "Téléphone", 'email': "Mail"})
+    # Même fichier sous un autre nom, sans *_config.json à côté
+    sans_config = tmp_path / "sans_config"
+    sans_config.mkdir()
+    shutil.copy(os.path.join(DOSSIER_DATA, NOM_CSV + ".csv"), sans_config / "liste technique.csv")
+
+    taches = preparer_taches([str(avec_config / f"{NOM_CSV}.csv")], None, None, "Tournage", None,
+                             dossier_registre=dossier_registre, memoriser=True)
+    [resultat] = convertir_lot(taches, 1)
+    assert resultat.erreur is None and resultat.origine_mappings.endswith("_config.json")
+
+    taches = preparer_taches([str(sans_config / "liste technique.csv")], None, None, "Tournage", None,
+                             dossier_registre=dossier_registre)
+    [resultat] = convertir_lot(taches, 1)
+    assert resultat.erreur is None and resultat.origine_mappings == "registre"
+    vcf = (avec_config / f"{NOM_CSV}.vcf").read_bytes()
+    assert b"TITLE:" not in vcf
+    assert (sans_config / "liste technique.vcf").read_bytes() == vcf
+
+    # Sans registre, les correspondances suggérées donnent un autre VCF
+    taches = preparer_taches([str(sans_config / "liste technique.csv")], str(tmp_path), None, "Tournage", None,
+                             registre=False)
+    [resultat] = convertir_lot(taches, 1)
+    assert resultat.origine_mappings == "suggestion automatique"
+    assert b"TITLE:" in (tmp_path / "liste technique.vcf").read_bytes()
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""Moteur par blocs de colonnes : mêmes fiches que `PlanConversion.carte`, ligne par ligne."""
+
+import io
+from typing import Optional, Sequence
+
+import pytest
+
+from convertisseur import ecrire_vcf
+from convertisseur.plan import PlanConversion
+from convertisseur.vectorise import generer_cartes_vectorisees, vectorisation_possible
+
+from conftest import ENTETE_EQUIPE, MAPPINGS_EQUIPE, lignes_equipe
+
+pytestmark = pytest.mark.skipif(not vectorisation_possible(), reason="pandas n'est pas installé")
+
+# Numéros que le nettoyage par colonnes traite à part : (0) national, 00 international, sans 0, trop courts
+TELEPHONES_PARTICULIERS = ["+33 (0)6 12 34 56 78", "0044 20 7946 0958", "6 12 34 56 78", "12", "-", "0 6/12 34"]
+
+
+@pytest.mark.parametrize("colonnes_uid", [None, ["nom", "email"]])
+def test_blocs_identiques_au_plan(colonnes_uid: Optional[Sequence[str]]) -> None:
+    lignes = [ligne for ligne in lignes_equipe(3000, graine=11)[1:] if ligne]
+    for i, telephone in enumerate(TELEPHONES_PARTICULIERS):
+        lignes[i * 7][2] = telephone
+    # Valeurs longues ou non ASCII à plier, ligne courte complétée par des cellules vides
+    lignes[3][4] = "Résidence des Tilleuls, bâtiment B, escalier 4, " * 3
+    lignes[5] = lignes[5][:2]
+    # Un plan par moteur : le plan numérote les homonymes au fil des UID qu'il calcule
+    plans = [PlanConversion(list(ENTETE_EQUIPE), MAPPINGS_EQUIPE, "Tournage", colonnes_uid=colonnes_uid)
+             for _ in range(2)]
+    attendu = [texte for texte in map(plans[0].carte, lignes) if texte is not None]
+    # Blocs de taille première : le dernier bloc est incomplet
+    assert list(generer_cartes_vectorisees(lignes, plans[1], taille_bloc=257)) == attendu
+
+
+def test_ecrire_vcf_vectorise(csv_equipe: str) -> None:
+    sorties = []
+    for vectorise in (False, True):
+        sortie = io.StringIO()
+        ecrire_vcf(csv_equipe, sortie, MAPPINGS_EQUIPE, "Tournage", vectorise=vectorise)
+        sorties.append(sortie.getvalue())
+    assert sorties[1] == sorties[0]